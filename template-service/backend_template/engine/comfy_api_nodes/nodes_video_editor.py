@@ -12,6 +12,9 @@ from config import video_editor_config
 
 logger = logging.getLogger(__name__)
 
+# How long one GET /tasks/{task_id}/wait may block on the video editor
+TASK_WAIT_SECONDS = 25.0
+
 
 # --- API response models ---
 
@@ -258,20 +261,25 @@ class BaseUGCEditingNode(IO.ComfyNode):
         )
 
         logger.info(
-            "[BaseUGCEditingNode] Task submitted — task_id=%s, polling for completion",
+            "[BaseUGCEditingNode] Task submitted — task_id=%s, waiting for completion",
             submit_response.task_id,
         )
 
         poll_response = await poll_op(
             cls,
-            ApiEndpoint(path=f"{base_url}/tasks/{submit_response.task_id}", method="GET"),
+            # Long-poll: the video editor answers as soon as the task finishes
+            ApiEndpoint(
+                path=f"{base_url}/tasks/{submit_response.task_id}/wait",
+                method="GET",
+                query_params={"timeout": TASK_WAIT_SECONDS},
+            ),
             response_model=TaskStatusResponse,
             status_extractor=lambda r: r.status.lower(),
             completed_statuses=["success"],
             failed_statuses=["failure", "revoked"],
             queued_statuses=["pending", "received"],
-            poll_interval=3.0,
-            timeout_per_poll=30.0,
+            poll_interval=1.0,
+            timeout_per_poll=TASK_WAIT_SECONDS + 15.0,
             max_retries_per_poll=3,
             estimated_duration=120,
         )
@@ -507,20 +515,25 @@ class BatchUGCEditingNode(IO.ComfyNode):
         )
 
         logger.debug(
-            "[BatchUGCEditingNode] Task submitted — task_id=%s, polling for completion",
+            "[BatchUGCEditingNode] Task submitted — task_id=%s, waiting for completion",
             submit_response.task_id,
         )
 
         poll_response = await poll_op(
             cls,
-            ApiEndpoint(path=f"{base_url}/tasks/{submit_response.task_id}", method="GET"),
+            # Long-poll: the video editor answers as soon as the task finishes
+            ApiEndpoint(
+                path=f"{base_url}/tasks/{submit_response.task_id}/wait",
+                method="GET",
+                query_params={"timeout": TASK_WAIT_SECONDS},
+            ),
             response_model=TaskStatusResponse,
             status_extractor=lambda r: r.status.lower(),
             completed_statuses=["success"],
             failed_statuses=["failure", "revoked"],
             queued_statuses=["pending", "received"],
-            poll_interval=3.0,
-            timeout_per_poll=30.0,
+            poll_interval=1.0,
+            timeout_per_poll=TASK_WAIT_SECONDS + 15.0,
             max_retries_per_poll=3,
             estimated_duration=120,
         )
@@ -1,17 +1,30 @@
-from fastapi import FastAPI
+import asyncio
+import json
+
+from fastapi import FastAPI, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from celery.result import AsyncResult
 
-from celery_app import app as celery_app
+from celery_app import MEDIA_QUEUE, RENDER_PRIORITIES, RENDER_QUEUE, app as celery_app, broker_url
 from models.messages.base_create_video_message import BaseCreateVideoMessage
 from captions.styles import STYLES
 from captions.preview import generate_preview_base64
+from queues import task_events
+from queues.queue_metrics import get_queue_stats
+from queues.task_events import TERMINAL_STATUSES
+
+MAX_WAIT_SECONDS = 60
+SSE_KEEPALIVE_SECONDS = 15
 
 api = FastAPI()
 
 
 @api.post("/tasks", status_code=202)
 def submit_task(message: BaseCreateVideoMessage):
-    task = celery_app.send_task("tasks.create_video", args=[message.model_dump()])
+    task = celery_app.send_task(
+        "tasks.create_video", args=[message.model_dump()], priority=RENDER_PRIORITIES[message.priority],
+    )
     return {"task_id": task.id}
 
 
@@ -28,6 +41,47 @@ def get_task_status(task_id: str):
     return response
 
 
+@api.get("/tasks/{task_id}/wait")
+async def wait_for_task(task_id: str, timeout: float = Query(25.0, ge=0, le=MAX_WAIT_SECONDS)):
+    """Long-poll: answers like GET /tasks/{task_id} as soon as the task finishes, or after timeout.
+
+    Fed by the video-generated / video-editing-step-changed events; the result
+    backend is only read for tasks this instance has no event for yet.
+    """
+    status = task_events.hub.latest(task_id)
+    if status is None:
+        status = await run_in_threadpool(get_task_status, task_id)
+        if status["status"] in TERMINAL_STATUSES:
+            return status
+    return await task_events.hub.wait(task_id, timeout) or status
+
+
+@api.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: str):
+    """Server-sent events: one status per update, closed once the task has finished."""
+    async def events():
+        with task_events.hub.subscribe(task_id) as queue:
+            status = task_events.hub.latest(task_id) or await run_in_threadpool(get_task_status, task_id)
+            yield f"data: {json.dumps(status)}\n\n"
+            while status["status"] not in TERMINAL_STATUSES:
+                try:
+                    status = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeping proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(status)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@api.get("/metrics/queues")
+def get_queue_metrics():
+    """Per-queue depth and oldest message age, the autoscaling signal for the worker pools."""
+    queues = [RENDER_QUEUE, MEDIA_QUEUE, celery_app.conf.task_default_queue]
+    return {name: stats._asdict() for name, stats in get_queue_stats(broker_url, queues).items()}
+
+
 @api.get("/captions/styles")
 def get_caption_styles():
     return [
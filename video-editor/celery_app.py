@@ -1,5 +1,9 @@
 import os
+import time
+
 from celery import Celery
+from celery.signals import before_task_publish
+from kombu import Exchange, Queue
 from dotenv import load_dotenv
 from sqlalchemy.pool import NullPool
 
@@ -30,4 +34,38 @@ if result_backend:
         database_engine_options={"poolclass": NullPool},
     )
 
-app.conf.imports = ["tasks.create_video", "tasks.process_media"]
+# Heavy renders and light media ingest (thumbnails, normalization) have their own priority
+# queues, so a burst of one doesn't wait behind the other and each gets its own worker
+# pool: celery -A celery_app worker -Q <queue> --concurrency=<n> (see charts worker.pools)
+RENDER_QUEUE = os.getenv("RENDER_QUEUE", "video-editor-render")
+MEDIA_QUEUE = os.getenv("MEDIA_NORMALIZE_QUEUE", "video-editor-media-normalize")
+MAX_PRIORITY = 10
+MEDIA_DEFAULT_PRIORITY = 5
+# AMQP priority of a render, by BaseCreateVideoMessage.priority
+RENDER_PRIORITIES = {"interactive": 8, "batch": 2}
+
+
+def _priority_queue(name: str) -> Queue:
+    return Queue(name, Exchange(name), routing_key=name, queue_arguments={"x-max-priority": MAX_PRIORITY})
+
+
+app.conf.task_queues = (
+    Queue(app.conf.task_default_queue),
+    _priority_queue(RENDER_QUEUE),
+    _priority_queue(MEDIA_QUEUE),
+)
+app.conf.task_routes = {
+    "tasks.create_video": {"queue": RENDER_QUEUE, "priority": RENDER_PRIORITIES["interactive"]},
+    "tasks.normalize_media": {"queue": MEDIA_QUEUE, "priority": MEDIA_DEFAULT_PRIORITY},
+    "tasks.process_media": {"queue": MEDIA_QUEUE, "priority": MEDIA_DEFAULT_PRIORITY},
+}
+
+
+@before_task_publish.connect
+def _stamp_publish_time(headers=None, **kwargs):
+    # Read back by queues.queue_metrics to report how long the next message has been waiting
+    if headers is not None:
+        headers["published_at"] = time.time()
+
+
+app.conf.imports = ["tasks.create_video", "tasks.process_media", "tasks.normalize_media"]
@@ -0,0 +1,71 @@
+import json
+import logging
+import os
+
+from editors.base_ugc.context import EditingContext
+
+logger = logging.getLogger(__name__)
+
+# EditingContext fields that steps set and later steps read
+_STATE_FIELDS = (
+    "media_urls",
+    "current_video_path",
+    "srt_path",
+    "output_media_id",
+    "speech_segments",
+    "intermediate_media_id",
+    "intermediate_presigned_url",
+    "intermediate_upload_url",
+)
+
+
+class PipelineCheckpoint:
+    """Progress of one video's pipeline on disk, so a retried task resumes at the failed step."""
+
+    def __init__(self, base_path: str, video_id: str):
+        self.path = os.path.join(base_path, "checkpoints", f"{video_id}.json")
+
+    def save(self, next_step: int, ctx: EditingContext) -> None:
+        state = {
+            "next_step": next_step,
+            "args": ctx.args.model_dump(mode="json"),
+            "context": {name: getattr(ctx, name) for name in _STATE_FIELDS},
+            "workspace": ctx.workspace.snapshot(),
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def restore(self, ctx: EditingContext) -> int:
+        """Load the saved state into ctx and return the index of the first step to run.
+
+        Returns 0 when there is nothing usable to resume from, e.g. when the retry
+        landed on a worker that does not have the intermediate files.
+        """
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return 0
+
+        if state["args"] != ctx.args.model_dump(mode="json"):
+            logger.warning(f"[{ctx.video_id}] Checkpoint was saved for different creation args, starting over")
+            return 0
+
+        current_video_path = state["context"]["current_video_path"]
+        if current_video_path is not None and not os.path.exists(current_video_path):
+            logger.warning(f"[{ctx.video_id}] Checkpoint refers to missing {current_video_path}, starting over")
+            return 0
+
+        for name, value in state["context"].items():
+            if name == "speech_segments" and value is not None:
+                value = [tuple(segment) for segment in value]
+            setattr(ctx, name, value)
+        ctx.workspace.restore(state["workspace"])
+        return state["next_step"]
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
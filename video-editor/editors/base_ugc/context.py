@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 
+from editors.base_ugc.render_plan import RenderPlan
 from models.creation_args.base_ugc import BaseUgcArgs
 from utils.editing_workspace import EditingWorkspace
 
@@ -13,7 +14,11 @@ class EditingContext:
     current_video_path: str | None = None
     srt_path: str | None = None
     output_media_id: str | None = None
+    # Speech ranges keyframed into current_video_path by ConcatenateStep (silence_stream_copy)
+    speech_segments: list[tuple[float, float]] | None = None
     # Intermediate S3 state — set by UploadIntermediateResultStep
     intermediate_media_id: str | None = None
     intermediate_presigned_url: str | None = None   # presigned GET URL
     intermediate_upload_url: str | None = None       # presigned PUT URL for overwrite
+    # Single-pass mode — steps record their edits here instead of encoding
+    render_plan: RenderPlan | None = None
@@ -1,6 +1,9 @@
 from editors.base_editor import BaseEditor
+from editors.base_ugc.checkpoint import PipelineCheckpoint
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.pipeline import EditingPipeline
+from editors.base_ugc.render_plan import RenderPlan
+from editors.base_ugc.step_cache import step_cache_from_env
 from editors.base_ugc.steps.base_step import PipelineStep, ProgressCallback
 from editors.base_ugc.steps.fetch_media import FetchMediaStep
 from editors.base_ugc.steps.concatenate import ConcatenateStep
@@ -23,19 +26,38 @@ class BaseUgcEditor(BaseEditor):
         base_path: str,
         video_id: str = "",
         progress_cb: ProgressCallback | None = None,
+        final_attempt: bool = True,
     ) -> str:
+        """Run the editing pipeline and return the output media ID.
+
+        When final_attempt is False and a step fails, the intermediate files and a
+        checkpoint are kept so the retried task resumes at the failed step.
+        """
         workspace = WorkspaceManager().create_workspace(base_path)
         logger.info(f"Created workspace at {workspace.base_path}")
 
         ctx = EditingContext(video_id=video_id, args=args, workspace=workspace)
+        if args.single_pass_render:
+            ctx.render_plan = RenderPlan()
+        # The render plan is not checkpointed, single-pass runs always start over
+        checkpoint = PipelineCheckpoint(base_path, video_id) if video_id and ctx.render_plan is None else None
         pipeline = EditingPipeline(
             steps=self._build_steps(args),
             on_step=progress_cb or _noop_progress,
+            cache=step_cache_from_env(),
+            checkpoint=checkpoint,
         )
+        keep_for_retry = False
         try:
             return pipeline.run(ctx)
+        except Exception:
+            keep_for_retry = checkpoint is not None and not final_attempt
+            raise
         finally:
-            workspace.cleanup()
+            if not keep_for_retry:
+                workspace.cleanup()
+                if checkpoint is not None:
+                    checkpoint.clear()
 
     def _build_steps(self, args: BaseUgcArgs) -> list[PipelineStep]:
         steps: list[PipelineStep] = [FetchMediaStep(), ConcatenateStep()]
@@ -1,18 +1,42 @@
 import logging
 
+from editors.base_ugc.checkpoint import PipelineCheckpoint
 from editors.base_ugc.context import EditingContext
+from editors.base_ugc.step_cache import StepCache, step_cache_keys
 from editors.base_ugc.steps.base_step import PipelineStep, ProgressCallback
 
 logger = logging.getLogger(__name__)
 
 
 class EditingPipeline:
-    def __init__(self, steps: list[PipelineStep], on_step: ProgressCallback):
+    def __init__(
+        self,
+        steps: list[PipelineStep],
+        on_step: ProgressCallback,
+        cache: StepCache | None = None,
+        checkpoint: PipelineCheckpoint | None = None,
+    ):
         self.steps = steps
         self.on_step = on_step
+        self.cache = cache
+        self.checkpoint = checkpoint
 
     def run(self, ctx: EditingContext) -> str:
-        for step in self.steps:
+        checkpoint = self.checkpoint
+        start = checkpoint.restore(ctx) if checkpoint is not None else 0
+        if start:
+            logger.info(f"[{ctx.video_id}] Resuming from checkpoint, {start} steps already done")
+
+        keys: list[str | None] = [None] * len(self.steps)
+        # Single-pass steps only record edits, there is no per-step output to cache
+        if self.cache is not None and ctx.render_plan is None:
+            keys = step_cache_keys([{"step": step.name, **step.cache_inputs(ctx)} for step in self.steps])
+            if not start:
+                start = self._resume(ctx, keys)
+
+        for index, (step, key) in enumerate(zip(self.steps, keys)):
+            if index < start:
+                continue
             logger.info(f"[{ctx.video_id}] Step '{step.name}' starting")
             self.on_step(step.name, "in_progress", None)
             try:
@@ -21,9 +45,29 @@ class EditingPipeline:
                 logger.error(f"[{ctx.video_id}] Step '{step.name}' failed: {e}")
                 self.on_step(step.name, "failed", str(e))
                 raise
+            if key is not None and step.cacheable:
+                self.cache.store(key, ctx.current_video_path)
+            if checkpoint is not None:
+                checkpoint.save(index + 1, ctx)
             logger.info(f"[{ctx.video_id}] Step '{step.name}' completed")
             self.on_step(step.name, "completed", None)
 
         if ctx.output_media_id is None:
             raise RuntimeError("Pipeline completed but output_media_id was not set")
         return ctx.output_media_id
+
+    def _resume(self, ctx: EditingContext, keys: list[str]) -> int:
+        """Restore the latest cached step output and return the index of the first step to run."""
+        for i in reversed(range(len(self.steps))):
+            if not self.steps[i].cacheable:
+                continue
+            output_path = ctx.workspace.get_temp_path("mp4")
+            if not self.cache.restore(keys[i], output_path):
+                continue
+
+            ctx.current_video_path = output_path
+            for step in self.steps[:i + 1]:
+                logger.info(f"[{ctx.video_id}] Step '{step.name}' restored from cache")
+                self.on_step(step.name, "completed", None)
+            return i + 1
+        return 0
@@ -0,0 +1,87 @@
+import logging
+from dataclasses import dataclass, field
+
+from models.creation_args.base_ugc import TrimDecision
+from utils.editing_workspace import EditingWorkspace
+from utils.ffmpeg_commands import build_single_pass_command
+from utils.ffmpeg_utils import FFmpegCommandExecutor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderPlan:
+    """Edit intents collected by the steps when the pipeline runs in single-pass mode.
+
+    Instead of re-encoding the video after every step, each step records what it
+    wants done here and the whole edit is compiled into one filter graph that is
+    encoded once by ExportAndUploadStep.
+    """
+    input_paths: list[str] = field(default_factory=list)
+    trim_decisions: dict[str, TrimDecision] | None = None
+    media_ids: list[str] | None = None
+    keep_segments: list[tuple[float, float]] | None = None
+    music_path: str | None = None
+    music_volume: float = 1.0
+    audio_path: str | None = None      # replacement audio track (voiceover)
+    video_filter: str | None = None    # e.g. subtitles burn
+    # Local WAV of the trimmed + concatenated source audio, see source_audio
+    source_audio_path: str | None = None
+
+    def build_command(self, output_path: str, fragmented: bool = False) -> list[str]:
+        return build_single_pass_command(
+            input_paths=self.input_paths,
+            output_path=output_path,
+            trim_decisions=self.trim_decisions,
+            media_ids=self.media_ids,
+            keep_segments=self.keep_segments,
+            music_path=self.music_path,
+            music_volume=self.music_volume,
+            audio_path=self.audio_path,
+            video_filter=self.video_filter,
+            fragmented=fragmented,
+        )
+
+    def render(self, output_path: str) -> str:
+        logger.info("Rendering full plan → %s", output_path)
+        FFmpegCommandExecutor().execute(self.build_command(output_path))
+        return output_path
+
+    def source_audio(self, workspace: EditingWorkspace) -> str:
+        """Decode the sources' audio once into a local WAV that every audio-only render reuses.
+
+        The inputs are usually remote presigned URLs, so this keeps them from being
+        downloaded again for each silence detection or intermediate upload.
+        """
+        if self.source_audio_path is None:
+            self.source_audio_path = workspace.get_temp_path("wav")
+            logger.info("Rendering source audio → %s", self.source_audio_path)
+            FFmpegCommandExecutor().execute(
+                build_single_pass_command(
+                    input_paths=self.input_paths,
+                    output_path=self.source_audio_path,
+                    trim_decisions=self.trim_decisions,
+                    media_ids=self.media_ids,
+                    audio_only=True,
+                    audio_codec="pcm_s16le",
+                )
+            )
+        return self.source_audio_path
+
+    def render_audio(self, workspace: EditingWorkspace) -> str:
+        """Quick MP3 render of the planned soundtrack (cuts, music, voiceover), no video."""
+        output_path = workspace.get_temp_path("mp3")
+        input_paths = [self.source_audio(workspace)] if self.audio_path is None else []
+        logger.info("Rendering audio-only plan → %s", output_path)
+        FFmpegCommandExecutor().execute(
+            build_single_pass_command(
+                input_paths=input_paths,
+                output_path=output_path,
+                keep_segments=self.keep_segments,
+                music_path=self.music_path,
+                music_volume=self.music_volume,
+                audio_path=self.audio_path,
+                audio_only=True,
+            )
+        )
+        return output_path
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Bump when a step's output changes for the same inputs (new filters, codecs, ...)
+CACHE_VERSION = 1
+
+
+class StepCache:
+    """Local disk LRU of step outputs, keyed by the hash chain from step_cache_keys.
+
+    Recency is the file mtime, refreshed on every hit; the oldest entries are
+    evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def restore(self, key: str, dest_path: str) -> bool:
+        """Place the cached output for key at dest_path. Returns False on a miss."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+            _link_or_copy(path, dest_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key: str, file_path: str) -> None:
+        # Write under a temp name first so concurrent workers never read a partial file
+        tmp_path = os.path.join(self.cache_dir, f".{uuid4()}.tmp")
+        try:
+            _link_or_copy(file_path, tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to cache step output {file_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            logger.info(f"Evicted {path} from step cache")
+
+
+def step_cache_from_env() -> StepCache | None:
+    """StepCache configured by STEP_CACHE_DIR / STEP_CACHE_MAX_GB, or None when disabled."""
+    cache_dir = os.getenv("STEP_CACHE_DIR")
+    if not cache_dir:
+        return None
+    max_gb = float(os.getenv("STEP_CACHE_MAX_GB", "20"))
+    return StepCache(cache_dir, int(max_gb * 1024 ** 3))
+
+
+def step_cache_keys(inputs: list[dict]) -> list[str]:
+    """Chain per-step inputs into keys: each key also covers everything upstream of it."""
+    keys = []
+    previous = str(CACHE_VERSION)
+    for step_inputs in inputs:
+        payload = json.dumps({"upstream": previous, "inputs": step_inputs}, sort_keys=True, default=str)
+        previous = hashlib.sha256(payload.encode()).hexdigest()
+        keys.append(previous)
+    return keys
+
+
+def _link_or_copy(src: str, dest: str) -> None:
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
@@ -95,6 +95,10 @@ def srt_to_ass(srt_text: str, style: CaptionStyle, position_x: float, position_y
 
 class AddCaptionsStep(PipelineStep):
     name = "Adding captions"
+    cacheable = True
+
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        return ctx.args.model_dump(include={"captions_settings"})
 
     def execute(self, ctx: EditingContext) -> None:
         if not ctx.intermediate_presigned_url:
@@ -126,6 +130,10 @@ class AddCaptionsStep(PipelineStep):
         logger.info("Wrote ASS to %s", ass_path)
         vf = f"subtitles={ass_path}:fontsdir={_FONTS_DIR}"
 
+        if ctx.render_plan is not None:
+            ctx.render_plan.video_filter = vf
+            return
+
         output_path = ctx.workspace.get_temp_path("mp4")
         logger.info("Burning captions into %s → %s", ctx.current_video_path, output_path)
         logger.info("vf: %s", vf)
@@ -1,16 +1,20 @@
 import logging
-import math
-
-from moviepy import AudioFileClip, CompositeAudioClip, VideoFileClip, concatenate_audioclips
 
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.steps.base_step import PipelineStep
+from utils.ffmpeg_commands import build_add_music_command
+from utils.ffmpeg_utils import FFmpegCommandExecutor
 from utils.media_ingest_client import get_presigned_url
+from utils.video_editing_utils import probe_media
 
 logger = logging.getLogger(__name__)
 
 class AddMusicStep(PipelineStep):
     name = "Adding music"
+    cacheable = True
+
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        return ctx.args.model_dump(include={"music_settings"})
 
     def execute(self, ctx: EditingContext) -> None:
         settings = ctx.args.music_settings
@@ -20,33 +24,25 @@ class AddMusicStep(PipelineStep):
             return
 
         music_url = get_presigned_url(settings.music_id)
-        video = VideoFileClip(ctx.current_video_path)
-        music = AudioFileClip(music_url).with_volume_scaled(settings.volume)
 
-        fitted = _fit_audio(music, video.duration)
-        tracks = [video.audio, fitted] if video.audio else [fitted]
-        mixed_audio = CompositeAudioClip(tracks)
+        if ctx.render_plan is not None:
+            ctx.render_plan.music_path = music_url
+            ctx.render_plan.music_volume = settings.volume
+            return
 
+        media_info = probe_media(ctx.current_video_path)
         output_path = ctx.workspace.get_temp_path("mp4")
-
-        final = video.with_audio(mixed_audio)
-        final.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            temp_audiofile_path=ctx.workspace.get_temp_path("mp3"),
-            logger=None)
-
-        video.close()
-        music.close()
-        final.close()
+        logger.info("Mixing music into %s → %s", ctx.current_video_path, output_path)
+
+        FFmpegCommandExecutor().execute(
+            build_add_music_command(
+                video_path=ctx.current_video_path,
+                music_path=music_url,
+                output_path=output_path,
+                volume=settings.volume,
+                duration=media_info.duration,
+                has_audio=media_info.has_audio,
+            )
+        )
 
         ctx.current_video_path = output_path
-
-
-def _fit_audio(clip: AudioFileClip, duration: float) -> AudioFileClip:
-    """Trim or loop an audio clip to exactly match the target duration."""
-    if clip.duration >= duration:
-        return clip.subclipped(0, duration)
-    repeats = math.ceil(duration / clip.duration)
-    return concatenate_audioclips([clip] * repeats).subclipped(0, duration)
@@ -9,6 +9,12 @@ ProgressCallback = Callable[[str, EditingStepStatus, str | None], None]
 
 class PipelineStep(ABC):
     name: str
+    # Steps whose whole result is ctx.current_video_path can be restored from the step cache
+    cacheable: bool = False
 
     @abstractmethod
     def execute(self, ctx: EditingContext) -> None: ...
+
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        """Everything besides the upstream steps that this step's output depends on."""
+        return {}
@@ -1,8 +1,10 @@
 import logging
+import math
 
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.steps.base_step import PipelineStep
-from utils.ffmpeg_commands import build_normalize_concat_command
+from editors.base_ugc.steps.remove_silence import detect_timeline_speech_segments
+from utils.ffmpeg_commands import TARGET_FPS, build_normalize_concat_command
 from utils.ffmpeg_utils import FFmpegCommandExecutor
 
 logger = logging.getLogger(__name__)
@@ -10,8 +12,28 @@ logger = logging.getLogger(__name__)
 
 class ConcatenateStep(PipelineStep):
     name = "Merging clips"
+    cacheable = True
+
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        return ctx.args.model_dump(include={"trim_decisions", "silence_stream_copy"})
 
     def execute(self, ctx: EditingContext) -> None:
+        if ctx.render_plan is not None:
+            ctx.render_plan.input_paths = ctx.media_urls
+            ctx.render_plan.trim_decisions = ctx.args.trim_decisions
+            ctx.render_plan.media_ids = ctx.args.media_files
+            return
+
+        force_key_frames = None
+        if ctx.args.remove_silence and ctx.args.silence_stream_copy:
+            # Keyframes land on the first frame at or after the requested time, so speech
+            # starts are moved onto the frame grid first; RemoveSilenceStep then cuts at
+            # exactly the keyframed instants with stream copy.
+            ctx.speech_segments = [
+                (_ceil_to_frame(start), end) for start, end in self._detect_speech(ctx)
+            ]
+            force_key_frames = [start for start, _ in ctx.speech_segments if start > 0]
+
         output_path = ctx.workspace.get_temp_path("mp4")
         logger.info(
             "Normalizing and concatenating %d clips → %s",
@@ -23,6 +45,19 @@ class ConcatenateStep(PipelineStep):
                 output_path=output_path,
                 trim_decisions=ctx.args.trim_decisions,
                 media_ids=ctx.args.media_files,
+                force_key_frames=force_key_frames,
             )
         )
         ctx.current_video_path = output_path
+
+    def _detect_speech(self, ctx: EditingContext) -> list[tuple[float, float]]:
+        return detect_timeline_speech_segments(
+            input_paths=ctx.media_urls,
+            trim_decisions=ctx.args.trim_decisions,
+            media_ids=ctx.args.media_files,
+        )
+
+
+def _ceil_to_frame(t: float) -> float:
+    # The epsilon keeps values already on the grid (e.g. 33.000000000000004 frames) in place
+    return math.ceil(t * TARGET_FPS - 1e-6) / TARGET_FPS
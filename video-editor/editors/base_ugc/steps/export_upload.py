@@ -1,11 +1,53 @@
+import logging
+import os
+import subprocess
+
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.steps.base_step import PipelineStep
-from utils.media_ingest_client import upload_media
+from utils.media_ingest_client import upload_media, upload_media_stream
+from utils.storage.multipart_upload import storage_credentials_configured
+
+logger = logging.getLogger(__name__)
 
 
 class ExportAndUploadStep(PipelineStep):
     name = "Exporting"
 
     def execute(self, ctx: EditingContext) -> None:
+        if ctx.render_plan is not None:
+            if ctx.args.stream_export and storage_credentials_configured():
+                ctx.output_media_id = self._render_and_stream(ctx)
+                return
+            if ctx.args.stream_export:
+                logger.warning("stream_export needs storage credentials for multipart upload, rendering to a file")
+            ctx.current_video_path = ctx.render_plan.render(ctx.workspace.get_temp_path("mp4"))
+
         media_id = upload_media(ctx.current_video_path, content_type="video/mp4")
         ctx.output_media_id = media_id
+
+    def _render_and_stream(self, ctx: EditingContext) -> str:
+        """Encode to fragmented MP4 on stdout and upload it part by part while ffmpeg is still running."""
+        command = ctx.render_plan.build_command("pipe:1", fragmented=True)
+        log_path = ctx.workspace.get_temp_path("log")
+        logger.info(f"Streaming ffmpeg: {' '.join(command)}")
+
+        with open(log_path, "wb") as log:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=log)
+
+        def check_ffmpeg() -> None:
+            if process.wait() != 0:
+                with open(log_path, errors="replace") as f:
+                    stderr = f.read()
+                raise subprocess.CalledProcessError(process.returncode, command, None, stderr)
+
+        try:
+            return upload_media_stream(
+                process.stdout,
+                os.path.basename(ctx.workspace.get_temp_path("mp4")),
+                before_complete=check_ffmpeg,
+            )
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
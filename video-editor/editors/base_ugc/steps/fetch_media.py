@@ -1,10 +1,39 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.steps.base_step import PipelineStep
-from utils.media_ingest_client import get_presigned_url
+from utils.media_ingest_client import download_url, get_presigned_urls
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on clips downloaded at once in prefetch mode
+PREFETCH_CONCURRENCY = int(os.getenv("MEDIA_PREFETCH_CONCURRENCY", "4"))
 
 
 class FetchMediaStep(PipelineStep):
     name = "Fetching media"
 
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        return ctx.args.model_dump(include={"media_files"})
+
     def execute(self, ctx: EditingContext) -> None:
-        ctx.media_urls = [get_presigned_url(media_id) for media_id in ctx.args.media_files]
+        ctx.media_urls = get_presigned_urls(ctx.args.media_files)
+
+        if ctx.args.prefetch_media:
+            ctx.media_urls = self._prefetch(ctx)
+
+    def _prefetch(self, ctx: EditingContext) -> list[str]:
+        """Download every clip into the workspace so ffmpeg reads local files instead of N remote streams."""
+        dest_paths = [ctx.workspace.get_temp_path(_extension(url)) for url in ctx.media_urls]
+        logger.info("Prefetching %d clips into the workspace", len(dest_paths))
+        with ThreadPoolExecutor(max_workers=min(PREFETCH_CONCURRENCY, len(dest_paths))) as pool:
+            # list() re-raises the first download error
+            list(pool.map(download_url, ctx.media_urls, dest_paths))
+        return dest_paths
+
+
+def _extension(url: str) -> str:
+    return os.path.splitext(urlparse(url).path)[1].lstrip(".") or "mp4"
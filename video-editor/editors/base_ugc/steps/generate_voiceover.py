@@ -1,14 +1,12 @@
 import logging
-import os
-import subprocess
-
-from moviepy import AudioFileClip, VideoFileClip
-import requests
 
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.steps.base_step import PipelineStep
+from editors.base_ugc.steps.upload_intermediate_result import overwrite_intermediate
 from utils.ai_gateway_client import changeVoice
-from utils.media_ingest_client import get_upload_presigned_url
+from utils.ffmpeg_commands import build_replace_audio_command
+from utils.ffmpeg_utils import FFmpegCommandExecutor
+from utils.video_editing_utils import get_duration
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +14,9 @@ logger = logging.getLogger(__name__)
 class GenerateVoiceoverStep(PipelineStep):
     name = "Generating voiceover"
 
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        return ctx.args.model_dump(include={"voiceover_settings"})
+
     def execute(self, ctx: EditingContext) -> None:
         if not ctx.intermediate_presigned_url or not ctx.intermediate_upload_url:
             raise RuntimeError("UploadIntermediateResultStep must run before GenerateVoiceoverStep")
@@ -29,37 +30,29 @@ class GenerateVoiceoverStep(PipelineStep):
         # 1. Send current video to ai-gateway — get back presigned URL of the new audio
         audio_presigned_url = changeVoice(ctx.intermediate_presigned_url, voice_id)
 
-        voiceover_audio = AudioFileClip(audio_presigned_url)
-        video = VideoFileClip(ctx.current_video_path)
-        video_with_replaced_audio = video.without_audio()
-        video_with_replaced_audio = video_with_replaced_audio.with_audio(voiceover_audio)
-
-        output_path = ctx.workspace.get_temp_path("mp4")
-
-        video_with_replaced_audio.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            logger=None,
-            temp_audiofile_path=ctx.workspace.base_path,
-        )
-        video_with_replaced_audio.close()
-        voiceover_audio.close()
-        video.close()
-
-        # 3. Overwrite the intermediate file in S3
-        file_size = os.path.getsize(output_path)
-        with open(output_path, "rb") as f:
-            put_response = requests.put(
-                ctx.intermediate_upload_url,
-                data=f,
-                headers={"Content-Type": "video/mp4", "Content-Length": str(file_size)},
-                timeout=300,
+        # 2. Mux the new audio in — ffmpeg streams it from the URL and copies the video stream
+        if ctx.render_plan is not None:
+            ctx.render_plan.audio_path = audio_presigned_url
+        else:
+            output_path = ctx.workspace.get_temp_path("mp4")
+            FFmpegCommandExecutor().execute(
+                build_replace_audio_command(
+                    ctx.current_video_path,
+                    audio_presigned_url,
+                    output_path,
+                    duration=get_duration(ctx.current_video_path),
+                )
             )
-        put_response.raise_for_status()
+            ctx.current_video_path = output_path
+
+        # 3. Overwrite the intermediate file in S3 — only captions read it later
+        if ctx.args.add_captions:
+            overwrite_intermediate(ctx, *self._intermediate_file(ctx))
 
-        # 4. Refresh the upload URL (presigned PUT URLs are single-use in some S3 implementations)
-        ctx.intermediate_upload_url = get_upload_presigned_url(ctx.intermediate_media_id)
-        ctx.current_video_path = output_path
+        logger.info("Voiceover applied: media_id=%s", ctx.intermediate_media_id)
 
-        logger.info("Voiceover applied, intermediate updated: media_id=%s", ctx.intermediate_media_id)
+    def _intermediate_file(self, ctx: EditingContext) -> tuple[str, str]:
+        if ctx.render_plan is not None:
+            audio_path = ctx.render_plan.render_audio(ctx.workspace)
+            return audio_path, "audio/mpeg"
+        return ctx.current_video_path, "video/mp4"
@@ -2,65 +2,127 @@ import logging
 import re
 import subprocess
 
-from moviepy import VideoFileClip, concatenate_videoclips
-
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.steps.base_step import PipelineStep
+from models.creation_args.base_ugc import TrimDecision
+from utils.ffmpeg_commands import (
+    TARGET_FPS,
+    build_concat_copy_command,
+    build_detect_silence_command,
+    build_remove_silence_command,
+)
+from utils.ffmpeg_utils import FFmpegCommandExecutor
+from utils.video_editing_utils import get_duration, get_keyframe_times
 
 SILENCE_NOISE_DB = -35
 SILENCE_MIN_DURATION = 0.5
+# A cut point counts as keyframe-aligned when it is within half a frame of a keyframe
+KEYFRAME_TOLERANCE = 0.5 / TARGET_FPS
 
 logger = logging.getLogger(__name__)
 
 class RemoveSilenceStep(PipelineStep):
     name = "Removing silence"
+    cacheable = True
 
-    def execute(self, ctx: EditingContext) -> None:
-        input_path = ctx.current_video_path
-        silence_intervals = _detect_silence(input_path)
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        return {"noise_db": SILENCE_NOISE_DB, "min_duration": SILENCE_MIN_DURATION}
 
-        if not silence_intervals:
+    def execute(self, ctx: EditingContext) -> None:
+        if ctx.render_plan is not None:
+            self._plan_cuts(ctx)
             return
 
-        clip = VideoFileClip(input_path)
-        non_silent = _invert_intervals(silence_intervals, clip.duration)
+        input_path = ctx.current_video_path
+
+        if ctx.speech_segments is not None:
+            non_silent = ctx.speech_segments
+        else:
+            non_silent = detect_speech_segments(input_path)
 
         if not non_silent:
-            clip.close()
             return
 
-        subclips = [clip.subclipped(start, end) for start, end in non_silent]
-
         output_path = ctx.workspace.get_temp_path("mp4")
-        
-        logger.info(f"Removing silence from {input_path} into {output_path}...")
-        final = concatenate_videoclips(subclips)
-        final.write_videofile(
-            output_path, 
-            codec="libx264", 
-            audio_codec="aac", 
-            logger=None,
-            temp_audiofile_path=ctx.workspace.base_path
-        )
-
-        clip.close()
-        final.close()
+
+        if ctx.speech_segments is not None and _starts_on_keyframes(input_path, non_silent):
+            logger.info(f"Removing silence from {input_path} into {output_path} with stream copy...")
+            concat_file_path = ctx.workspace.create_segments_concat_file(input_path, non_silent)
+            FFmpegCommandExecutor().execute(build_concat_copy_command(concat_file_path, output_path))
+        else:
+            logger.info(f"Removing silence from {input_path} into {output_path}...")
+            FFmpegCommandExecutor().execute(build_remove_silence_command(input_path, output_path, non_silent))
 
         ctx.current_video_path = output_path
 
+    def _plan_cuts(self, ctx: EditingContext) -> None:
+        # Silence is detected on the decoded source audio, no video is rendered
+        non_silent = detect_speech_segments(ctx.render_plan.source_audio(ctx.workspace))
+        if non_silent:
+            ctx.render_plan.keep_segments = non_silent
+
+
+def detect_speech_segments(input_path: str) -> list[tuple[float, float]]:
+    """Return the non-silent ranges of input_path, or [] when there is nothing to cut."""
+    silence_intervals = _detect_silence(input_path)
+    if not silence_intervals:
+        return []
+    return _invert_intervals(silence_intervals, get_duration(input_path))
+
+
+def detect_timeline_speech_segments(
+    input_paths: list[str],
+    trim_decisions: dict[str, TrimDecision] | None = None,
+    media_ids: list[str] | None = None,
+) -> list[tuple[float, float]]:
+    """Like detect_speech_segments, but over the concatenated audio of several inputs.
+
+    The sources' audio is decoded straight into silencedetect, nothing is encoded.
+    """
+    result = subprocess.run(
+        build_detect_silence_command(
+            input_paths, SILENCE_NOISE_DB, SILENCE_MIN_DURATION, trim_decisions, media_ids,
+        ),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    output = result.stderr.decode()
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, output)
+
+    silence_intervals = _parse_silence(output)
+    if not silence_intervals:
+        return []
+    # The last progress line holds the length of the whole timeline
+    h, m, s = re.findall(r"time=(\d+):(\d+):([\d.]+)", output)[-1]
+    return _invert_intervals(silence_intervals, int(h) * 3600 + int(m) * 60 + float(s))
+
+
+def _starts_on_keyframes(input_path: str, segments: list[tuple[float, float]]) -> bool:
+    """Stream copy can only start a segment on a keyframe; the end may fall anywhere."""
+    keyframes = get_keyframe_times(input_path)
+    for start, _ in segments:
+        if not any(abs(start - keyframe) <= KEYFRAME_TOLERANCE for keyframe in keyframes):
+            logger.warning("Cut point %.3f is not on a keyframe, falling back to re-encode", start)
+            return False
+    return True
+
 
 def _detect_silence(input_path: str) -> list[tuple[float, float]]:
     result = subprocess.run(
         [
             "ffmpeg", "-i", input_path,
+            "-vn",
             "-af", f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_DURATION}",
             "-f", "null", "-",
         ],
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
     )
-    output = result.stderr.decode()
+    return _parse_silence(result.stderr.decode())
+
 
+def _parse_silence(output: str) -> list[tuple[float, float]]:
     starts = [float(m) for m in re.findall(r"silence_start: ([\d.]+)", output)]
     ends = [float(m) for m in re.findall(r"silence_end: ([\d.]+)", output)]
 
@@ -2,7 +2,7 @@ import logging
 
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.steps.base_step import PipelineStep
-from utils.media_ingest_client import get_presigned_url, get_upload_presigned_url, upload_media
+from utils.media_ingest_client import get_presigned_url, get_upload_presigned_url, put_file, upload_media
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +11,12 @@ class UploadIntermediateResultStep(PipelineStep):
     name = "Uploading intermediate result"
 
     def execute(self, ctx: EditingContext) -> None:
-        media_id = upload_media(ctx.current_video_path)
+        if ctx.render_plan is not None:
+            # Voiceover and transcription only need the soundtrack
+            audio_path = ctx.render_plan.render_audio(ctx.workspace)
+            media_id = upload_media(audio_path, content_type="audio/mpeg")
+        else:
+            media_id = upload_media(ctx.current_video_path)
         presigned_url = get_presigned_url(media_id)
         upload_url = get_upload_presigned_url(media_id)
 
@@ -20,3 +25,12 @@ class UploadIntermediateResultStep(PipelineStep):
         ctx.intermediate_upload_url = upload_url
 
         logger.info("Uploaded intermediate result: media_id=%s", media_id)
+
+
+def overwrite_intermediate(ctx: EditingContext, file_path: str, content_type: str) -> None:
+    """Replace the uploaded intermediate with file_path so later steps read the new version."""
+    put_file(ctx.intermediate_upload_url, file_path, content_type)
+
+    # Refresh the upload URL (presigned PUT URLs are single-use in some S3 implementations)
+    ctx.intermediate_upload_url = get_upload_presigned_url(ctx.intermediate_media_id)
+    logger.info("Intermediate updated: media_id=%s", ctx.intermediate_media_id)
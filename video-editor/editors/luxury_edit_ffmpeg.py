@@ -1,11 +1,11 @@
 import logging
 from typing import List
-from moviepy import VideoFileClip
 
 from editors.base_editor import BaseEditor
 from models.creation_args.luxury_edit import LuxuryEditArgs
 from utils.emoji_clip import get_png_from_text_with_emojis
 from utils.ffmpeg_utils import FFmpegCommandExecutor
+from utils.media_metadata import probe
 from editors.builders.luxury_edit_builder import LuxuryEditCommandBuilder
 from utils.editing_workspace import WorkspaceManager
 
@@ -28,7 +28,7 @@ class LuxuryEditFfmpeg(BaseEditor):
 
             concated_video_path = self._concat_cuts(cut_paths)
   
-            caption_image_path = self._get_caption_png(video_args.caption, VideoFileClip(cut_paths[-1]).size)
+            caption_image_path = self._get_caption_png(video_args.caption, probe(cut_paths[-1]).size)
             
             captioned_file_path = self._overlay_video_with_png(concated_video_path, caption_image_path)
 
@@ -1,7 +1,6 @@
 import logging
 import os
 import sys
-import threading
 import pika
 import uvicorn
 
@@ -10,25 +9,52 @@ from queues.consumers.convert_file_consumer import convertConsumer
 from queues.consumers.preprocess_consumer import preprocessConsumer
 from queues.consumers.scene_changes_consumer import detectScenesConsumer
 from queues.consumers.get_media_duration_consumer import mediaDurationConsumer
-from queues.consumers.video_hash_consumer import videoHashConsumer
+from queues.consumers.video_hash_consumer import sampling_pool, videoHashConsumer
 from queues.consumers.split_consumer import splitConsumer
 from queues.consumers.normalize_video_consumer import normalizeConsumer
 import queues.consumers.process_media_consumer as process_media_consumer
-from pika.adapters.blocking_connection import BlockingChannel
+import queues.task_events as task_events
+from queues.consumer_runtime import ConsumerRuntime, ConsumerSpec
 from dotenv import load_dotenv
 
 from celery_app import app
 
 
-def setup_request_consumers(channel: BlockingChannel):
-    preprocessConsumer.setup_queue(channel)
-    detectScenesConsumer.setup_queue(channel)
-    mediaDurationConsumer.setup_queue(channel)
-    convertConsumer.setup_queue(channel)
-    videoHashConsumer.setup_queue(channel)
-    splitConsumer.setup_queue(channel)
-    normalizeConsumer.setup_queue(channel)
-    process_media_consumer.setup_queue(channel)
+# name -> (setup_queue, default prefetch). Each consumer gets its own connection and
+# handler threads; <NAME>_PREFETCH / <NAME>_WORKERS override the defaults, and
+# ENABLED_CONSUMERS (comma-separated names) lets a deployment run only some queues.
+# Consumers with a process pool take as many messages as they have processes, so
+# unacked messages wait in the broker (and can go to another pod), not in the pool.
+REQUEST_CONSUMERS = {
+    "preprocess": (preprocessConsumer.setup_queue, 2),
+    "detect-scenes": (detectScenesConsumer.setup_queue, detectScenesConsumer.process_pool.workers),
+    "media-duration": (mediaDurationConsumer.setup_queue, 16),
+    "convert": (convertConsumer.setup_queue, convertConsumer.process_pool.workers),
+    "video-hash": (videoHashConsumer.setup_queue, sampling_pool.workers),
+    "split": (splitConsumer.setup_queue, splitConsumer.process_pool.workers),
+    "normalize": (normalizeConsumer.setup_queue, 2),
+    "process-media": (process_media_consumer.setup_queue, 1),
+    "create-video": (setup_create_video_queue, 16),
+    # Feeds GET /tasks/{task_id}/wait and /events of the API served by this process
+    "task-events": (task_events.setup_queue, 64),
+}
+
+
+def consumer_specs() -> list[ConsumerSpec]:
+    enabled = os.getenv("ENABLED_CONSUMERS")
+    names = [name.strip() for name in enabled.split(",")] if enabled else list(REQUEST_CONSUMERS)
+    specs = []
+    for name in names:
+        setup_queue, prefetch = REQUEST_CONSUMERS[name]
+        env_prefix = name.upper().replace("-", "_")
+        workers = os.getenv(f"{env_prefix}_WORKERS")
+        specs.append(ConsumerSpec(
+            name=name,
+            setup_queue=setup_queue,
+            prefetch=int(os.getenv(f"{env_prefix}_PREFETCH", prefetch)),
+            workers=int(workers) if workers else None,
+        ))
+    return specs
 
 HEARTBEAT = 60  # seconds — keeps SSL connection alive through proxies / Istio
 
@@ -63,25 +89,15 @@ load_dotenv()
 
 
 def run_rabbitmq():
-    retry_delay = 5
-    while True:
-        try:
-            connection = setup_rabbitmq_connection()
-            channel = connection.channel()
-            setup_request_consumers(channel)
-            setup_create_video_queue(channel)
-            logging.info("Waiting for messages")
-            retry_delay = 5  # reset on successful connection
-            channel.start_consuming()
-        except Exception as exc:
-            logging.error("RabbitMQ connection lost (%s), reconnecting in %ss...", exc, retry_delay)
-            import time
-            time.sleep(retry_delay)
-            retry_delay = min(retry_delay * 2, 60)  # exponential backoff, cap at 60s
-
-
-rabbitmq_thread = threading.Thread(target=run_rabbitmq, daemon=True)
-rabbitmq_thread.start()
-
-root_path = os.getenv("ROOT_PATH", "")
-uvicorn.run("api:api", host="0.0.0.0", port=8000, root_path=root_path, forwarded_allow_ips="*")
\ No newline at end of file
+    runtime = ConsumerRuntime(setup_rabbitmq_connection)
+    for spec in consumer_specs():
+        runtime.add(spec)
+    runtime.start()
+
+
+# Handler worker processes are spawned and re-import this module; only the parent serves
+if __name__ == "__main__":
+    run_rabbitmq()
+
+    root_path = os.getenv("ROOT_PATH", "")
+    uvicorn.run("api:api", host="0.0.0.0", port=8000, root_path=root_path, forwarded_allow_ips="*")
\ No newline at end of file
@@ -28,7 +28,9 @@ class TrimDecision(BrokerModel):
 class BaseUgcArgs(BrokerModel):
     format_type: Literal["base-ugc"]
     media_files: List[str] = Field(min_length=1)
+    prefetch_media: bool = False
     remove_silence: bool = False
+    silence_stream_copy: bool = False
     generate_voiceover: bool = False
     voiceover_settings: Optional[VoiceoverSettings] = None
     add_captions: bool = False
@@ -36,6 +38,8 @@ class BaseUgcArgs(BrokerModel):
     add_music: bool = False
     music_settings: Optional[MusicSettings] = None
     trim_decisions: Optional[Dict[str, TrimDecision]] = None
+    single_pass_render: bool = False
+    stream_export: bool = False
 
     @model_validator(mode="after")
     def validate_optional_settings(self) -> "BaseUgcArgs":
@@ -45,4 +49,8 @@ class BaseUgcArgs(BrokerModel):
             raise ValueError("captions_settings is required when add_captions=True")
         if self.add_music and self.music_settings is None:
             raise ValueError("music_settings is required when add_music=True")
+        if self.single_pass_render and self.silence_stream_copy:
+            raise ValueError("silence_stream_copy cannot be combined with single_pass_render")
+        if self.stream_export and not self.single_pass_render:
+            raise ValueError("stream_export requires single_pass_render")
         return self
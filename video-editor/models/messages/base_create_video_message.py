@@ -1,3 +1,4 @@
+from enum import StrEnum
 from typing import Annotated, Union
 from pydantic import Field
 
@@ -12,8 +13,18 @@ CreationArgs = Annotated[
 ]
 
 
+class RenderPriority(StrEnum):
+    # A user is waiting on the result
+    Interactive = "interactive"
+    # Pre-renders and bulk jobs, taken only when no interactive render is queued
+    Batch = "batch"
+
+
 class BaseCreateVideoMessage(BrokerModel):
     video_id: str
     node_id: str
     user_id: str
     creation_args: CreationArgs
+    priority: RenderPriority = RenderPriority.Interactive
+    # POSTed the final GET /tasks/{task_id} response when the render finishes
+    callback_url: str | None = None
@@ -3,3 +3,5 @@ from models.broker_model import BrokerModel
 
 class CalculateMediaDurationMessage(BrokerModel):
     media_path: str
+    # More files to measure in the same request; answered in MediaDurationCalculated.durations
+    media_paths: list[str] = []
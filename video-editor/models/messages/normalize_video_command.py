@@ -5,3 +5,5 @@ from models.broker_model import BrokerModel
 class NormalizeVideoCommand(BrokerModel):
     media_id: UUID
     file_key: str
+    # Celery priority (0-10, higher first); the queue default when omitted
+    priority: int | None = None
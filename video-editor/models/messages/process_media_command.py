@@ -6,3 +6,5 @@ class ProcessMediaCommand(BrokerModel):
     media_id: UUID
     file_key: str
     content_type: str
+    # Celery priority (0-10, higher first); the queue default when omitted
+    priority: int | None = None
@@ -4,3 +4,5 @@ from models.broker_model import BrokerModel
 class MediaDurationCalculated(BrokerModel):
     media_path: str
     duration: float
+    # Duration of media_path and of every path in the request's media_paths
+    durations: dict[str, float] = {}
@@ -1,8 +1,11 @@
 from typing import List
 from models.broker_model import BrokerModel
+from models.similar_video import MatchedSegment
 
 
 class VideoHashCalculated(BrokerModel):
     similar_file_id: str | None
     frame_hashes: List[str]
     frame_numbers: List[int]
+    similarity: float | None = None
+    matched_segments: List[MatchedSegment] = []
@@ -3,3 +3,5 @@ from models.broker_model import BrokerModel
 
 class SplitVideoMessage(BrokerModel):
     video_path: str
+    # Cut at keyframes without re-encoding instead of at the exact scene-change frames
+    stream_copy: bool = False
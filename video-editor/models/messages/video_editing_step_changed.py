@@ -12,3 +12,4 @@ class VideoEditingStepChanged(BrokerModel):
     step: str
     status: EditingStepStatus
     error: str | None = None
+    task_id: str | None = None
@@ -1,7 +1,20 @@
 from pydantic import BaseModel
 
+from models.broker_model import BrokerModel
+
+
+class MatchedSegment(BrokerModel):
+    """Frames of the checked video (start_frame..end_frame) that match the similar video's
+    match_start_frame..match_end_frame. Both ranges are inclusive sampled frame numbers."""
+    start_frame: int
+    end_frame: int
+    match_start_frame: int
+    match_end_frame: int
+
 
 class SimilarVideo(BaseModel):
     file_id: str | None
     frame_numbers: list[int]
-    hashes: list[str]
\ No newline at end of file
+    hashes: list[str]
+    similarity: float | None = None
+    matched_segments: list[MatchedSegment] = []
@@ -6,3 +6,5 @@ class VideoGenerated(BrokerModel):
     status: str
     output_media_id: str
     error: str
+    # Celery task id of the render, for GET /tasks/{task_id} waiters
+    task_id: str | None = None
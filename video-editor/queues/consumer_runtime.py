@@ -0,0 +1,112 @@
+import functools
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import pika
+from pika.adapters.blocking_connection import BlockingChannel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConsumerSpec:
+    """One queue consumer: setup_queue declares its queue and calls basic_consume, like
+    BaseConsumer.setup_queue. Up to prefetch messages are handled concurrently by workers threads."""
+    name: str
+    setup_queue: Callable[[BlockingChannel], None]
+    prefetch: int = 1
+    workers: int | None = None
+
+
+class ConsumerRuntime:
+    """Runs every consumer on its own connection and I/O thread.
+
+    Message callbacks are moved off the I/O thread to a per-consumer thread pool, so
+    a long handler neither blocks other queues nor stalls heartbeats. Acks, nacks
+    and publishes made by a handler are handed back to the connection's I/O thread
+    through add_callback_threadsafe, as pika connections are not thread-safe.
+    """
+
+    def __init__(self, connection_factory: Callable[[], pika.BlockingConnection]):
+        self.connection_factory = connection_factory
+        self.specs: list[ConsumerSpec] = []
+
+    def add(self, spec: ConsumerSpec) -> None:
+        self.specs.append(spec)
+
+    def start(self) -> list[threading.Thread]:
+        threads = []
+        for spec in self.specs:
+            thread = threading.Thread(target=self._run, args=(spec,), name=spec.name, daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _run(self, spec: ConsumerSpec) -> None:
+        retry_delay = 5
+        while True:
+            executor = ThreadPoolExecutor(max_workers=spec.workers or spec.prefetch, thread_name_prefix=spec.name)
+            try:
+                connection = self.connection_factory()
+                channel = connection.channel()
+                channel.basic_qos(prefetch_count=spec.prefetch)
+                spec.setup_queue(_DispatchingChannel(channel, connection, executor))
+                logger.info("Consumer %s waiting for messages (prefetch %d)", spec.name, spec.prefetch)
+                retry_delay = 5  # reset on successful connection
+                channel.start_consuming()
+            except Exception as exc:
+                logger.error("Consumer %s lost its connection (%s), reconnecting in %ss...", spec.name, exc, retry_delay)
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60)  # exponential backoff, cap at 60s
+            finally:
+                # Unacked messages are redelivered by the broker; running handlers finish on their own
+                executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _DispatchingChannel:
+    """Channel passed to setup_queue: basic_consume callbacks run on the executor."""
+
+    def __init__(self, channel: BlockingChannel, connection: pika.BlockingConnection, executor: ThreadPoolExecutor):
+        self._channel = channel
+        self._threadsafe = _ThreadsafeChannel(channel, connection)
+        self._executor = executor
+
+    def __getattr__(self, name):
+        return getattr(self._channel, name)
+
+    def basic_consume(self, queue: str, on_message_callback, **kwargs):
+        def dispatch(ch, method, props, body):
+            self._executor.submit(self._handle, on_message_callback, method, props, body)
+
+        return self._channel.basic_consume(queue=queue, on_message_callback=dispatch, **kwargs)
+
+    def _handle(self, on_message_callback, method, props, body) -> None:
+        try:
+            on_message_callback(self._threadsafe, method, props, body)
+        except Exception:
+            logger.error("Unhandled error in consumer callback:\n%s", traceback.format_exc())
+
+
+class _ThreadsafeChannel:
+    """What a handler thread sees as its channel: every call is queued to the I/O thread."""
+
+    def __init__(self, channel: BlockingChannel, connection: pika.BlockingConnection):
+        self._channel = channel
+        self._connection = connection
+
+    def basic_ack(self, **kwargs) -> None:
+        self._call(self._channel.basic_ack, **kwargs)
+
+    def basic_nack(self, **kwargs) -> None:
+        self._call(self._channel.basic_nack, **kwargs)
+
+    def basic_publish(self, **kwargs) -> None:
+        self._call(self._channel.basic_publish, **kwargs)
+
+    def _call(self, method, **kwargs) -> None:
+        self._connection.add_callback_threadsafe(functools.partial(method, **kwargs))
@@ -5,6 +5,7 @@ from pika.adapters.blocking_connection import BlockingChannel
 from pydantic import BaseModel
 
 from models.request_consumer_setup import RequestConsumerSetup
+from queues.process_pool import HandlerProcessPool
 from utils.integration.masstransit_utils import createMassTransitResponse, getExchangeName
 from utils.parser import parse_envelope
 
@@ -15,9 +16,12 @@ class BaseConsumer(Generic[TMessage]):
                  queue_setup: RequestConsumerSetup,
                  message_type: Type[TMessage],
                  possible_response_types: dict[Type, str],
-                 handler: Callable[[TMessage], BaseModel]):
+                 handler: Callable[[TMessage], BaseModel],
+                 process_pool: HandlerProcessPool | None = None):
         self.setup = queue_setup
         self.handler = handler
+        # CPU-bound handlers run in worker processes; the calling thread waits for the result
+        self.process_pool = process_pool
         self.message_type = message_type
         self.response_types = possible_response_types
 
@@ -41,7 +45,10 @@ class BaseConsumer(Generic[TMessage]):
             if not isinstance(envelope.message, self.message_type):
                 raise Exception(f"Incorrect message format. Expected {self.message_type.__name__}, got {type(envelope.message).__name__}")
 
-            result = self.handler(envelope.message)
+            if self.process_pool is not None:
+                result = self.process_pool.run(self.handler, envelope.message)
+            else:
+                result = self.handler(envelope.message)
 
             scheme_name = self.response_types.get(type(result), "")
             
@@ -5,6 +5,7 @@ from models.messages.convert_file_to_constraints_message import ConvertFileToCon
 from models.messages.response.media_converted import MediaConverted
 from models.request_consumer_setup import RequestConsumerSetup
 from queues.consumers.base_consumer import BaseConsumer
+from queues.process_pool import HandlerProcessPool
 
 PUBLISHER_EXCHANGE_NAME = 'convert-media'
 CONSUMER_QUEUE_NAME = 'convert-media-consumer-queue'
@@ -45,7 +46,8 @@ convertConsumer = BaseConsumer(
     setup, 
     ConvertFileToConstraintsMessage, 
     responses,
-    convertHandler
+    convertHandler,
+    process_pool=HandlerProcessPool.from_env("convert")
 )
 
 
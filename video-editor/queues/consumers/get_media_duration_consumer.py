@@ -4,7 +4,7 @@ from models.messages.calculate_media_duration_message import CalculateMediaDurat
 from models.messages.response.media_duration_calculated import MediaDurationCalculated
 from models.request_consumer_setup import RequestConsumerSetup
 from queues.consumers.base_consumer import BaseConsumer
-from utils.video_editing_utils import get_duration
+from utils.media_metadata import probe_many
 
 PUBLISHER_EXCHANGE_NAME = 'calculate-media-duration'
 CONSUMER_QUEUE_NAME = 'calculate-media-duration-consumer-queue'
@@ -15,13 +15,18 @@ def media_duration_handler(message: CalculateMediaDurationMessage):
     if not saving_path:
         raise Exception("MEDIA_SAVING_PATH variable is not specified")
     file_path = message.media_path
-    absolute_path = os.path.join(saving_path, file_path)
+    file_paths = [file_path] + [path for path in message.media_paths if path != file_path]
+    absolute_paths = [os.path.join(saving_path, path) for path in file_paths]
+    missing = [path for path in absolute_paths if not os.path.exists(path)]
+    if missing:
+        raise Exception(f"File not found ({', '.join(missing)})")
 
-    duration = get_duration(absolute_path)
+    durations = [metadata.duration for metadata in probe_many(absolute_paths)]
 
     res = MediaDurationCalculated(
-        duration=duration,
-        media_path=file_path
+        duration=durations[0],
+        media_path=file_path,
+        durations=dict(zip(file_paths, durations))
     )
 
     return res
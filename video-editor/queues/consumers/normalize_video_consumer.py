@@ -1,46 +1,20 @@
 import logging
-import os
-import subprocess
-import tempfile
 
 from models.messages.normalize_video_command import NormalizeVideoCommand
 from queues.consumers.raw_consumer import RawJsonConsumer
-from utils.media_ingest_client import get_presigned_url, overwrite_media
+from tasks.normalize_media import normalize_media
 
 EXCHANGE_NAME = "video-normalize-requested"
 QUEUE_NAME = "video-editor-normalize"
 
 
-def _normalize(input_url: str, output_path: str):
-    # Input is a presigned HTTP URL — ffmpeg streams it directly, no local download needed.
-    # Output goes to a temp file because -movflags +faststart requires seekable output.
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", input_url,
-        "-c:v", "libx264", "-crf", "23", "-preset", "fast",
-        "-c:a", "aac", "-b:a", "128k",
-        "-movflags", "+faststart",
-        output_path,
-    ]
-    logging.info("Running ffmpeg normalize")
-    subprocess.run(cmd, check=True, capture_output=True)
-
-
 def normalizeHandler(message: NormalizeVideoCommand):
-    logging.info("Normalizing video — MediaId=%s FileKey=%s", message.media_id, message.file_key)
-
-    input_url = get_presigned_url(str(message.media_id))
-    output_tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4").name
-
-    try:
-        _normalize(input_url, output_tmp)
-        overwrite_media(str(message.media_id), output_tmp)
-        logging.info("Normalized video uploaded back to '%s'", message.file_key)
-    finally:
-        try:
-            os.remove(output_tmp)
-        except OSError:
-            pass
+    # Transcoding runs on the Celery media queue, next to tasks.process_media
+    normalize_media.apply_async(
+        args=[str(message.media_id), message.file_key],
+        priority=message.priority,
+    )
+    logging.info("Dispatched normalize_media task for MediaId=%s", message.media_id)
 
 
 normalizeConsumer = RawJsonConsumer(
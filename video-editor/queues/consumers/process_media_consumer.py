@@ -13,7 +13,6 @@ def setup_queue(channel: BlockingChannel):
     channel.exchange_declare(exchange=EXCHANGE_NAME, exchange_type="fanout", durable=True)
     channel.queue_declare(queue=QUEUE_NAME, durable=True)
     channel.queue_bind(queue=QUEUE_NAME, exchange=EXCHANGE_NAME)
-    channel.basic_qos(prefetch_count=1)
     channel.basic_consume(queue=QUEUE_NAME, on_message_callback=_on_message)
     logging.info("Consumer ready on exchange '%s', queue '%s'", EXCHANGE_NAME, QUEUE_NAME)
 
@@ -22,7 +21,10 @@ def _on_message(ch: BlockingChannel, method, props, body: bytes):
     logging.info("Received message on '%s'", EXCHANGE_NAME)
     try:
         message = ProcessMediaCommand.model_validate_json(body)
-        process_media.delay(str(message.media_id), message.file_key, message.content_type)
+        process_media.apply_async(
+            args=[str(message.media_id), message.file_key, message.content_type],
+            priority=message.priority,
+        )
         logging.info("Dispatched process_media task for MediaId=%s", message.media_id)
     except Exception:
         import traceback
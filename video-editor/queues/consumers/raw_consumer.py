@@ -31,7 +31,6 @@ class RawJsonConsumer(Generic[TMessage]):
         channel.exchange_declare(exchange=self.exchange_name, exchange_type="fanout", durable=True)
         channel.queue_declare(queue=self.queue_name, durable=True)
         channel.queue_bind(queue=self.queue_name, exchange=self.exchange_name)
-        channel.basic_qos(prefetch_count=1)
         channel.basic_consume(queue=self.queue_name, on_message_callback=self._on_message)
         logging.info("Consumer ready on exchange '%s', queue '%s'", self.exchange_name, self.queue_name)
 
@@ -5,6 +5,7 @@ from models.messages.response.error.processing_error import ProcessingError
 from models.messages.response.scene_changes_detected import SceneChangesDetected
 from models.request_consumer_setup import RequestConsumerSetup
 from queues.consumers.base_consumer import BaseConsumer
+from queues.process_pool import HandlerProcessPool
 from utils.scene_changes_detector import get_changes_timecodes
 
 PUBLISHER_EXCHANGE_NAME = 'detect-scene-changes'
@@ -48,7 +49,8 @@ detectScenesConsumer = BaseConsumer(
     setup,
     DetectSceneChangesMessage,
     responses,
-    detect_scene_changes_handler
+    detect_scene_changes_handler,
+    process_pool=HandlerProcessPool.from_env("detect-scenes")
 )
 
 
@@ -5,6 +5,7 @@ from models.messages.response.video_splitted import VideoSplitted
 from models.messages.split_video_message import SplitVideoMessage
 from models.request_consumer_setup import RequestConsumerSetup
 from queues.consumers.base_consumer import BaseConsumer
+from queues.process_pool import HandlerProcessPool
 from utils.video_editing_utils import split_video
 
 PUBLISHER_EXCHANGE_NAME = 'split-video'
@@ -22,7 +23,7 @@ def splitHandler(message: SplitVideoMessage):
     absolute_video_path = os.path.join(saving_path, video_path)
 
     try:
-        parts = split_video(absolute_video_path, os.path.dirname(absolute_video_path))
+        parts = split_video(absolute_video_path, os.path.dirname(absolute_video_path), message.stream_copy)
     except Exception as e:
         error_response = ProcessingError(error_message=str(e))
         return error_response
@@ -49,7 +50,8 @@ splitConsumer = BaseConsumer(
     setup, 
     SplitVideoMessage, 
     responses,
-    splitHandler
+    splitHandler,
+    process_pool=HandlerProcessPool.from_env("split")
 )
 
 
@@ -3,13 +3,17 @@ from models.messages.calculate_video_hash_message import CalculateVideoHashMessa
 from models.messages.response.video_hash_calculated import VideoHashCalculated
 from models.request_consumer_setup import RequestConsumerSetup
 from queues.consumers.base_consumer import BaseConsumer
-from utils.video_hasher import find_similar_video
+from queues.process_pool import HandlerProcessPool
+from utils.video_hasher import find_similar_hashes, sample_frame_hashes, store_hashes
 
 
 PUBLISHER_EXCHANGE_NAME = 'calculate-hash'
 CONSUMER_QUEUE_NAME = 'calculate-hash-consumer-queue'
 RESPONSE_MESSAGE_TYPE = "scheme:hash-calculated"
 
+# Only decoding and hashing run in worker processes; the hash index stays in this process
+sampling_pool = HandlerProcessPool.from_env("video-hash")
+
 def convertHandler(message: CalculateVideoHashMessage):
     saving_path = os.getenv("MEDIA_SAVING_PATH")
     if not saving_path:
@@ -17,12 +21,18 @@ def convertHandler(message: CalculateVideoHashMessage):
     
     absolute_path = os.path.join(saving_path, message.video_path)
     
-    similar_video = find_similar_video(absolute_path)
+    hashes, frame_numbers = sampling_pool.run(sample_frame_hashes, absolute_path)
+    similar_video = find_similar_hashes(absolute_path, hashes, frame_numbers, exclude_file_id=message.video_path)
+    if similar_video.file_id is None:
+        # New video: make it findable for the next messages
+        store_hashes(message.video_path, similar_video.hashes, similar_video.frame_numbers)
 
     res = VideoHashCalculated(
         similar_file_id=similar_video.file_id,
         frame_hashes=similar_video.hashes,
-        frame_numbers=similar_video.frame_numbers
+        frame_numbers=similar_video.frame_numbers,
+        similarity=similar_video.similarity,
+        matched_segments=similar_video.matched_segments
     )
     
     return res
@@ -2,6 +2,7 @@ import logging
 
 from pika.adapters.blocking_connection import BlockingChannel
 
+from celery_app import RENDER_PRIORITIES
 from models.messages.base_create_video_message import BaseCreateVideoMessage
 from tasks.create_video import create_video
 from utils.parser import parse_message
@@ -27,6 +28,6 @@ def _on_message(ch: BlockingChannel, method, props, body):
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
         return
 
-    create_video.delay(message.model_dump())
+    create_video.apply_async(args=[message.model_dump()], priority=RENDER_PRIORITIES[message.priority])
     ch.basic_ack(delivery_tag=method.delivery_tag)
     logger.info(f"Dispatched video task {message.video_id} to Celery")
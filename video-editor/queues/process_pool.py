@@ -0,0 +1,60 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_TASKS_PER_CHILD = 20
+
+
+class HandlerProcessPool:
+    """Process pool for CPU-bound message handlers, created on first use.
+
+    Workers are spawned (not forked: the parent runs pika and handler threads) and
+    replaced after max_tasks_per_child tasks, so memory that OpenCV/MoviePy keep
+    growing is given back. fn and its arguments must be picklable, i.e. module-level
+    functions and pydantic messages.
+    """
+
+    def __init__(self, workers: int, max_tasks_per_child: int | None = DEFAULT_MAX_TASKS_PER_CHILD):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str, default_workers: int | None = None) -> "HandlerProcessPool":
+        """Sized by <NAME>_PROCESSES (default: CPU count) and <NAME>_MAX_TASKS_PER_CHILD."""
+        prefix = name.upper().replace("-", "_")
+        workers = int(os.getenv(f"{prefix}_PROCESSES", default_workers or os.cpu_count() or 1))
+        max_tasks = int(os.getenv(f"{prefix}_MAX_TASKS_PER_CHILD", DEFAULT_MAX_TASKS_PER_CHILD))
+        return cls(workers, max_tasks or None)
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        """Run fn(*args) in a worker process and wait for the result."""
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); drop the pool so the next message gets a fresh one
+            logger.error("Handler process pool broke while running %s, recreating it", fn.__name__)
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
@@ -0,0 +1,47 @@
+import logging
+import time
+from typing import NamedTuple
+
+import pika
+
+logger = logging.getLogger(__name__)
+
+
+class QueueStats(NamedTuple):
+    depth: int
+    consumers: int
+    # How long the message a worker takes next has been waiting; None when the queue is empty.
+    # On a priority queue that is the oldest message of the highest waiting priority.
+    oldest_message_age_seconds: float | None
+
+
+def get_queue_stats(amqp_url: str, queue_names: list[str]) -> dict[str, QueueStats]:
+    """Depth and wait time of Celery queues, for autoscaling.
+
+    The head message is fetched and immediately requeued (it keeps its place) to
+    read the published_at header celery_app stamps on every task. Queues that
+    don't exist yet are reported as empty.
+    """
+    stats = {}
+    connection = pika.BlockingConnection(pika.URLParameters(amqp_url))
+    try:
+        for name in queue_names:
+            channel = connection.channel()
+            try:
+                declared = channel.queue_declare(queue=name, passive=True)
+            except pika.exceptions.ChannelClosedByBroker:
+                # 404: no worker or producer has declared it yet
+                stats[name] = QueueStats(0, 0, None)
+                continue
+            age = None
+            if declared.method.message_count:
+                method, properties, _ = channel.basic_get(queue=name, auto_ack=False)
+                if method is not None:
+                    channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+                    published_at = (properties.headers or {}).get("published_at")
+                    age = max(0.0, time.time() - published_at) if published_at else None
+            stats[name] = QueueStats(declared.method.message_count, declared.method.consumer_count, age)
+            channel.close()
+    finally:
+        connection.close()
+    return stats
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
+
+from pika.adapters.blocking_connection import BlockingChannel
+
+from models.messages.video_editing_step_changed import VideoEditingStepChanged
+from models.video_generated import VideoGenerated
+
+logger = logging.getLogger(__name__)
+
+# Exchanges tasks.create_video publishes to
+RESPONSE_EXCHANGE_NAME = "video-generated"
+PROGRESS_EXCHANGE_NAME = "video-editing-step-changed"
+
+TERMINAL_STATUSES = {"SUCCESS", "FAILURE"}
+# Latest status kept per task, so a waiter arriving after the event doesn't hit the result backend
+MAX_TRACKED_TASKS = 10000
+
+
+def task_status_from_event(exchange: str, body: dict) -> dict | None:
+    """The GET /tasks/{task_id} response a video-generated or video-editing-step-changed event implies.
+
+    None for events of tasks submitted before they carried a task id.
+    """
+    if exchange == RESPONSE_EXCHANGE_NAME:
+        event = VideoGenerated.model_validate(body)
+        if event.task_id is None:
+            return None
+        if event.status == "Success":
+            return {"task_id": event.task_id, "status": "SUCCESS", "result": body}
+        return {"task_id": event.task_id, "status": "FAILURE", "error": event.error}
+
+    event = VideoEditingStepChanged.model_validate(body)
+    if event.task_id is None:
+        return None
+    return {"task_id": event.task_id, "status": "STARTED", "step": event.step, "step_status": event.status}
+
+
+class TaskEventHub:
+    """Task status updates from the broker, fanned out to the API's waiting requests.
+
+    publish() is called from a consumer thread; subscribers are asyncio queues on
+    the API's event loop, fed through call_soon_threadsafe.
+    """
+
+    def __init__(self, max_tracked: int = MAX_TRACKED_TASKS):
+        self.max_tracked = max_tracked
+        self._latest: OrderedDict[str, dict] = OrderedDict()
+        self._subscribers: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, status: dict) -> None:
+        task_id = status["task_id"]
+        with self._lock:
+            latest = self._latest.get(task_id)
+            if latest is not None and latest["status"] in TERMINAL_STATUSES:
+                # A late step event must not turn a finished task back into a running one
+                return
+            self._latest[task_id] = status
+            self._latest.move_to_end(task_id)
+            while len(self._latest) > self.max_tracked:
+                self._latest.popitem(last=False)
+            subscribers = list(self._subscribers.get(task_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, status)
+
+    def latest(self, task_id: str) -> dict | None:
+        with self._lock:
+            return self._latest.get(task_id)
+
+    @contextmanager
+    def subscribe(self, task_id: str) -> Iterator[asyncio.Queue]:
+        """Queue receiving every status published for task_id while the context is open."""
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(task_id, []).append(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers[task_id]
+                subscribers.remove(entry)
+                if not subscribers:
+                    del self._subscribers[task_id]
+
+    async def wait(self, task_id: str, timeout: float) -> dict | None:
+        """The task's terminal status, or its latest known status once timeout passes."""
+        deadline = time.monotonic() + timeout
+        with self.subscribe(task_id) as queue:
+            status = self.latest(task_id)
+            while status is None or status["status"] not in TERMINAL_STATUSES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    status = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+        return status
+
+
+hub = TaskEventHub()
+
+
+def setup_queue(channel: BlockingChannel):
+    """Every API instance gets its own server-named queue, so each sees every task's events."""
+    result = channel.queue_declare(queue="", exclusive=True, auto_delete=True)
+    queue_name = result.method.queue
+    for exchange_name in (RESPONSE_EXCHANGE_NAME, PROGRESS_EXCHANGE_NAME):
+        channel.exchange_declare(exchange=exchange_name, exchange_type="fanout", durable=True)
+        channel.queue_bind(queue=queue_name, exchange=exchange_name)
+    channel.basic_consume(queue=queue_name, on_message_callback=_on_message, auto_ack=True)
+    logging.info("Task event listener ready on queue '%s'", queue_name)
+
+
+def _on_message(ch: BlockingChannel, method, props, body: bytes):
+    try:
+        status = task_status_from_event(method.exchange, json.loads(body))
+    except Exception as exc:
+        logger.warning("Ignoring malformed task event from '%s': %s", method.exchange, exc)
+        return
+    if status is not None:
+        hub.publish(status)
@@ -1,6 +1,7 @@
 import logging
 import os
 
+import requests
 from kombu import Connection, Exchange, Producer
 
 from celery_app import app
@@ -13,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 PROGRESS_EXCHANGE_NAME = "video-editing-step-changed"
 RESPONSE_EXCHANGE_NAME = "video-generated"
+CALLBACK_TIMEOUT = 10
 
 
 @app.task(
@@ -34,15 +36,28 @@ def create_video(self, payload: dict) -> dict:
         factory = EditorFactory()
         editor = factory.get_editor(message.creation_args)
 
-        progress_cb = _make_progress_callback(message, broker_url)
+        progress_cb = _make_progress_callback(message, broker_url, self.request.id)
         output_media_id = editor.edit_video(
             message.creation_args,
             workspace_base,
             video_id=message.video_id,
             progress_cb=progress_cb,
+            # Keep the checkpoint for the retry unless this attempt is the last one
+            final_attempt=self.request.retries >= self.max_retries,
         )
     except Exception as exc:
         logger.error(f"Task failed for video {message.video_id}: {exc}")
+        if self.request.retries >= self.max_retries:
+            # Waiters on GET /tasks/{task_id}/wait and the callback learn about failures too
+            failed = VideoGenerated(
+                video_id=message.video_id,
+                status="Failed",
+                output_media_id="",
+                error=str(exc),
+                task_id=self.request.id,
+            )
+            _publish(failed.model_dump(by_alias=True), RESPONSE_EXCHANGE_NAME, broker_url)
+            _notify_callback(message.callback_url, {"task_id": self.request.id, "status": "FAILURE", "error": str(exc)})
         raise self.retry(exc=exc, countdown=30)
 
     result = VideoGenerated(
@@ -50,12 +65,17 @@ def create_video(self, payload: dict) -> dict:
         status="Success",
         output_media_id=output_media_id,
         error="",
+        task_id=self.request.id,
     )
     _publish(result.model_dump(by_alias=True), RESPONSE_EXCHANGE_NAME, broker_url)
+    _notify_callback(
+        message.callback_url,
+        {"task_id": self.request.id, "status": "SUCCESS", "result": result.model_dump(by_alias=True)},
+    )
     return result.model_dump(by_alias=True)
 
 
-def _make_progress_callback(message: BaseCreateVideoMessage, broker_url: str):
+def _make_progress_callback(message: BaseCreateVideoMessage, broker_url: str, task_id: str):
     def callback(step: str, status: EditingStepStatus, error: str | None) -> None:
         event = VideoEditingStepChanged(
             video_id=message.video_id,
@@ -64,6 +84,7 @@ def _make_progress_callback(message: BaseCreateVideoMessage, broker_url: str):
             step=step,
             status=status,
             error=error,
+            task_id=task_id,
         )
         _publish(event.model_dump(by_alias=True), PROGRESS_EXCHANGE_NAME, broker_url)
 
@@ -78,3 +99,12 @@ def _publish(body: dict, exchange_name: str, broker_url: str) -> None:
                 producer.publish(body, exchange=exchange, declare=[exchange])
     except Exception as e:
         logger.warning(f"Failed to publish to {exchange_name}: {e}")
+
+
+def _notify_callback(callback_url: str | None, status: dict) -> None:
+    if not callback_url:
+        return
+    try:
+        requests.post(callback_url, json=status, timeout=CALLBACK_TIMEOUT).raise_for_status()
+    except Exception as e:
+        logger.warning(f"Failed to notify callback {callback_url}: {e}")
@@ -0,0 +1,36 @@
+import logging
+import os
+import tempfile
+
+from celery_app import app
+from utils.idempotency_store import get_idempotency_store
+from utils.media_ingest_client import get_presigned_url, overwrite_media
+from utils.video_normalization import normalization_key, normalize
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(name="tasks.normalize_media", bind=True, max_retries=3, default_retry_delay=30)
+def normalize_media(self, media_id: str, file_key: str):
+    key = normalization_key(media_id)
+    store = get_idempotency_store()
+    if not store.claim(key, self.request.id):
+        logger.info("Normalization of MediaId=%s is already done or in progress, skipping", media_id)
+        return
+
+    logger.info("Normalizing video — MediaId=%s FileKey=%s", media_id, file_key)
+    try:
+        # Input is a presigned HTTP URL — ffmpeg streams it directly, no local download needed.
+        # Output goes to a temp file because -movflags +faststart requires seekable output.
+        input_url = get_presigned_url(media_id)
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "normalized.mp4")
+            if normalize(input_url, output_path):
+                overwrite_media(media_id, output_path)
+                logger.info("Normalized video uploaded back to '%s'", file_key)
+    except Exception as exc:
+        logger.error("Normalization failed for MediaId=%s: %s", media_id, exc)
+        store.release(key, self.request.id)
+        raise self.retry(exc=exc)
+
+    store.complete(key, self.request.id)
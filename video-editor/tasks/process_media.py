@@ -2,11 +2,15 @@ import logging
 import os
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 from celery_app import app
 from models.messages.media_processing_completed import MediaProcessingCompleted
 from utils.broker.publisher import publish_message
+from utils.ffmpeg_commands import normalize_output_args
 from utils.media_ingest_client import MediaVariant, get_presigned_url, overwrite_media, upload_media
+from utils.idempotency_store import get_idempotency_store
+from utils.video_normalization import NormalizationPlan, normalization_key, plan_normalization
 
 IMAGE_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
 VIDEO_CONTENT_TYPES = {"video/mp4", "video/webm"}
@@ -20,38 +24,98 @@ COMPLETED_EXCHANGE = "media-processing-completed"
 logger = logging.getLogger(__name__)
 
 
-def _run_ffmpeg(cmd: list[str]) -> None:
-    try:
-        subprocess.run(cmd, check=True, capture_output=True)
-    except subprocess.CalledProcessError as exc:
-        logger.error(
-            "ffmpeg failed (rc=%d):\nstdout: %s\nstderr: %s",
-            exc.returncode,
-            exc.stdout.decode(errors="replace"),
-            exc.stderr.decode(errors="replace"),
+def _build_process_command(
+    input_url: str,
+    thumbnail_fds: list[tuple[int, int]],
+    normalized_path: str | None,
+    plan: NormalizationPlan | None = None,
+) -> list[str]:
+    """One ffmpeg run over a single decode of input_url.
+
+    The decoded video is split into one branch per (width, fd) thumbnail, each
+    written as a single WebP image to the pipe fd, plus the normalized MP4 when
+    normalized_path is given. Streams the plan copies bypass the decoder.
+    """
+    copy_video = plan is not None and plan.copy_video
+    encode_video = normalized_path is not None and not copy_video
+    branches = len(thumbnail_fds) + (1 if encode_video else 0)
+    labels = [f"[v{i}]" for i in range(branches)]
+    filters = [f"[0:v]split={branches}{''.join(labels)}"] if branches > 1 else [f"[0:v]null{labels[0]}"]
+    for i, (width, _) in enumerate(thumbnail_fds):
+        filters.append(f"{labels[i]}scale={width}:-1[thumb{i}]")
+
+    cmd = ["ffmpeg", "-y", "-v", "error", "-i", input_url, "-filter_complex", ";".join(filters)]
+    for i, (_, fd) in enumerate(thumbnail_fds):
+        cmd += ["-map", f"[thumb{i}]", "-frames:v", "1", "-c:v", "libwebp", "-f", "image2pipe", f"pipe:{fd}"]
+    if normalized_path:
+        cmd += normalize_output_args(
+            normalized_path,
+            copy_video=copy_video,
+            copy_audio=plan is not None and plan.copy_audio,
+            video_source=labels[-1] if encode_video else "0:v:0",
         )
-        raise
-
-
-def _generate_thumbnail(input_url: str, output_path: str, width: int, is_video: bool):
-    scale_filter = f"scale={width}:-1"
-    cmd = ["ffmpeg", "-y", "-i", input_url]
-    if is_video:
-        cmd += ["-vframes", "1"]
-    cmd += ["-vf", scale_filter, output_path]
-    _run_ffmpeg(cmd)
-
-
-def _normalize_video(input_url: str, output_path: str):
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", input_url,
-        "-c:v", "libx264", "-crf", "23", "-preset", "fast",
-        "-c:a", "aac", "-b:a", "128k",
-        "-movflags", "+faststart",
-        output_path,
+    return cmd
+
+
+def _read_webp(fd: int) -> bytes:
+    # ffmpeg keeps the pipe open until every output is done, so read exactly one RIFF file
+    with os.fdopen(fd, "rb") as pipe:
+        header = pipe.read(8)
+        if len(header) < 8 or header[:4] != b"RIFF":
+            raise Exception("ffmpeg did not produce a thumbnail")
+        body = pipe.read(int.from_bytes(header[4:8], "little"))
+    return header + body
+
+
+def _process_in_one_pass(input_url: str, tmp: str, media_id: str, normalize_video: bool) -> None:
+    """Thumbnails and (with normalize_video) the normalized MP4 from one download and decode.
+
+    Each thumbnail is uploaded as soon as ffmpeg has written it, while the
+    normalized video is still encoding. Videos that are already faststart
+    H.264/AAC MP4s are not re-uploaded; other compliant streams are copied.
+    """
+    thumbnails = [
+        (THUMB_TINY_WIDTH, MediaVariant.Tiny, os.path.join(tmp, "tiny.webp")),
+        (THUMB_MEDIUM_WIDTH, MediaVariant.Medium, os.path.join(tmp, "medium.webp")),
     ]
-    _run_ffmpeg(cmd)
+    pipes = [os.pipe() for _ in thumbnails]
+    plan = plan_normalization(input_url) if normalize_video else None
+    if plan is not None and plan.skip:
+        logger.info("Video MediaId=%s is already normalized", media_id)
+    normalized_path = os.path.join(tmp, "normalized.mp4") if plan is not None and not plan.skip else None
+    cmd = _build_process_command(
+        input_url, [(width, write_fd) for (width, _, _), (_, write_fd) in zip(thumbnails, pipes)], normalized_path, plan,
+    )
+
+    def upload_thumbnail(read_fd: int, variant: MediaVariant, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(_read_webp(read_fd))
+        upload_media(path, content_type="image/webp", parent_media_id=media_id, variant=variant)
+        logger.info("Uploaded %s thumbnail for MediaId=%s", variant.value, media_id)
+
+    stderr_path = os.path.join(tmp, "ffmpeg.log")
+    with open(stderr_path, "wb") as stderr, ThreadPoolExecutor(max_workers=len(thumbnails)) as pool:
+        try:
+            process = subprocess.Popen(cmd, stderr=stderr, pass_fds=[write_fd for _, write_fd in pipes])
+        finally:
+            # Only ffmpeg holds the write ends now, so the readers see EOF if it dies
+            for _, write_fd in pipes:
+                os.close(write_fd)
+        uploads = [
+            pool.submit(upload_thumbnail, read_fd, variant, path)
+            for (read_fd, _), (_, variant, path) in zip(pipes, thumbnails)
+        ]
+        returncode = process.wait()
+        if returncode != 0:
+            with open(stderr_path, errors="replace") as f:
+                logger.error("ffmpeg failed (rc=%d):\nstderr: %s", returncode, f.read())
+            raise subprocess.CalledProcessError(returncode, cmd)
+        for upload in uploads:
+            upload.result()
+
+    if normalized_path:
+        overwrite_media(media_id=media_id, file_path=normalized_path)
+        logger.info("Uploaded normalized video for MediaId=%s", media_id)
 
 
 def _publish_result(result: MediaProcessingCompleted):
@@ -62,28 +126,28 @@ def _publish_result(result: MediaProcessingCompleted):
 def process_media(self, media_id: str, file_key: str, content_type: str):
     is_video = content_type in VIDEO_CONTENT_TYPES
 
+    # A duplicate of this task skips everything; normalization is skipped when
+    # tasks.normalize_media already did (or is doing) it for the same media
+    store = get_idempotency_store()
+    owner = self.request.id
+    process_key = f"process-media:{media_id}"
+    if not store.claim(process_key, owner):
+        logger.info("MediaId=%s is already processed or in progress, skipping", media_id)
+        return
+    claimed = [process_key]
+    if is_video and store.claim(normalization_key(media_id), owner):
+        claimed.append(normalization_key(media_id))
+
     logger.info("Processing media — MediaId=%s FileKey=%s ContentType=%s", media_id, file_key, content_type)
 
     try:
         input_url = get_presigned_url(media_id)
 
         with tempfile.TemporaryDirectory() as tmp:
-            tiny_path = os.path.join(tmp, "tiny.webp")
-            medium_path = os.path.join(tmp, "medium.webp")
-
-            _generate_thumbnail(input_url, tiny_path, THUMB_TINY_WIDTH, is_video)
-            upload_media(tiny_path, content_type="image/webp", parent_media_id=media_id, variant=MediaVariant.Tiny)
-            logger.info("Uploaded tiny thumbnail for MediaId=%s", media_id)
-
-            _generate_thumbnail(input_url, medium_path, THUMB_MEDIUM_WIDTH, is_video)
-            upload_media(medium_path, content_type="image/webp", parent_media_id=media_id, variant=MediaVariant.Medium)
-            logger.info("Uploaded medium thumbnail for MediaId=%s", media_id)
+            _process_in_one_pass(input_url, tmp, media_id, normalize_video=len(claimed) > 1)
 
-            if is_video:
-                normalized_path = os.path.join(tmp, "normalized.mp4")
-                _normalize_video(input_url, normalized_path)
-                overwrite_media(media_id=media_id, file_path=normalized_path)
-                logger.info("Uploaded normalized video → %s", file_key)
+        for key in claimed:
+            store.complete(key, owner)
 
         _publish_result(MediaProcessingCompleted(
             media_id=media_id,
@@ -94,6 +158,8 @@ def process_media(self, media_id: str, file_key: str, content_type: str):
 
     except Exception as exc:
         logger.error("Media processing failed for MediaId=%s: %s", media_id, exc)
+        for key in claimed:
+            store.release(key, owner)
 
         if self.request.retries >= self.max_retries:
             _publish_result(MediaProcessingCompleted(
@@ -3,6 +3,7 @@ import pytest
 from moviepy import AudioArrayClip, ColorClip
 
 from editors.base_ugc.context import EditingContext
+from tests.fake_media_ingest import FakeMediaIngest
 from models.creation_args.base_ugc import BaseUgcArgs
 from utils.editing_workspace import EditingWorkspace
 
@@ -34,6 +35,23 @@ def sample_video_with_audio(tmp_path_factory) -> str:
     return path
 
 
+@pytest.fixture(scope="session")
+def sample_video_with_silence(tmp_path_factory) -> str:
+    """4-second video with 440 Hz audio and a silent gap between 1.5s and 3.0s."""
+    path = str(tmp_path_factory.mktemp("fixtures") / "sample_silence.mp4")
+    sample_rate = 44100
+    duration = 4
+    t = np.linspace(0, duration, duration * sample_rate)
+    samples = np.sin(2 * np.pi * 440 * t)
+    samples[(t >= 1.5) & (t < 3.0)] = 0
+    samples = samples.reshape(-1, 1)
+    audio = AudioArrayClip(np.hstack([samples, samples]), fps=sample_rate).with_duration(duration)
+    clip = ColorClip(size=(1080, 1920), color=(40, 200, 120), duration=duration).with_audio(audio)
+    clip.write_videofile(path, fps=30, codec="libx264", audio_codec="aac", logger=None)
+    clip.close()
+    return path
+
+
 @pytest.fixture(scope="session")
 def sample_audio(tmp_path_factory) -> str:
     """10-second 440 Hz sine wave mp3 (longer than test videos to avoid duration edge cases)."""
@@ -48,6 +66,29 @@ def sample_audio(tmp_path_factory) -> str:
     return path
 
 
+# --- media-ingest stand-in ---
+
+@pytest.fixture
+def fake_media_ingest(monkeypatch):
+    """Local media-ingest + storage server; media_ingest_client is pointed at it."""
+    fake = FakeMediaIngest().start()
+    monkeypatch.setattr("utils.media_ingest_client._BASE_URL", fake.base_url)
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def multipart_storage(monkeypatch):
+    """Storage credentials set and small multipart thresholds, for use with fake_media_ingest."""
+    from utils.storage import multipart_upload
+
+    monkeypatch.setenv("MINIO_ACCESS_KEY", "test")
+    monkeypatch.setenv("MINIO_SECRET_KEY", "test")
+    monkeypatch.setattr(multipart_upload, "MULTIPART_THRESHOLD", 10)
+    monkeypatch.setattr(multipart_upload, "PART_SIZE", 5 * 1024 * 1024)
+    monkeypatch.setattr(multipart_upload.time, "sleep", lambda _: None)
+
+
 # --- EditingContext factory ---
 
 @pytest.fixture
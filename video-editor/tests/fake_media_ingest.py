@@ -0,0 +1,126 @@
+"""In-process stand-in for the media-ingest internal API and the storage it presigns URLs for."""
+import hashlib
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeMediaIngest:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.completed: set[str] = set()
+        self.connections = 0
+        # S3 multipart subset: upload id -> {part number: bytes}
+        self.multipart: dict[str, dict[int, bytes]] = {}
+        self.part_requests: list[int] = []
+        self.failing_parts: set[int] = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "FakeMediaIngest":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add(self, data: bytes) -> str:
+        media_id = str(uuid.uuid4())
+        self.objects[media_id] = data
+        return media_id
+
+    def _count_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+
+def _make_handler(fake: FakeMediaIngest):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+        def setup(self):
+            super().setup()
+            fake._count_connection()
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if m := re.fullmatch(r"/api/internal/media/([^/]+)/link", path):
+                return self._json({"link": f"{fake.base_url}/storage/{m[1]}"})
+            if m := re.fullmatch(r"/api/internal/media/([^/]+)/presigned-upload", path):
+                return self._json({"uploadUrl": f"{fake.base_url}/storage/{m[1]}"})
+            if m := re.fullmatch(r"/storage/([^/]+)", path):
+                return self._body(fake.objects[m[1]])
+            self._body(b"", status=404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query, keep_blank_values=True)
+            body = self._read_body()
+            if m := re.fullmatch(r"/storage/([^/]+)", url.path):
+                if "uploads" in query:
+                    upload_id = str(uuid.uuid4())
+                    fake.multipart[upload_id] = {}
+                    return self._xml(
+                        f"<InitiateMultipartUploadResult><Bucket>storage</Bucket><Key>{m[1]}</Key>"
+                        f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+                    )
+                parts = fake.multipart.pop(query["uploadId"][0])
+                numbers = [int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", body)]
+                fake.objects[m[1]] = b"".join(parts[n] for n in numbers)
+                return self._xml(
+                    f"<CompleteMultipartUploadResult><Bucket>storage</Bucket><Key>{m[1]}</Key>"
+                    f"<ETag>\"done\"</ETag></CompleteMultipartUploadResult>"
+                )
+            if self.path == "/api/internal/media/presigned-upload":
+                media_id = str(uuid.uuid4())
+                return self._json({"mediaId": media_id, "uploadUrl": f"{fake.base_url}/storage/{media_id}"})
+            if m := re.fullmatch(r"/api/internal/media/([^/]+)/upload-completed", self.path):
+                fake.completed.add(m[1])
+                return self._body(b"", status=204)
+            self._body(b"", status=404)
+
+        def do_PUT(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            m = re.fullmatch(r"/storage/([^/]+)", url.path)
+            body = self._read_body()
+            if "partNumber" in query:
+                part_number = int(query["partNumber"][0])
+                fake.part_requests.append(part_number)
+                if part_number in fake.failing_parts:
+                    return self._xml("<Error><Code>AccessDenied</Code></Error>", status=403)
+                fake.multipart[query["uploadId"][0]][part_number] = body
+                self.send_response(200)
+                self.send_header("ETag", f'"{hashlib.md5(body).hexdigest()}"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            fake.objects[m[1]] = body
+            self._body(b"")
+
+        def _read_body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def _xml(self, payload: str, status: int = 200) -> None:
+            self._body(payload.encode(), status=status, content_type="application/xml")
+
+        def _json(self, payload: dict) -> None:
+            self._body(json.dumps(payload).encode(), content_type="application/json")
+
+        def _body(self, data: bytes, status: int = 200, content_type: str = "application/octet-stream") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
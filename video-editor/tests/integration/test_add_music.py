@@ -1,5 +1,5 @@
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import pytest
 from moviepy import VideoFileClip
@@ -23,15 +23,8 @@ def test_add_music_produces_output(make_context, sample_video_with_audio, sample
     ctx = make_context(args)
     ctx.current_video_path = sample_video_with_audio
 
-    # Mock S3 download to copy sample_audio instead
-    def fake_download(bucket, key, local_path):
-        import shutil
-        shutil.copy(sample_audio, local_path)
-
-    mock_client = MagicMock()
-    mock_client.download_file.side_effect = fake_download
-
-    with patch("editors.base_ugc.steps.add_music.get_s3_client", return_value=mock_client):
+    # Serve the local sample instead of a presigned media-ingest URL
+    with patch("editors.base_ugc.steps.add_music.get_presigned_url", return_value=sample_audio):
         AddMusicStep().execute(ctx)
 
     assert ctx.current_video_path is not None
@@ -50,16 +43,25 @@ def test_add_music_to_video_without_audio(make_context, sample_video, sample_aud
     ctx = make_context(args)
     ctx.current_video_path = sample_video
 
-    def fake_download(bucket, key, local_path):
-        import shutil
-        shutil.copy(sample_audio, local_path)
+    with patch("editors.base_ugc.steps.add_music.get_presigned_url", return_value=sample_audio):
+        AddMusicStep().execute(ctx)
+
+    result = VideoFileClip(ctx.current_video_path)
+    assert result.audio is not None
+    result.close()
+
 
-    mock_client = MagicMock()
-    mock_client.download_file.side_effect = fake_download
+@pytest.mark.integration
+def test_add_music_loops_short_track(make_context, sample_video_with_silence, sample_video_with_audio):
+    """Music shorter than the video is looped to cover the whole duration."""
+    args = _make_args(volume=0.5)
+    ctx = make_context(args)
+    ctx.current_video_path = sample_video_with_silence
 
-    with patch("editors.base_ugc.steps.add_music.get_s3_client", return_value=mock_client):
+    with patch("editors.base_ugc.steps.add_music.get_presigned_url", return_value=sample_video_with_audio):
         AddMusicStep().execute(ctx)
 
     result = VideoFileClip(ctx.current_video_path)
     assert result.audio is not None
+    assert result.audio.duration == pytest.approx(4.0, abs=0.3)
     result.close()
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+import pytest
+from moviepy import VideoFileClip
+
+from editors.base_ugc.steps.generate_voiceover import GenerateVoiceoverStep
+from models.creation_args.base_ugc import BaseUgcArgs, CaptionsSettings, VoiceoverSettings
+
+
+def _make_args(add_captions: bool = False) -> BaseUgcArgs:
+    return BaseUgcArgs(
+        format_type="base-ugc",
+        media_files=["f.mp4"],
+        generate_voiceover=True,
+        voiceover_settings=VoiceoverSettings(voice_id="voice-123"),
+        add_captions=add_captions,
+        captions_settings=CaptionsSettings() if add_captions else None,
+    )
+
+
+@pytest.mark.integration
+@patch("editors.base_ugc.steps.generate_voiceover.overwrite_intermediate")
+def test_voiceover_replaces_audio_and_keeps_duration(mock_overwrite, make_context, sample_video_with_audio, sample_audio):
+    ctx = make_context(_make_args())
+    ctx.current_video_path = sample_video_with_audio
+    ctx.intermediate_presigned_url = "https://example.com/presigned"
+    ctx.intermediate_upload_url = "https://example.com/upload"
+
+    with patch("editors.base_ugc.steps.generate_voiceover.changeVoice", return_value=sample_audio):
+        GenerateVoiceoverStep().execute(ctx)
+
+    result = VideoFileClip(ctx.current_video_path)
+    assert result.audio is not None
+    assert result.duration == pytest.approx(3.0, abs=0.3)
+    result.close()
+    # Nothing reads the intermediate after the voiceover unless captions follow
+    mock_overwrite.assert_not_called()
+
+
+@pytest.mark.integration
+@patch("editors.base_ugc.steps.generate_voiceover.overwrite_intermediate")
+def test_voiceover_overwrites_intermediate_for_captions(mock_overwrite, make_context, sample_video_with_audio, sample_audio):
+    ctx = make_context(_make_args(add_captions=True))
+    ctx.current_video_path = sample_video_with_audio
+    ctx.intermediate_presigned_url = "https://example.com/presigned"
+    ctx.intermediate_upload_url = "https://example.com/upload"
+
+    with patch("editors.base_ugc.steps.generate_voiceover.changeVoice", return_value=sample_audio):
+        GenerateVoiceoverStep().execute(ctx)
+
+    mock_overwrite.assert_called_once_with(ctx, ctx.current_video_path, "video/mp4")
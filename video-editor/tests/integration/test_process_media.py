@@ -0,0 +1,84 @@
+import shutil
+import subprocess
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from tasks.process_media import _process_in_one_pass
+from utils.media_metadata import probe
+
+
+@pytest.mark.integration
+def test_one_ffmpeg_run_produces_thumbnails_and_normalized_video(sample_video_with_audio, tmp_path):
+    uploaded = {}
+
+    def fake_upload(path, content_type, parent_media_id, variant):
+        # Thumbnails are uploaded from the temp dir while ffmpeg may still be running
+        uploaded[variant.value] = shutil.copy(path, tmp_path / f"{variant.value}.webp")
+
+    def fake_overwrite(media_id, file_path):
+        uploaded["normalized"] = shutil.copy(file_path, tmp_path / "normalized.mp4")
+
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    with patch("tasks.process_media.upload_media", side_effect=fake_upload), \
+            patch("tasks.process_media.overwrite_media", side_effect=fake_overwrite), \
+            patch("tasks.process_media.subprocess.Popen", wraps=subprocess.Popen) as popen:
+        _process_in_one_pass(sample_video_with_audio, str(work_dir), "media-1", normalize_video=True)
+
+    # ffprobe aside, the source is decoded by a single ffmpeg process
+    assert [call.args[0][0] for call in popen.call_args_list].count("ffmpeg") == 1
+    assert Image.open(uploaded["Tiny"]).width == 16
+    assert Image.open(uploaded["Medium"]).width == 400
+    normalized = probe(uploaded["normalized"])
+    assert normalized.video.codec_name == "h264"
+    assert normalized.has_audio
+
+
+@pytest.mark.integration
+def test_image_gets_thumbnails_only(tmp_path):
+    source = tmp_path / "source.png"
+    Image.new("RGB", (800, 600), (200, 50, 50)).save(source)
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+
+    with patch("tasks.process_media.upload_media") as upload, \
+            patch("tasks.process_media.overwrite_media") as overwrite:
+        _process_in_one_pass(str(source), str(work_dir), "media-1", normalize_video=False)
+
+    assert sorted(call.kwargs["variant"].value for call in upload.call_args_list) == ["Medium", "Tiny"]
+    overwrite.assert_not_called()
+
+
+@pytest.mark.integration
+def test_unreadable_input_raises(tmp_path):
+    source = tmp_path / "broken.mp4"
+    source.write_bytes(b"not a video")
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+
+    with patch("tasks.process_media.upload_media") as upload, \
+            patch("tasks.process_media.overwrite_media"), \
+            pytest.raises(subprocess.CalledProcessError):
+        _process_in_one_pass(str(source), str(work_dir), "media-1", normalize_video=True)
+
+    upload.assert_not_called()
+
+
+@pytest.mark.integration
+def test_faststart_h264_aac_video_is_not_reuploaded(sample_video_with_audio, tmp_path):
+    source = str(tmp_path / "faststart.mp4")
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-i", sample_video_with_audio, "-c", "copy", "-movflags", "+faststart", source],
+        check=True,
+    )
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+
+    with patch("tasks.process_media.upload_media") as upload, \
+            patch("tasks.process_media.overwrite_media") as overwrite:
+        _process_in_one_pass(source, str(work_dir), "media-1", normalize_video=True)
+
+    assert upload.call_count == 2
+    overwrite.assert_not_called()
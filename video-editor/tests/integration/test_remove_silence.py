@@ -1,9 +1,20 @@
+import json
 import os
+from unittest.mock import patch
+
 import pytest
 from moviepy import VideoFileClip
 
-from editors.base_ugc.steps.remove_silence import RemoveSilenceStep, _detect_silence, _invert_intervals
+from editors.base_ugc.steps.concatenate import ConcatenateStep
+from editors.base_ugc.steps.remove_silence import (
+    RemoveSilenceStep,
+    _detect_silence,
+    _invert_intervals,
+    _starts_on_keyframes,
+    detect_timeline_speech_segments,
+)
 from models.creation_args.base_ugc import BaseUgcArgs
+from utils.ffmpeg_commands import build_concat_copy_command
 
 
 # --- Unit-style tests for helper functions ---
@@ -29,6 +40,35 @@ def test_invert_intervals_silence_at_end():
     assert result == [(0.0, 4.0)]
 
 
+@patch("editors.base_ugc.steps.remove_silence.get_keyframe_times", return_value=[0.0, 2.0, 4.0])
+def test_starts_on_keyframes_accepts_aligned_cuts(mock_keyframes):
+    assert _starts_on_keyframes("in.mp4", [(0.0, 1.0), (2.01, 3.0), (4.0, 5.0)])
+
+
+@patch("editors.base_ugc.steps.remove_silence.get_keyframe_times", return_value=[0.0, 2.0])
+def test_starts_on_keyframes_rejects_unaligned_cut(mock_keyframes):
+    assert not _starts_on_keyframes("in.mp4", [(0.0, 1.0), (2.5, 3.0)])
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_get_keyframe_times_skips_non_key_and_unknown_packets(mock_run):
+    from utils.video_editing_utils import get_keyframe_times
+
+    packets = [
+        {"stream_index": 0, "pts_time": "0.000000", "flags": "K__"},
+        {"stream_index": 0, "pts_time": "N/A", "flags": "K__"},
+        {"stream_index": 0, "pts_time": "0.033333", "flags": "___"},
+        {"stream_index": 1, "pts_time": "1.000000", "flags": "K__"},
+        {"stream_index": 0, "pts_time": "2.000000", "flags": "K__"},
+    ]
+    mock_run.return_value.stdout = json.dumps({
+        "streams": [{"index": 0, "codec_type": "video"}, {"index": 1, "codec_type": "audio"}],
+        "format": {"duration": "3.0"},
+        "packets": packets,
+    }).encode()
+    assert get_keyframe_times("in.mp4") == [0.0, 2.0]
+
+
 # --- Integration tests ---
 
 @pytest.mark.integration
@@ -44,3 +84,65 @@ def test_remove_silence_passes_through_video_without_silence(make_context, sampl
     result = VideoFileClip(ctx.current_video_path)
     assert result.duration > 0
     result.close()
+
+
+@pytest.mark.integration
+def test_remove_silence_cuts_silent_gap(make_context, sample_video_with_silence):
+    args = BaseUgcArgs(format_type="base-ugc", media_files=["f.mp4"], remove_silence=True)
+    ctx = make_context(args)
+    ctx.current_video_path = sample_video_with_silence
+
+    RemoveSilenceStep().execute(ctx)
+
+    assert ctx.current_video_path != sample_video_with_silence
+    result = VideoFileClip(ctx.current_video_path)
+    assert result.duration == pytest.approx(2.5, abs=0.3)
+    assert result.size == [1080, 1920]
+    assert result.audio is not None
+    result.close()
+
+
+@pytest.mark.integration
+def test_remove_silence_falls_back_to_reencode_when_not_keyframe_aligned(make_context, sample_video_with_silence):
+    args = BaseUgcArgs(format_type="base-ugc", media_files=["f.mp4"], remove_silence=True, silence_stream_copy=True)
+    ctx = make_context(args)
+    ctx.current_video_path = sample_video_with_silence
+    ctx.speech_segments = [(0.0, 1.5), (3.0, 4.0)]
+
+    with patch("editors.base_ugc.steps.remove_silence.get_keyframe_times", return_value=[0.0]), \
+            patch("editors.base_ugc.steps.remove_silence.build_concat_copy_command") as copy_command:
+        RemoveSilenceStep().execute(ctx)
+
+    copy_command.assert_not_called()
+    result = VideoFileClip(ctx.current_video_path)
+    assert result.duration == pytest.approx(2.5, abs=0.3)
+    result.close()
+
+
+@pytest.mark.integration
+def test_detect_timeline_speech_segments_reads_source_audio(sample_video_with_silence):
+    segments = detect_timeline_speech_segments([sample_video_with_silence])
+
+    assert len(segments) == 2
+    assert segments[0][1] == pytest.approx(1.5, abs=0.1)
+    assert segments[1][0] == pytest.approx(3.0, abs=0.1)
+    assert segments[1][1] == pytest.approx(4.0, abs=0.1)
+
+
+@pytest.mark.integration
+def test_concatenate_then_remove_silence_uses_stream_copy(make_context, sample_video_with_silence):
+    args = BaseUgcArgs(format_type="base-ugc", media_files=["f.mp4"], remove_silence=True, silence_stream_copy=True)
+    ctx = make_context(args)
+    ctx.media_urls = [sample_video_with_silence]
+
+    ConcatenateStep().execute(ctx)
+    with patch(
+        "editors.base_ugc.steps.remove_silence.build_concat_copy_command",
+        wraps=build_concat_copy_command,
+    ) as copy_command:
+        RemoveSilenceStep().execute(ctx)
+
+    copy_command.assert_called_once()
+    result = VideoFileClip(ctx.current_video_path)
+    assert result.duration == pytest.approx(2.5, abs=0.3)
+    result.close()
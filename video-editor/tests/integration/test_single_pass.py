@@ -0,0 +1,148 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from moviepy import AudioFileClip, VideoFileClip
+
+from editors.base_ugc.render_plan import RenderPlan
+from editors.base_ugc.steps.add_captions import AddCaptionsStep
+from editors.base_ugc.steps.add_music import AddMusicStep
+from editors.base_ugc.steps.concatenate import ConcatenateStep
+from editors.base_ugc.steps.export_upload import ExportAndUploadStep
+from editors.base_ugc.steps.generate_voiceover import GenerateVoiceoverStep
+from editors.base_ugc.steps.remove_silence import RemoveSilenceStep
+from models.creation_args.base_ugc import BaseUgcArgs, CaptionsSettings, MusicSettings, VoiceoverSettings
+
+_SRT = "1\n00:00:00,000 --> 00:00:01,500\nHello there.\n"
+
+
+@pytest.mark.integration
+def test_single_pass_renders_planned_edits_once(make_context, sample_video_with_audio, sample_audio, monkeypatch):
+    args = BaseUgcArgs(
+        format_type="base-ugc",
+        media_files=["f1.mp4", "f2.mp4"],
+        add_music=True,
+        music_settings=MusicSettings(music_id="track.mp3", volume=0.3),
+        single_pass_render=True,
+    )
+    ctx = make_context(args)
+    ctx.render_plan = RenderPlan()
+    ctx.media_urls = [sample_video_with_audio, sample_video_with_audio]
+    monkeypatch.setattr("editors.base_ugc.steps.add_music.get_presigned_url", lambda _: sample_audio)
+
+    ConcatenateStep().execute(ctx)
+    AddMusicStep().execute(ctx)
+
+    # Steps only record intents — nothing is encoded until the plan is rendered
+    assert ctx.current_video_path is None
+    assert ctx.render_plan.music_path == sample_audio
+
+    ctx.render_plan.keep_segments = [(0.0, 1.0), (4.0, 6.0)]
+    output_path = ctx.render_plan.render(ctx.workspace.get_temp_path("mp4"))
+
+    result = VideoFileClip(output_path)
+    assert result.duration == pytest.approx(3.0, abs=0.3)
+    assert result.size == [1080, 1920]
+    assert result.audio is not None
+    result.close()
+
+
+@pytest.mark.integration
+def test_single_pass_audio_only_render_reuses_source_audio(make_context, sample_video_with_audio):
+    args = BaseUgcArgs(format_type="base-ugc", media_files=["f.mp4"], single_pass_render=True)
+    ctx = make_context(args)
+    ctx.render_plan = RenderPlan(input_paths=[sample_video_with_audio])
+
+    audio_path = ctx.render_plan.render_audio(ctx.workspace)
+    source_audio_path = ctx.render_plan.source_audio_path
+
+    assert os.path.exists(audio_path)
+    audio = AudioFileClip(audio_path)
+    assert audio.duration == pytest.approx(3.0, abs=0.3)
+    audio.close()
+
+    # A second render starts from the cached WAV instead of the original inputs
+    with patch("editors.base_ugc.render_plan.FFmpegCommandExecutor") as executor:
+        ctx.render_plan.render_audio(ctx.workspace)
+    cmd = executor.return_value.execute.call_args.args[0]
+    assert cmd[cmd.index("-i") + 1] == source_audio_path
+    assert sample_video_with_audio not in cmd
+
+
+@pytest.mark.integration
+def test_single_pass_remove_silence_cuts_planned_timeline(make_context, sample_video_with_silence):
+    args = BaseUgcArgs(format_type="base-ugc", media_files=["f.mp4"], remove_silence=True, single_pass_render=True)
+    ctx = make_context(args)
+    ctx.render_plan = RenderPlan()
+    ctx.media_urls = [sample_video_with_silence]
+
+    ConcatenateStep().execute(ctx)
+    RemoveSilenceStep().execute(ctx)
+
+    assert ctx.current_video_path is None
+    assert ctx.render_plan.keep_segments is not None
+
+    result = VideoFileClip(ctx.render_plan.render(ctx.workspace.get_temp_path("mp4")))
+    assert result.duration == pytest.approx(2.5, abs=0.3)
+    assert result.audio is not None
+    result.close()
+
+
+@pytest.mark.integration
+@patch("editors.base_ugc.steps.generate_voiceover.overwrite_intermediate")
+@patch("editors.base_ugc.steps.add_captions.transcribe", return_value=_SRT)
+def test_single_pass_voiceover_and_captions_render_once(
+    mock_transcribe, mock_overwrite, make_context, sample_video_with_silence, sample_audio,
+):
+    args = BaseUgcArgs(
+        format_type="base-ugc",
+        media_files=["f.mp4"],
+        generate_voiceover=True,
+        voiceover_settings=VoiceoverSettings(voice_id="voice-123"),
+        add_captions=True,
+        captions_settings=CaptionsSettings(),
+        single_pass_render=True,
+    )
+    ctx = make_context(args)
+    ctx.render_plan = RenderPlan()
+    ctx.media_urls = [sample_video_with_silence]
+    ctx.intermediate_presigned_url = "https://example.com/presigned"
+    ctx.intermediate_upload_url = "https://example.com/upload"
+
+    ConcatenateStep().execute(ctx)
+    with patch("editors.base_ugc.steps.generate_voiceover.changeVoice", return_value=sample_audio):
+        GenerateVoiceoverStep().execute(ctx)
+    AddCaptionsStep().execute(ctx)
+
+    assert ctx.render_plan.audio_path == sample_audio
+    assert ctx.render_plan.video_filter.startswith("subtitles=")
+    # Captions read the intermediate, so it is replaced with the voiceover soundtrack
+    overwritten_path, content_type = mock_overwrite.call_args.args[1:]
+    assert content_type == "audio/mpeg"
+    assert os.path.exists(overwritten_path)
+
+    result = VideoFileClip(ctx.render_plan.render(ctx.workspace.get_temp_path("mp4")))
+    # The 10s voiceover is cut to the 4s video
+    assert result.duration == pytest.approx(4.0, abs=0.3)
+    assert result.audio.duration == pytest.approx(4.0, abs=0.3)
+    result.close()
+
+
+@pytest.mark.integration
+def test_stream_export_uploads_while_encoding(make_context, sample_video_with_audio, fake_media_ingest,
+                                             multipart_storage, tmp_path):
+    args = BaseUgcArgs(
+        format_type="base-ugc", media_files=["f.mp4"], single_pass_render=True, stream_export=True,
+    )
+    ctx = make_context(args)
+    ctx.render_plan = RenderPlan(input_paths=[sample_video_with_audio, sample_video_with_audio])
+
+    ExportAndUploadStep().execute(ctx)
+
+    assert ctx.output_media_id in fake_media_ingest.completed
+    assert ctx.current_video_path is None  # no local copy of the output
+    uploaded = tmp_path / "uploaded.mp4"
+    uploaded.write_bytes(fake_media_ingest.objects[ctx.output_media_id])
+    result = VideoFileClip(str(uploaded))
+    assert result.duration == pytest.approx(6.0, abs=0.3)
+    result.close()
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from queues.consumer_runtime import _DispatchingChannel
+
+
+class _FakeChannel:
+    def __init__(self):
+        self.callbacks = {}
+        self.acks = []
+        self.declared = []
+
+    def queue_declare(self, queue, **kwargs):
+        self.declared.append(queue)
+
+    def basic_consume(self, queue, on_message_callback, **kwargs):
+        self.callbacks[queue] = on_message_callback
+
+    def basic_ack(self, delivery_tag):
+        self.acks.append((delivery_tag, threading.current_thread().name))
+
+
+class _FakeConnection:
+    """Runs callbacks queued by handler threads when drained, like the pika I/O loop would."""
+
+    def __init__(self):
+        self.queued = []
+
+    def add_callback_threadsafe(self, callback):
+        self.queued.append(callback)
+
+    def drain(self):
+        while self.queued:
+            self.queued.pop(0)()
+
+
+def test_handlers_run_off_the_io_thread_and_ack_through_it():
+    channel, connection = _FakeChannel(), _FakeConnection()
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="handler")
+    release = threading.Event()
+    handled = []
+
+    def on_message(ch, method, props, body):
+        release.wait(5)
+        handled.append((body, threading.current_thread().name))
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+
+    def setup_queue(ch):
+        ch.queue_declare(queue="q")
+        ch.basic_consume(queue="q", on_message_callback=on_message)
+
+    setup_queue(_DispatchingChannel(channel, connection, executor))
+    assert channel.declared == ["q"]
+
+    # Both deliveries return immediately even though the handlers are blocked
+    channel.callbacks["q"](channel, SimpleNamespace(delivery_tag=1), None, b"a")
+    channel.callbacks["q"](channel, SimpleNamespace(delivery_tag=2), None, b"b")
+    assert handled == [] and channel.acks == []
+
+    release.set()
+    executor.shutdown(wait=True)
+    assert all(name.startswith("handler") for _, name in handled)
+    assert channel.acks == []
+
+    connection.drain()
+    assert sorted(tag for tag, _ in channel.acks) == [1, 2]
+    assert all(name == threading.current_thread().name for _, name in channel.acks)
@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from editors.base_ugc.steps.fetch_media import FetchMediaStep
+from models.creation_args.base_ugc import BaseUgcArgs
+from utils.media_ingest_client import download_url, get_presigned_urls
+
+
+def test_get_presigned_urls_keeps_media_order():
+    with patch("utils.media_ingest_client.get_presigned_url", side_effect=lambda media_id: f"https://s3/{media_id}.mp4"):
+        assert get_presigned_urls(["a", "b", "c"]) == ["https://s3/a.mp4", "https://s3/b.mp4", "https://s3/c.mp4"]
+
+
+def test_fetch_media_prefetches_clips_into_workspace(make_context):
+    args = BaseUgcArgs(format_type="base-ugc", media_files=["a", "b"], prefetch_media=True)
+    ctx = make_context(args)
+    downloaded = {}
+
+    with patch("editors.base_ugc.steps.fetch_media.get_presigned_urls",
+               return_value=["https://s3/a.webm?X-Amz-Signature=1", "https://s3/b"]), \
+            patch("editors.base_ugc.steps.fetch_media.download_url",
+                  side_effect=lambda url, dest: downloaded.setdefault(url, dest)):
+        FetchMediaStep().execute(ctx)
+
+    assert ctx.media_urls == list(downloaded.values())
+    assert ctx.media_urls[0].endswith(".webm")
+    assert ctx.media_urls[1].endswith(".mp4")
+
+
+def _response(status_code: int, chunks: list[bytes], fail: bool = False) -> MagicMock:
+    def iter_content(chunk_size):
+        yield from chunks
+        if fail:
+            raise requests.ConnectionError("reset by peer")
+
+    response = MagicMock(status_code=status_code)
+    response.__enter__.return_value = response
+    response.iter_content.side_effect = iter_content
+    return response
+
+
+def test_download_url_resumes_with_range_request(tmp_path):
+    dest = tmp_path / "clip.mp4"
+    responses = [_response(200, [b"abc"], fail=True), _response(206, [b"def"])]
+
+    with patch("utils.media_ingest_client._session.get", side_effect=responses) as get:
+        download_url("https://s3/clip.mp4", str(dest))
+
+    assert dest.read_bytes() == b"abcdef"
+    assert get.call_args_list[1].kwargs["headers"] == {"Range": "bytes=3-"}
+
+
+def test_download_url_restarts_when_range_is_ignored(tmp_path):
+    dest = tmp_path / "clip.mp4"
+    responses = [_response(200, [b"abc"], fail=True), _response(200, [b"abcdef"])]
+
+    with patch("utils.media_ingest_client._session.get", side_effect=responses):
+        download_url("https://s3/clip.mp4", str(dest))
+
+    assert dest.read_bytes() == b"abcdef"
@@ -0,0 +1,213 @@
+from models.creation_args.base_ugc import TrimDecision
+from utils.editing_workspace import EditingWorkspace
+from utils.ffmpeg_commands import (
+    build_add_music_command,
+    build_concat_copy_command,
+    build_detect_silence_command,
+    build_normalize_command,
+    build_normalize_concat_command,
+    build_remove_silence_command,
+    build_replace_audio_command,
+    build_single_pass_command,
+    build_split_scene_command,
+)
+
+
+def _filter_graph(cmd: list[str]) -> str:
+    return cmd[cmd.index("-filter_complex") + 1]
+
+
+def test_normalize_concat_trims_only_clips_with_decisions():
+    cmd = build_normalize_concat_command(
+        input_paths=["a.mp4", "b.mp4"],
+        output_path="out.mp4",
+        trim_decisions={"id-b": TrimDecision(trim_start=1.0, trim_end=2.5)},
+        media_ids=["id-a", "id-b"],
+    )
+
+    graph = _filter_graph(cmd)
+    assert "[0:a]anull[a0]" in graph
+    assert "[1:a]atrim=start=1.0:end=2.5" in graph
+    assert graph.endswith("[v0][a0][v1][a1]concat=n=2:v=1:a=1[v][a]")
+    assert cmd[-1] == "out.mp4"
+
+
+def test_single_pass_without_edits_matches_concat_graph():
+    concat = build_normalize_concat_command(["a.mp4", "b.mp4"], "out.mp4")
+    single = build_single_pass_command(["a.mp4", "b.mp4"], "out.mp4")
+
+    assert _filter_graph(single) == _filter_graph(concat)
+    assert single.count("-i") == 2
+
+
+def test_single_pass_chains_cuts_music_and_subtitles():
+    cmd = build_single_pass_command(
+        input_paths=["a.mp4"],
+        output_path="out.mp4",
+        keep_segments=[(0.0, 1.0), (2.0, 3.5)],
+        music_path="music.mp3",
+        music_volume=0.3,
+        video_filter="subtitles=subs.ass",
+    )
+
+    graph = _filter_graph(cmd)
+    assert "[v]split=2[vsrc0][vsrc1]" in graph
+    assert "[asrc1]atrim=start=2.000:end=3.500,asetpts=PTS-STARTPTS[aseg1]" in graph
+    assert "[vseg0][aseg0][vseg1][aseg1]concat=n=2:v=1:a=1[vcut][acut]" in graph
+    assert "[1:a]volume=0.3[music];[acut][music]amix=inputs=2" in graph
+    assert "[vcut]subtitles=subs.ass[vout]" in graph
+    assert cmd[cmd.index("-stream_loop") + 3] == "music.mp3"
+    assert cmd.count("-map") == 2
+    assert "[vout]" in cmd and "[amix]" in cmd
+
+
+def test_single_pass_audio_only_skips_video_branch():
+    cmd = build_single_pass_command(
+        input_paths=["a.mp4", "b.mp4"],
+        output_path="out.mp3",
+        keep_segments=[(0.5, 2.0)],
+        video_filter="subtitles=subs.ass",
+        audio_only=True,
+    )
+
+    graph = _filter_graph(cmd)
+    assert "[0:v]" not in graph
+    assert "subtitles" not in graph
+    assert "[a0][a1]concat=n=2:v=0:a=1[a]" in graph
+    assert "libx264" not in cmd
+    assert cmd[cmd.index("-map") + 1] == "[acut]"
+
+
+def test_single_pass_replacement_audio_replaces_source_audio_and_music():
+    cmd = build_single_pass_command(
+        input_paths=["a.mp4"],
+        output_path="out.mp4",
+        music_path="music.mp3",
+        audio_path="voiceover.mp3",
+    )
+
+    graph = _filter_graph(cmd)
+    assert "music" not in graph
+    assert "[a]volume=0[bed];[bed][1:a]amix=inputs=2:duration=first" in graph
+    assert cmd[cmd.index("-map", cmd.index("-map") + 1) + 1] == "[avo]"
+
+
+def test_single_pass_audio_only_with_replacement_audio_is_a_plain_transcode():
+    cmd = build_single_pass_command(
+        input_paths=["a.mp4"],
+        output_path="out.mp3",
+        audio_path="voiceover.mp3",
+        audio_only=True,
+    )
+
+    assert cmd == ["ffmpeg", "-y", "-i", "voiceover.mp3", "-map", "0:a", "-c:a", "libmp3lame", "out.mp3"]
+
+
+def test_detect_silence_decodes_only_audio_and_writes_nothing():
+    cmd = build_detect_silence_command(["a.mp4", "b.mp4"], -35, 0.5)
+
+    graph = _filter_graph(cmd)
+    assert "[0:v]" not in graph
+    assert "[a0][a1]concat=n=2:v=0:a=1[a];[a]silencedetect=noise=-35dB:d=0.5[silence]" in graph
+    assert cmd[-3:] == ["-f", "null", "-"]
+
+
+def test_remove_silence_trims_segments_from_single_input():
+    cmd = build_remove_silence_command("in.mp4", "out.mp4", [(0.0, 1.5), (3.0, 4.0)])
+
+    graph = _filter_graph(cmd)
+    assert cmd.count("-i") == 1
+    assert graph.startswith("[0:v]split=2[vsrc0][vsrc1];[vsrc0]trim=start=0.000:end=1.500,setpts=PTS-STARTPTS[vseg0]")
+    assert "[0:a]asplit=2[asrc0][asrc1]" in graph
+    assert "[asrc1]atrim=start=3.000:end=4.000,asetpts=PTS-STARTPTS[aseg1]" in graph
+    assert graph.endswith("[vseg0][aseg0][vseg1][aseg1]concat=n=2:v=1:a=1[vcut][acut]")
+
+
+def test_remove_silence_snaps_cut_points_to_frame_grid():
+    cmd = build_remove_silence_command("in.mp4", "out.mp4", [(0.0, 1.2345), (2.71, 3.0)])
+
+    graph = _filter_graph(cmd)
+    assert "trim=start=0.000:end=1.233," in graph
+    assert "atrim=start=2.700:end=3.000," in graph
+
+
+def test_normalize_concat_forces_keyframes_at_cut_points():
+    cmd = build_normalize_concat_command(["a.mp4"], "out.mp4", force_key_frames=[1.5, 3.25])
+
+    assert cmd[cmd.index("-force_key_frames") + 1] == "1.500,3.250"
+    assert cmd[-1] == "out.mp4"
+
+
+def test_concat_copy_does_not_reencode():
+    cmd = build_concat_copy_command("list.txt", "out.mp4")
+
+    assert cmd[cmd.index("-f") + 1] == "concat"
+    assert cmd[cmd.index("-c") + 1] == "copy"
+    assert "libx264" not in cmd
+
+
+def test_segments_concat_file_lists_inpoints_and_outpoints(tmp_path):
+    workspace = EditingWorkspace(str(tmp_path))
+
+    concat_file = workspace.create_segments_concat_file("in.mp4", [(0.0, 1.5), (3.0, 4.0)])
+
+    lines = open(concat_file).read().splitlines()
+    assert lines[1:3] == ["inpoint 0.000", "outpoint 1.500"]
+    assert lines[4:6] == ["inpoint 3.000", "outpoint 4.000"]
+    assert lines[0] == lines[3] and lines[0].endswith("in.mp4'")
+
+
+def test_add_music_copies_video_and_trims_looped_music():
+    cmd = build_add_music_command("in.mp4", "music.mp3", "out.mp4", volume=0.4, duration=12.5)
+
+    graph = _filter_graph(cmd)
+    assert cmd[cmd.index("-stream_loop") + 1] == "-1"
+    assert "[1:a]atrim=start=0:end=12.500" in graph
+    assert "[music_fit]volume=0.4[music];[0:a][music]amix=" in graph
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+
+
+def test_add_music_without_source_audio_uses_music_only():
+    cmd = build_add_music_command("in.mp4", "music.mp3", "out.mp4", volume=1.0, duration=3.0, has_audio=False)
+
+    graph = _filter_graph(cmd)
+    assert "[0:a]" not in graph
+    assert graph.endswith("volume=1.0[amix]")
+
+
+def test_replace_audio_copies_video_stream():
+    cmd = build_replace_audio_command("in.mp4", "https://s3/voice.mp3", "out.mp4", duration=12.5)
+
+    assert cmd[cmd.index("-map") + 1] == "0:v"
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+    assert _filter_graph(cmd) == "[1:a]apad,atrim=end=12.500[a]"
+
+
+def test_single_pass_fragmented_output_can_go_to_a_pipe():
+    cmd = build_single_pass_command(input_paths=["a.mp4"], output_path="pipe:1", fragmented=True)
+
+    assert cmd[-5:] == ["-f", "mp4", "-movflags", "frag_keyframe+empty_moov", "pipe:1"]
+
+
+def test_split_scene_reencodes_by_default():
+    cmd = build_split_scene_command("in.mp4", 1.5, 2.0, "out.mp4")
+
+    assert cmd[cmd.index("-ss") + 1] == "1.500000"
+    assert cmd.index("-ss") < cmd.index("-i")
+    assert cmd[cmd.index("-c:v") + 1] == "libx264"
+
+
+def test_split_scene_stream_copy_caps_video_frames():
+    cmd = build_split_scene_command("in.mp4", 1.0, 1.0, "out.mp4", stream_copy=True, frame_count=30)
+
+    assert cmd[cmd.index("-c") + 1] == "copy"
+    assert cmd[cmd.index("-frames:v") + 1] == "30"
+    assert "-c:v" not in cmd
+
+
+def test_normalize_copies_compliant_video_and_reencodes_audio():
+    cmd = build_normalize_command("in.mov", "out.mp4", copy_video=True)
+
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+    assert cmd[cmd.index("-c:a") + 1] == "aac"
+    assert cmd[-3:] == ["-movflags", "+faststart", "out.mp4"]
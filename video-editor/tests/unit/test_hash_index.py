@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from utils import hash_index
+from utils.hash_index import VideoHashIndex, pack_hashes
+from utils.video_hasher import compare_videos
+
+rng = np.random.default_rng(0)
+
+
+def _random_video(frames: int = 20) -> np.ndarray:
+    return rng.integers(0, np.iinfo(np.uint64).max, size=frames, dtype=np.uint64, endpoint=True)
+
+
+def _flip_bits(hashes: np.ndarray, bits_per_frame: int) -> np.ndarray:
+    flipped = hashes.copy()
+    for i in range(len(flipped)):
+        for bit in rng.choice(64, size=bits_per_frame, replace=False):
+            flipped[i] ^= np.uint64(1) << np.uint64(int(bit))
+    return flipped
+
+
+def _index(videos: dict[str, np.ndarray]) -> VideoHashIndex:
+    index = VideoHashIndex()
+    for file_id, hashes in videos.items():
+        index.add(file_id, hashes)
+    return index
+
+
+def test_pack_hashes_reads_imagehash_hex():
+    assert pack_hashes(["ffffffffffffffff", "0000000000000001"]).tolist() == [2 ** 64 - 1, 1]
+
+
+def test_find_returns_near_duplicate():
+    videos = {f"video-{i}": _random_video() for i in range(500)}
+    index = _index(videos)
+
+    match = index.find(_flip_bits(videos["video-42"], 2), similarity_threshold=0.96)
+
+    assert match is not None
+    assert match[0] == "video-42"
+    assert match[1] == pytest.approx(1 - 2 / 64)
+
+
+def test_find_returns_none_for_unrelated_video():
+    index = _index({f"video-{i}": _random_video() for i in range(500)})
+
+    assert index.find(_random_video(), similarity_threshold=0.96) is None
+
+
+def test_find_matches_compare_videos_similarity():
+    stored = _random_video(30)
+    query = _flip_bits(stored[:25], 1)
+    index = _index({"stored": stored})
+
+    match = index.find(query, similarity_threshold=0.9)
+
+    as_rows = lambda hashes: [(i, f"{int(h):016x}") for i, h in enumerate(hashes)]
+    assert match.alignment.offset == 0
+    assert match.similarity == pytest.approx(compare_videos(as_rows(query), as_rows(stored)))
+
+
+def test_find_returns_trimmed_copy():
+    videos = {f"video-{i}": _random_video(40) for i in range(200)}
+    index = _index(videos)
+    trimmed = _flip_bits(videos["video-7"][12:32], 1)
+
+    match = index.find(trimmed, similarity_threshold=0.96)
+
+    assert match.file_id == "video-7"
+    assert match.alignment.offset == 12
+
+
+def test_loose_threshold_scores_every_video():
+    videos = {"a": _random_video(), "b": _random_video()}
+    index = _index(videos)
+
+    # 10 flipped bits per frame can't be found through the chunk tables
+    match = index.find(_flip_bits(videos["b"], 10), similarity_threshold=0.8)
+
+    assert match[0] == "b"
+
+
+def test_pending_entries_are_merged_into_sorted_tables(monkeypatch):
+    monkeypatch.setattr(hash_index, "_MERGE_THRESHOLD", 50)
+    videos = {f"video-{i}": _random_video() for i in range(10)}
+    index = _index(videos)
+
+    assert index._pending_size < 50
+    assert index.find(videos["video-1"], similarity_threshold=0.96)[0] == "video-1"
+    assert index.find(videos["video-9"], similarity_threshold=0.96)[0] == "video-9"
+
+
+def test_readding_a_video_replaces_its_hashes():
+    old, new = _random_video(), _random_video()
+    index = _index({"v": old})
+    index.add("v", new)
+
+    assert index.find(old, similarity_threshold=0.96) is None
+    assert index.find(new, similarity_threshold=0.96)[0] == "v"
+
+
+def test_find_skips_excluded_video():
+    original = _random_video()
+    index = _index({"self": original, "copy": _flip_bits(original, 1)})
+
+    assert index.find(original, similarity_threshold=0.96, exclude="self")[0] == "copy"
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+from utils import media_ingest_client
+from utils.media_ingest_client import download_media, get_presigned_urls, upload_media
+
+
+def test_get_presigned_urls_resolves_many_ids_over_pooled_connections(fake_media_ingest, monkeypatch):
+    monkeypatch.setattr(media_ingest_client, "_session", media_ingest_client._create_session())
+    media_ids = [fake_media_ingest.add(b"clip") for _ in range(20)]
+
+    links = get_presigned_urls(media_ids)
+
+    assert links == [f"{fake_media_ingest.base_url}/storage/{media_id}" for media_id in media_ids]
+    # Concurrent lookups open at most one connection per worker, not one per request
+    assert fake_media_ingest.connections <= media_ingest_client._FETCH_CONCURRENCY
+
+
+def test_upload_then_download_roundtrip(fake_media_ingest, tmp_path):
+    src = tmp_path / "render.mp4"
+    src.write_bytes(b"rendered video")
+
+    media_id = upload_media(str(src))
+    download_media(media_id, str(tmp_path / "copy.mp4"))
+
+    assert media_id in fake_media_ingest.completed
+    assert (tmp_path / "copy.mp4").read_bytes() == b"rendered video"
+
+
+def test_upload_media_sends_large_files_as_multipart_parts(fake_media_ingest, multipart_storage, tmp_path):
+    data = os.urandom(12 * 1024 * 1024)
+    src = tmp_path / "render.mp4"
+    src.write_bytes(data)
+
+    media_id = upload_media(str(src))
+
+    assert fake_media_ingest.objects[media_id] == data
+    assert sorted(fake_media_ingest.part_requests) == [1, 2, 3]
+    assert media_id in fake_media_ingest.completed
+    assert os.listdir(tmp_path) == ["render.mp4"]
+
+
+def test_upload_media_resumes_multipart_after_failed_part(fake_media_ingest, multipart_storage, tmp_path):
+    data = os.urandom(12 * 1024 * 1024)
+    src = tmp_path / "render.mp4"
+    src.write_bytes(data)
+    fake_media_ingest.failing_parts = {2}
+
+    with pytest.raises(ClientError):
+        upload_media(str(src))
+
+    fake_media_ingest.failing_parts = set()
+    fake_media_ingest.part_requests.clear()
+    media_id = upload_media(str(src))
+
+    assert fake_media_ingest.part_requests == [2]
+    assert fake_media_ingest.objects[media_id] == data
@@ -0,0 +1,96 @@
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from utils import media_metadata
+from utils.media_metadata import probe, probe_many
+
+_PROBE_OUTPUT = json.dumps({
+    "streams": [
+        {"index": 0, "codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920, "avg_frame_rate": "30000/1001"},
+        {"index": 1, "codec_type": "audio", "codec_name": "aac", "avg_frame_rate": "0/0"},
+    ],
+    "format": {"duration": "12.5"},
+}).encode()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_metadata, "CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def media_file(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"not really a video")
+    return str(path)
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_probe_reads_all_streams_in_one_call(mock_run, cache_dir, media_file):
+    mock_run.return_value.stdout = _PROBE_OUTPUT
+
+    metadata = probe(media_file)
+
+    assert metadata.duration == 12.5
+    assert metadata.size == (1080, 1920)
+    assert metadata.video.fps == pytest.approx(29.97, abs=0.01)
+    assert metadata.video.codec_name == "h264"
+    assert metadata.has_audio
+    assert metadata.keyframes is None
+    mock_run.assert_called_once()
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_probe_is_cached_until_the_file_changes(mock_run, cache_dir, media_file):
+    mock_run.return_value.stdout = _PROBE_OUTPUT
+
+    first = probe(media_file)
+    assert probe(media_file) == first
+    assert mock_run.call_count == 1
+
+    stat = os.stat(media_file)
+    os.utime(media_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    probe(media_file)
+    assert mock_run.call_count == 2
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_keyframes_are_probed_once_more_then_cached(mock_run, cache_dir, media_file):
+    mock_run.return_value.stdout = _PROBE_OUTPUT
+    probe(media_file)
+
+    with_packets = json.loads(_PROBE_OUTPUT)
+    with_packets["packets"] = [{"stream_index": 0, "pts_time": "0.000000", "flags": "K__"}]
+    mock_run.return_value.stdout = json.dumps(with_packets).encode()
+
+    assert probe(media_file, keyframes=True).keyframes == [0.0]
+    assert probe(media_file, keyframes=True).keyframes == [0.0]
+    assert probe(media_file).keyframes == [0.0]
+    assert mock_run.call_count == 2
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_remote_urls_are_cached_by_media_id_only(mock_run, cache_dir):
+    mock_run.return_value.stdout = _PROBE_OUTPUT
+    url = "https://storage/bucket/clip.mp4?X-Amz-Signature=abc"
+
+    probe(url)
+    probe(url)
+    probe(url, media_id="m1")
+    probe(url.replace("abc", "def"), media_id="m1")
+
+    assert mock_run.call_count == 3
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_probe_many_keeps_order(mock_run, cache_dir):
+    mock_run.side_effect = lambda command, **kwargs: SimpleNamespace(
+        stdout=json.dumps({"streams": [], "format": {"duration": command[-1].removesuffix(".mp4")}}).encode()
+    )
+
+    assert [m.duration for m in probe_many(["3.mp4", "1.mp4", "2.mp4"])] == [3.0, 1.0, 2.0]
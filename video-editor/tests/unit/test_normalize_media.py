@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+import pytest
+
+from tasks.normalize_media import normalize_media
+from tasks.process_media import process_media
+from utils.idempotency_store import IdempotencyStore
+
+
+class _MemoryStore(IdempotencyStore):
+    """The claim rules of IdempotencyStore over a dict; leases never expire."""
+
+    def __init__(self):
+        self.keys = {}
+
+    def claim(self, key, owner, lease_seconds=0):
+        state, holder = self.keys.get(key, ("failed", None))
+        if state == "failed" or (state == "running" and holder == owner):
+            self.keys[key] = ("running", owner)
+            return True
+        return False
+
+    def _finish(self, key, owner, state):
+        if self.keys.get(key) == ("running", owner):
+            self.keys[key] = (state, owner)
+
+
+def _run(task, task_id: str, *args):
+    # Called in-process instead of apply(), which would record the result in the backend
+    task.push_request(id=task_id, retries=0)
+    try:
+        return task.run(*args)
+    finally:
+        task.pop_request()
+
+
+@pytest.fixture
+def store():
+    store = _MemoryStore()
+    with patch("tasks.normalize_media.get_idempotency_store", return_value=store), \
+            patch("tasks.process_media.get_idempotency_store", return_value=store):
+        yield store
+
+
+@pytest.fixture
+def normalize():
+    with patch("tasks.normalize_media.get_presigned_url", return_value="https://media/in.mp4"), \
+            patch("tasks.normalize_media.overwrite_media"), \
+            patch("tasks.normalize_media.normalize", return_value=True) as normalize:
+        yield normalize
+
+
+def test_duplicate_normalize_request_transcodes_once(store, normalize):
+    _run(normalize_media, "first", "media-1", "in.mp4")
+    _run(normalize_media, "second", "media-1", "in.mp4")
+
+    normalize.assert_called_once()
+    assert store.keys["normalize:media-1"] == ("done", "first")
+
+
+def test_normalize_skips_while_another_task_holds_the_media(store, normalize):
+    store.claim("normalize:media-1", "process-media-task")
+
+    _run(normalize_media, "normalize-task", "media-1", "in.mp4")
+
+    normalize.assert_not_called()
+
+
+def test_process_media_leaves_normalization_to_the_task_that_claimed_it(store):
+    store.claim("normalize:media-1", "normalize-task")
+
+    with patch("tasks.process_media.get_presigned_url", return_value="https://media/in.mp4"), \
+            patch("tasks.process_media._publish_result"), \
+            patch("tasks.process_media._process_in_one_pass") as one_pass:
+        _run(process_media, "process-task", "media-1", "in.mp4", "video/mp4")
+        _run(process_media, "duplicate", "media-1", "in.mp4", "video/mp4")
+
+    one_pass.assert_called_once()
+    assert one_pass.call_args.kwargs["normalize_video"] is False
+    assert store.keys["process-media:media-1"] == ("done", "process-task")
+    assert store.keys["normalize:media-1"] == ("running", "normalize-task")
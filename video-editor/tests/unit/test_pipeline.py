@@ -2,6 +2,7 @@ from unittest.mock import MagicMock, call, patch
 
 import pytest
 
+from editors.base_ugc.checkpoint import PipelineCheckpoint
 from editors.base_ugc.context import EditingContext
 from editors.base_ugc.pipeline import EditingPipeline
 from editors.base_ugc.steps.base_step import PipelineStep
@@ -88,3 +89,39 @@ def test_pipeline_raises_if_output_path_not_set(tmp_path):
 
     with pytest.raises(RuntimeError, match="output_path was not set"):
         pipeline.run(ctx)
+
+
+def test_pipeline_resumes_at_failed_step_from_checkpoint(tmp_path):
+    checkpoint = PipelineCheckpoint(str(tmp_path), "vid-1")
+    step_a = _make_step("StepA")
+    step_b = _make_step("StepB")
+
+    def write_output(ctx):
+        ctx.current_video_path = ctx.workspace.get_temp_path("mp4")
+        open(ctx.current_video_path, "w").close()
+
+    step_a.execute.side_effect = write_output
+    step_b.execute.side_effect = RuntimeError("ai-gateway unavailable")
+
+    first_ctx = _make_context(tmp_path)
+    with pytest.raises(RuntimeError):
+        EditingPipeline([step_a, step_b], MagicMock(), checkpoint=checkpoint).run(first_ctx)
+
+    step_b.execute.side_effect = lambda ctx: setattr(ctx, "output_media_id", "media-1")
+    retry_ctx = _make_context(tmp_path)
+    result = EditingPipeline([step_a, step_b], MagicMock(), checkpoint=checkpoint).run(retry_ctx)
+
+    assert result == "media-1"
+    assert step_a.execute.call_count == 1
+    assert retry_ctx.current_video_path == first_ctx.current_video_path
+    assert retry_ctx.workspace.get_temp_path("mp4") != first_ctx.current_video_path
+
+
+def test_checkpoint_ignored_when_args_changed(tmp_path):
+    checkpoint = PipelineCheckpoint(str(tmp_path), "vid-1")
+    checkpoint.save(1, _make_context(tmp_path))
+
+    ctx = _make_context(tmp_path)
+    ctx.args = BaseUgcArgs(format_type="base-ugc", media_files=["other.mp4"])
+
+    assert checkpoint.restore(ctx) == 0
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+from queues.process_pool import HandlerProcessPool
+
+
+def _pid(_):
+    return os.getpid()
+
+
+def _crash(_):
+    os._exit(1)
+
+
+def test_handler_runs_in_recycled_worker_processes():
+    pool = HandlerProcessPool(workers=1, max_tasks_per_child=2)
+
+    pids = [pool.run(_pid, i) for i in range(4)]
+
+    assert os.getpid() not in pids
+    assert pids[0] == pids[1] != pids[2] == pids[3]
+
+
+def test_broken_pool_is_replaced():
+    pool = HandlerProcessPool(workers=1)
+
+    with pytest.raises(BrokenProcessPool):
+        pool.run(_crash, None)
+
+    assert pool.run(_pid, None) != os.getpid()
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("DETECT_SCENES_PROCESSES", "3")
+    monkeypatch.setenv("DETECT_SCENES_MAX_TASKS_PER_CHILD", "0")
+
+    pool = HandlerProcessPool.from_env("detect-scenes")
+
+    assert (pool.workers, pool.max_tasks_per_child) == (3, None)
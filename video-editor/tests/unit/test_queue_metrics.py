@@ -0,0 +1,51 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pika
+
+from celery_app import MEDIA_QUEUE, RENDER_PRIORITIES, RENDER_QUEUE, app
+from queues.queue_metrics import get_queue_stats
+
+
+def _route(task_name: str) -> dict:
+    return app.amqp.router.route({}, task_name, args=(), kwargs={})
+
+
+def test_renders_and_media_ingest_go_to_separate_priority_queues():
+    render, media = _route("tasks.create_video"), _route("tasks.process_media")
+
+    assert render["queue"].name == RENDER_QUEUE
+    assert media["queue"].name == MEDIA_QUEUE
+    assert render["queue"].queue_arguments == {"x-max-priority": 10}
+    assert _route("tasks.normalize_media")["queue"].name == MEDIA_QUEUE
+    assert RENDER_PRIORITIES["interactive"] > RENDER_PRIORITIES["batch"]
+
+
+def _channel(message_count: int, published_at: float | None = None):
+    channel = MagicMock()
+    channel.queue_declare.return_value = SimpleNamespace(
+        method=SimpleNamespace(message_count=message_count, consumer_count=2),
+    )
+    headers = {"published_at": published_at} if published_at else {}
+    channel.basic_get.return_value = (SimpleNamespace(delivery_tag=7), SimpleNamespace(headers=headers), b"{}")
+    return channel
+
+
+@patch("queues.queue_metrics.pika.BlockingConnection")
+def test_queue_stats_report_depth_and_head_message_age(mock_connection):
+    busy, empty = _channel(5, published_at=time.time() - 30), _channel(0)
+    missing = MagicMock()
+    missing.queue_declare.side_effect = pika.exceptions.ChannelClosedByBroker(404, "NOT_FOUND")
+    mock_connection.return_value.channel.side_effect = [busy, empty, missing]
+
+    stats = get_queue_stats("amqp://localhost", ["busy", "empty", "missing"])
+
+    assert stats["busy"].depth == 5
+    assert stats["busy"].oldest_message_age_seconds >= 30
+    # The peeked message goes back to the queue
+    busy.basic_nack.assert_called_once_with(delivery_tag=7, requeue=True)
+    assert stats["empty"] == (0, 2, None)
+    empty.basic_get.assert_not_called()
+    assert stats["missing"] == (0, 0, None)
+    mock_connection.return_value.close.assert_called_once()
@@ -0,0 +1,92 @@
+import os
+from unittest.mock import MagicMock, call
+
+from editors.base_ugc.context import EditingContext
+from editors.base_ugc.pipeline import EditingPipeline
+from editors.base_ugc.step_cache import StepCache, step_cache_keys
+from editors.base_ugc.steps.base_step import PipelineStep
+from models.creation_args.base_ugc import BaseUgcArgs
+from utils.editing_workspace import EditingWorkspace
+
+
+class _WriteStep(PipelineStep):
+    """Writes its name into a new file, like a real step producing a new intermediate."""
+    cacheable = True
+
+    def __init__(self, name: str, setting: str = ""):
+        self.name = name
+        self.setting = setting
+        self.runs = 0
+
+    def cache_inputs(self, ctx: EditingContext) -> dict:
+        return {"setting": self.setting}
+
+    def execute(self, ctx: EditingContext) -> None:
+        self.runs += 1
+        ctx.current_video_path = ctx.workspace.get_temp_path("mp4")
+        with open(ctx.current_video_path, "w") as f:
+            f.write(self.name + self.setting)
+
+
+class _ExportStep(PipelineStep):
+    name = "Exporting"
+
+    def execute(self, ctx: EditingContext) -> None:
+        with open(ctx.current_video_path) as f:
+            ctx.output_media_id = f.read()
+
+
+def _make_context(tmp_path) -> EditingContext:
+    args = BaseUgcArgs(format_type="base-ugc", media_files=["f.mp4"])
+    return EditingContext(video_id="vid-1", args=args, workspace=EditingWorkspace(str(tmp_path / "ws")))
+
+
+def test_step_cache_keys_change_downstream_of_a_changed_step():
+    first = step_cache_keys([{"step": "a"}, {"step": "b", "x": 1}, {"step": "c"}])
+    second = step_cache_keys([{"step": "a"}, {"step": "b", "x": 2}, {"step": "c"}])
+
+    assert first[0] == second[0]
+    assert first[1] != second[1]
+    assert first[2] != second[2]
+
+
+def test_step_cache_evicts_least_recently_used(tmp_path):
+    cache = StepCache(str(tmp_path / "cache"), max_bytes=10)
+    for key in ("old", "new"):
+        src = tmp_path / key
+        src.write_text("12345")
+        cache.store(key, str(src))
+    os.utime(tmp_path / "cache" / "old", (0, 0))
+
+    src = tmp_path / "third"
+    src.write_text("12345")
+    cache.store("third", str(src))
+
+    assert not cache.restore("old", str(tmp_path / "out1"))
+    assert cache.restore("new", str(tmp_path / "out2"))
+    assert (tmp_path / "out2").read_text() == "12345"
+
+
+def test_pipeline_resumes_after_last_cached_step(tmp_path):
+    cache = StepCache(str(tmp_path / "cache"), max_bytes=1024)
+    merge, music = _WriteStep("merge"), _WriteStep("music", "loud")
+    EditingPipeline([merge, music, _ExportStep()], MagicMock(), cache).run(_make_context(tmp_path))
+
+    merge_again, music_changed = _WriteStep("merge"), _WriteStep("music", "quiet")
+    on_step = MagicMock()
+    result = EditingPipeline([merge_again, music_changed, _ExportStep()], on_step, cache).run(_make_context(tmp_path))
+
+    assert result == "musicquiet"
+    assert merge_again.runs == 0
+    assert music_changed.runs == 1
+    assert on_step.call_args_list[0] == call("merge", "completed", None)
+
+
+def test_pipeline_skips_every_cached_step(tmp_path):
+    cache = StepCache(str(tmp_path / "cache"), max_bytes=1024)
+    steps = [_WriteStep("merge"), _WriteStep("music"), _ExportStep()]
+    EditingPipeline(steps, MagicMock(), cache).run(_make_context(tmp_path))
+
+    rerun = [_WriteStep("merge"), _WriteStep("music"), _ExportStep()]
+    assert EditingPipeline(rerun, MagicMock(), cache).run(_make_context(tmp_path)) == "music"
+    assert rerun[0].runs == rerun[1].runs == 0
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+from queues.task_events import (
+    PROGRESS_EXCHANGE_NAME,
+    RESPONSE_EXCHANGE_NAME,
+    TaskEventHub,
+    task_status_from_event,
+)
+
+_GENERATED = {"videoId": "v1", "status": "Success", "outputMediaId": "m1", "error": "", "taskId": "t1"}
+_STEP = {"videoId": "v1", "nodeId": "n1", "userId": "u1", "step": "captions", "status": "in_progress", "taskId": "t1"}
+
+
+def test_events_map_to_task_statuses():
+    assert task_status_from_event(RESPONSE_EXCHANGE_NAME, _GENERATED) == {
+        "task_id": "t1", "status": "SUCCESS", "result": _GENERATED,
+    }
+    failed = {**_GENERATED, "status": "Failed", "error": "boom"}
+    assert task_status_from_event(RESPONSE_EXCHANGE_NAME, failed)["error"] == "boom"
+    assert task_status_from_event(PROGRESS_EXCHANGE_NAME, _STEP)["status"] == "STARTED"
+    # Events of renders submitted before events carried a task id
+    assert task_status_from_event(PROGRESS_EXCHANGE_NAME, {**_STEP, "taskId": None}) is None
+
+
+def test_wait_returns_when_the_task_finishes_on_another_thread():
+    hub = TaskEventHub()
+
+    async def wait():
+        threading.Timer(0.05, hub.publish, [{"task_id": "t1", "status": "STARTED"}]).start()
+        threading.Timer(0.1, hub.publish, [{"task_id": "t1", "status": "SUCCESS", "result": {}}]).start()
+        return await hub.wait("t1", timeout=5)
+
+    assert asyncio.run(wait())["status"] == "SUCCESS"
+
+
+def test_wait_times_out_with_latest_status():
+    hub = TaskEventHub()
+    hub.publish({"task_id": "t1", "status": "STARTED"})
+
+    assert asyncio.run(hub.wait("t1", timeout=0.05)) == {"task_id": "t1", "status": "STARTED"}
+    assert asyncio.run(hub.wait("unknown", timeout=0.01)) is None
+
+
+def test_finished_task_is_answered_without_waiting_and_kept_finished():
+    hub = TaskEventHub(max_tracked=2)
+    hub.publish({"task_id": "t1", "status": "FAILURE", "error": "boom"})
+    hub.publish({"task_id": "t1", "status": "STARTED"})
+
+    assert asyncio.run(hub.wait("t1", timeout=5))["status"] == "FAILURE"
+
+    hub.publish({"task_id": "t2", "status": "STARTED"})
+    hub.publish({"task_id": "t3", "status": "STARTED"})
+    assert hub.latest("t1") is None
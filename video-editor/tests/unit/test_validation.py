@@ -52,3 +52,19 @@ def test_all_flags_with_settings_ok():
         captions_settings=CaptionsSettings(font="Arial", font_size=48),
     )
     assert len(args.media_files) == 2
+
+
+def test_single_pass_render_rejects_silence_stream_copy():
+    with pytest.raises(ValidationError, match="silence_stream_copy cannot be combined"):
+        BaseUgcArgs(
+            format_type="base-ugc",
+            media_files=["a.mp4"],
+            remove_silence=True,
+            silence_stream_copy=True,
+            single_pass_render=True,
+        )
+
+
+def test_stream_export_requires_single_pass_render():
+    with pytest.raises(ValidationError, match="stream_export requires single_pass_render"):
+        BaseUgcArgs(format_type="base-ugc", media_files=["a.mp4"], stream_export=True)
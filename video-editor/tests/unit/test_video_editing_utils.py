@@ -0,0 +1,30 @@
+from unittest.mock import patch
+
+from utils.video_editing_utils import _snap_to_keyframes, probe_media
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_probe_media_reads_duration_and_audio_in_one_call(mock_run):
+    mock_run.return_value.stdout = (
+        b'{"streams": [{"codec_type": "video"}, {"codec_type": "audio"}], "format": {"duration": "3.000000"}}'
+    )
+
+    info = probe_media("in.mp4")
+
+    assert info.duration == 3.0
+    assert info.has_audio
+    mock_run.assert_called_once()
+
+
+@patch("utils.media_metadata.subprocess.run")
+def test_probe_media_without_audio_stream(mock_run):
+    mock_run.return_value.stdout = b'{"streams": [{"codec_type": "video"}], "format": {"duration": "4.5"}}'
+
+    assert not probe_media("in.mp4").has_audio
+
+
+def test_cuts_snap_to_nearest_keyframe_and_merge():
+    keyframes = [0.0, 2.0, 4.0, 6.0]
+
+    # 2.9 -> 2.0 and 3.2 -> 4.0; 4.4 also lands on 4.0, so that scene disappears
+    assert _snap_to_keyframes([0.0, 2.9, 3.2, 4.4, 7.0], keyframes) == [0.0, 2.0, 4.0, 7.0]
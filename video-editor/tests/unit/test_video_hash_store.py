@@ -0,0 +1,78 @@
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils import video_hash_store, video_hasher
+from utils.video_hash_store import VideoHashStore
+
+
+class _FakeCursor:
+    def __init__(self, table: dict):
+        self.table = table
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        revision = params[0]
+        self.rows = sorted(
+            ((file_id, hashes, rev) for file_id, (_, hashes, rev) in self.table.items() if rev > revision),
+            key=lambda row: row[2],
+        )
+
+    def fetchall(self):
+        return self.rows
+
+
+class _FakeStore(VideoHashStore):
+    """VideoHashStore over a dict instead of Postgres; the upsert is done by the fake execute_values."""
+
+    def __init__(self):
+        self.table = {}
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return _FakeCursor(self.table)
+
+
+def _fake_execute_values(cursor, query, rows, page_size):
+    for file_id, frame_numbers, hashes in rows:
+        revision = max((rev for _, _, rev in cursor.table.values()), default=0) + 1
+        cursor.table[file_id] = (frame_numbers, hashes, revision)
+
+
+def test_hashes_round_trip_through_signed_bigint(monkeypatch):
+    monkeypatch.setattr(video_hash_store, "execute_values", _fake_execute_values)
+    store = _FakeStore()
+    hashes = np.array([2 ** 64 - 1, 2 ** 63, 1], dtype=np.uint64)
+
+    store.save_many([("a", [0, 30, 60], hashes)])
+    videos, revision = store.load_since(0)
+
+    assert all(-2 ** 63 <= value < 2 ** 63 for value in store.table["a"][1])
+    assert videos[0][0] == "a"
+    assert videos[0][1].tolist() == hashes.tolist()
+    assert store.load_since(revision) == ([], revision)
+
+
+def test_hash_index_picks_up_only_new_rows(monkeypatch):
+    monkeypatch.setattr(video_hash_store, "execute_values", _fake_execute_values)
+    store = _FakeStore()
+    monkeypatch.setattr(video_hasher, "get_hash_store", lambda: store)
+    monkeypatch.setattr(video_hasher, "_hash_index", None)
+    monkeypatch.setattr(video_hasher, "HASH_INDEX_SYNC_SECONDS", 0)
+
+    store.save_many([("a", [0], np.array([1], dtype=np.uint64))])
+    index = video_hasher.get_hash_index()
+    store.save_many([("b", [0], np.array([2 ** 64 - 1], dtype=np.uint64))])
+    video_hasher.get_hash_index()
+
+    assert index.file_ids == ["a", "b"]
+    assert index.find(np.array([2 ** 64 - 1], dtype=np.uint64), similarity_threshold=0.96)[0] == "b"
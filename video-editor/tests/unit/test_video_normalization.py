@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+import pytest
+
+from utils import video_normalization
+from utils.media_metadata import MediaMetadata, StreamInfo
+from utils.video_normalization import NormalizationPlan, normalize, plan_normalization
+
+_H264 = StreamInfo(0, "video", "h264", 1080, 1920, 30.0, profile="High", pix_fmt="yuv420p", bit_rate=4_000_000)
+_AAC = StreamInfo(1, "audio", "aac", None, None, None, profile="LC")
+_MP4 = "mov,mp4,m4a,3gp,3g2,mj2"
+
+
+def _box(box_type: bytes, payload_size: int = 0) -> bytes:
+    return (8 + payload_size).to_bytes(4, "big") + box_type + b"\0" * payload_size
+
+
+@pytest.fixture
+def mp4_file(tmp_path):
+    def write(*box_types: bytes) -> str:
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"".join(_box(box_type, 24) for box_type in box_types))
+        return str(path)
+    return write
+
+
+def _plan(metadata: MediaMetadata, path: str) -> NormalizationPlan:
+    with patch("utils.video_normalization.probe", return_value=metadata):
+        return plan_normalization(path)
+
+
+def test_compliant_faststart_mp4_is_skipped(mp4_file):
+    plan = _plan(MediaMetadata(10.0, [_H264, _AAC], format_name=_MP4), mp4_file(b"ftyp", b"moov", b"mdat"))
+
+    assert plan.skip
+
+
+def test_compliant_mp4_without_faststart_is_only_remuxed(mp4_file):
+    plan = _plan(MediaMetadata(10.0, [_H264, _AAC], format_name=_MP4), mp4_file(b"ftyp", b"free", b"mdat", b"moov"))
+
+    assert plan == NormalizationPlan(copy_video=True, copy_audio=True, faststart=False)
+
+
+def test_only_the_non_compliant_stream_is_reencoded(mp4_file):
+    opus = StreamInfo(1, "audio", "opus", None, None, None)
+    high_10 = _H264._replace(profile="High 10", pix_fmt="yuv420p10le")
+    path = mp4_file(b"ftyp", b"moov", b"mdat")
+
+    assert _plan(MediaMetadata(10.0, [_H264, opus], format_name=_MP4), path) == (True, False, True)
+    assert _plan(MediaMetadata(10.0, [high_10, _AAC], format_name=_MP4), path) == (False, True, True)
+
+
+def test_bitrate_above_ceiling_is_reencoded(mp4_file, monkeypatch):
+    monkeypatch.setattr(video_normalization, "MAX_VIDEO_BITRATE", 2_000_000)
+
+    plan = _plan(MediaMetadata(10.0, [_H264, _AAC], format_name=_MP4), mp4_file(b"ftyp", b"moov", b"mdat"))
+
+    assert not plan.copy_video
+
+
+def test_other_containers_are_always_rewritten(mp4_file):
+    plan = _plan(MediaMetadata(10.0, [_H264, _AAC], format_name="matroska,webm"), mp4_file(b"ftyp", b"moov"))
+
+    assert plan == NormalizationPlan(copy_video=False, copy_audio=False, faststart=False)
+
+
+@patch("utils.video_normalization.subprocess.run")
+def test_normalize_runs_nothing_when_skipped(mock_run):
+    assert not normalize("in.mp4", "out.mp4", NormalizationPlan(True, True, True))
+    mock_run.assert_not_called()
+
+    assert normalize("in.mp4", "out.mp4", NormalizationPlan(True, True, False))
+    cmd = mock_run.call_args.args[0]
+    assert cmd[cmd.index("-c:v") + 1] == "copy" and cmd[cmd.index("-c:a") + 1] == "copy"
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from utils import video_similarity
+from utils.video_similarity import align
+
+rng = np.random.default_rng(1)
+
+
+def _random_video(frames: int) -> np.ndarray:
+    return rng.integers(0, np.iinfo(np.uint64).max, size=frames, dtype=np.uint64, endpoint=True)
+
+
+def test_identical_videos_align_at_zero():
+    video = _random_video(20)
+
+    alignment = align(video, video, similarity_threshold=0.96)
+
+    assert alignment.similarity == 1.0
+    assert alignment.offset == 0
+    assert alignment.segments == [(0, 20, 0, 20)]
+
+
+def test_trimmed_copy_aligns_at_its_offset():
+    original = _random_video(60)
+
+    alignment = align(original[15:40], original, similarity_threshold=0.96)
+
+    assert alignment.offset == 15
+    assert alignment.segments == [(0, 25, 15, 40)]
+
+
+def test_recut_copy_reports_matched_segments():
+    original = _random_video(40)
+    # Intro cut off and an ad spliced into the middle
+    recut = np.concatenate([original[5:15], _random_video(2), original[17:40]])
+
+    alignment = align(recut, original, similarity_threshold=0.9)
+
+    assert alignment.offset == 5
+    assert alignment.segments == [(0, 10, 5, 15), (12, 35, 17, 40)]
+    assert alignment.similarity == pytest.approx(1 - np.bitwise_count(recut[10:12] ^ original[15:17]).sum() / (35 * 64))
+
+
+def test_short_edge_overlap_is_ignored():
+    a, b = _random_video(20), _random_video(20)
+    # Only the last frame of a equals the first frame of b
+    b[0] = a[-1]
+
+    assert align(a, b, similarity_threshold=0.96) is None
+
+
+def test_unrelated_videos_stop_early(monkeypatch):
+    compared = []
+    original = video_similarity.hamming_distances
+    monkeypatch.setattr(video_similarity, "hamming_distances", lambda a, b: compared.append(a.size) or original(a, b))
+
+    assert align(_random_video(200), _random_video(200), similarity_threshold=0.96) is None
+    # A full pass over every kept diagonal would compare ~30000 frame pairs
+    assert sum(compared) < 200 * 200 / 8
@@ -1,4 +1,6 @@
+import os
 
+import numpy as np
 import pytest
 from utils.scene_changes_detector import get_changes_timecodes
 from utils.video_editing_utils import split_video
@@ -20,3 +22,76 @@ def test_scene_changes_detector_parametrized(test_file_path, expected_scene_coun
 def test_split():
     test_file_path = "/Users/alexeykiselev/AiMachineTesting/Test/test_scene_changes_8.mp4"
     split_video(test_file_path, "/Users/alexeykiselev/AiMachineTesting/Test/test_scene_changes")
+
+
+def _write_cuts_video(path):
+    from moviepy import ColorClip, concatenate_videoclips
+
+    colors = [(200, 30, 30), (30, 200, 30), (30, 30, 200), (220, 220, 40)]
+    clips = [ColorClip((320, 240), color=color, duration=1) for color in colors]
+    video = concatenate_videoclips(clips)
+    # Keyframes every half second, so the cuts at whole seconds can be stream-copied exactly
+    video.write_videofile(str(path), fps=30, codec="libx264", audio=False, logger=None, ffmpeg_params=["-g", "15"])
+    video.close()
+    return str(path)
+
+
+def _cut_frames(scene_list):
+    return [start.get_frames() for start, _ in scene_list[1:]]
+
+
+@pytest.mark.integration
+def test_downscaled_detection_finds_the_same_cuts(tmp_path, monkeypatch):
+    from utils import scene_changes_detector
+
+    monkeypatch.setattr(scene_changes_detector, "CACHE_DIR", "")
+    path = _write_cuts_video(tmp_path / "cuts.mp4")
+
+    full = get_changes_timecodes(path)
+    fast = get_changes_timecodes(path, downscale=4, frame_skip=1)
+
+    assert _cut_frames(full) == [30, 60, 90]
+    # With every other frame skipped a cut can land one frame later
+    assert all(0 <= f - e <= 1 for f, e in zip(_cut_frames(fast), _cut_frames(full)))
+    assert len(fast) == len(full)
+    assert fast[-1][1].get_frames() == full[-1][1].get_frames()
+
+
+@pytest.mark.integration
+def test_scene_list_is_cached_by_content(tmp_path, monkeypatch):
+    import shutil
+    from utils import scene_changes_detector
+
+    monkeypatch.setattr(scene_changes_detector, "CACHE_DIR", str(tmp_path / "cache"))
+    path = _write_cuts_video(tmp_path / "cuts.mp4")
+    copy = str(tmp_path / "copy.mp4")
+    shutil.copyfile(path, copy)
+
+    first = get_changes_timecodes(path)
+    monkeypatch.setattr(scene_changes_detector, "detect", lambda *args: pytest.fail("detected twice"))
+    second = get_changes_timecodes(copy)
+
+    assert second == first
+    assert _cut_frames(second) == [30, 60, 90]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("stream_copy", [False, True])
+def test_split_video_cuts_every_scene(tmp_path, monkeypatch, stream_copy):
+    from utils import scene_changes_detector
+    from utils.video_editing_utils import get_duration, get_keyframe_times
+
+    monkeypatch.setattr(scene_changes_detector, "CACHE_DIR", "")
+    path = _write_cuts_video(tmp_path / "cuts.mp4")
+
+    parts = split_video(path, str(tmp_path / "parts"), stream_copy=stream_copy)
+
+    assert [os.path.basename(p).split("-Scene-")[1] for p in parts] == ["001.mp4", "002.mp4", "003.mp4", "004.mp4"]
+    durations = [get_duration(p) for p in parts]
+    if not stream_copy:
+        assert durations == pytest.approx([1, 1, 1, 1], abs=0.05)
+    else:
+        # Scenes start at the source's keyframes
+        keyframes = get_keyframe_times(path)
+        assert sum(durations) == pytest.approx(4, abs=0.05)
+        assert all(min(abs(k - t) for k in keyframes) < 0.01 for t in np.cumsum(durations)[:-1])
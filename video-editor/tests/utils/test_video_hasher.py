@@ -0,0 +1,40 @@
+import imagehash
+import numpy as np
+import pytest
+from moviepy import VideoClip
+
+from utils import video_hasher
+from utils.video_hasher import extract_frames, sample_frame_hashes
+
+
+def _moving_gradient(t):
+    x = np.linspace(0, 255, 320)
+    row = (x + t * 200) % 256
+    frame = np.tile(row, (240, 1)).astype(np.uint8)
+    frame[int(t * 50) % 240:, :160] = 255 - frame[int(t * 50) % 240:, :160]
+    return np.dstack([frame, frame[::-1], np.roll(frame, 40, axis=1)])
+
+
+def _write_video(path, gop):
+    clip = VideoClip(_moving_gradient, duration=4)
+    clip.write_videofile(str(path), fps=30, codec="libx264", audio=False, logger=None, ffmpeg_params=["-g", str(gop)])
+    clip.close()
+    return str(path)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("gop, seeks", [(10, True), (250, False)])
+def test_sample_frame_hashes_matches_full_decode(tmp_path, monkeypatch, gop, seeks):
+    path = _write_video(tmp_path / f"gop{gop}.mp4", gop)
+    calls = []
+    original = video_hasher._read_by_seeking
+    monkeypatch.setattr(video_hasher, "_read_by_seeking", lambda cap, targets: calls.append(1) or original(cap, targets))
+
+    hashes, frame_numbers = sample_frame_hashes(path)
+
+    frames, expected_numbers = extract_frames(path)
+    expected = [imagehash.average_hash(frame) for frame in frames]
+    assert frame_numbers == expected_numbers == [0, 30, 60, 90]
+    assert bool(calls) == seeks
+    # Grayscale straight from BGR may round a pixel differently than PIL's RGB → L
+    assert all(imagehash.hex_to_hash(h) - e <= 1 for h, e in zip(hashes, expected))
@@ -1,7 +1,7 @@
 import logging
 import os
-from typing import List
-from uuid import uuid4
+from typing import List, Tuple
+from uuid import UUID, uuid4
 
 class WorkspaceManager:
     def create_workspace(self, base_path: str):
@@ -33,6 +33,25 @@ class EditingWorkspace:
                 f.write(f"file '{os.path.abspath(path)}'\n")
         return concat_file_path
 
+    def create_segments_concat_file(self, file_path: str, segments: List[Tuple[float, float]]) -> str:
+        """Создает файл для конкатенации фрагментов одного видео (inpoint/outpoint)."""
+        concat_file_path = self.get_temp_path('txt')
+        with open(concat_file_path, "w") as f:
+            for start, end in segments:
+                f.write(f"file '{os.path.abspath(file_path)}'\n")
+                f.write(f"inpoint {start:.3f}\n")
+                f.write(f"outpoint {end:.3f}\n")
+        return concat_file_path
+
+    def snapshot(self) -> dict:
+        """Состояние рабочего пространства для сохранения в чекпоинт."""
+        return {"editing_uid": str(self.editing_uid), "temp_files": list(self._temp_files)}
+
+    def restore(self, snapshot: dict) -> None:
+        """Восстанавливает состояние из чекпоинта, чтобы новые пути не пересекались со старыми."""
+        self.editing_uid = UUID(snapshot["editing_uid"])
+        self._temp_files = list(snapshot["temp_files"])
+
     def cleanup(self):
         """Удаляет все временные файлы, созданные в этом рабочем пространстве."""
         for path in self._temp_files:
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 TARGET_WIDTH = 1080
 TARGET_HEIGHT = 1920
@@ -16,44 +16,363 @@ def build_normalize_concat_command(
     output_path: str,
     trim_decisions: Optional[Dict[str, "TrimDecision"]] = None,  # keyed by media_id
     media_ids: Optional[List[str]] = None,
+    force_key_frames: Optional[Sequence[float]] = None,
 ) -> List[str]:
     """Normalize, optionally trim, and concatenate clips in a single ffmpeg pass.
 
     Each clip is scaled/padded to TARGET resolution and fps.  If trim_decisions
     contains an entry for a clip's media_id the video and audio streams are
     trimmed before the scale filter.  All clips are then concatenated with the
-    concat filter and encoded once to H.264/AAC.
+    concat filter and encoded once to H.264/AAC.  force_key_frames places
+    keyframes at the given output timestamps so the result can later be cut
+    there without re-encoding.
     """
-    n = len(input_paths)
-    trim_decisions = trim_decisions or {}
-    media_ids = media_ids or [None] * n  # type: ignore[list-item]
-
     cmd = ["ffmpeg", "-y"]
     for path in input_paths:
         cmd += ["-i", path]
 
+    filter_parts = _normalize_concat_filter(len(input_paths), trim_decisions, media_ids)
+
+    cmd += ["-filter_complex", ";".join(filter_parts)]
+    cmd += ["-map", "[v]", "-map", "[a]"]
+    cmd += ["-c:v", "libx264", "-c:a", "aac", "-r", str(TARGET_FPS)]
+    if force_key_frames:
+        cmd += ["-force_key_frames", ",".join(f"{t:.3f}" for t in force_key_frames)]
+    cmd += [output_path]
+    return cmd
+
+
+def build_concat_copy_command(concat_file_path: str, output_path: str) -> List[str]:
+    """Join the entries of a concat demuxer list without re-encoding."""
+    return [
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0",
+        "-i", concat_file_path,
+        "-c", "copy",
+        "-avoid_negative_ts", "make_zero",
+        output_path,
+    ]
+
+
+def build_split_scene_command(
+    input_path: str,
+    start: float,
+    duration: float,
+    output_path: str,
+    stream_copy: bool = False,
+    frame_count: Optional[int] = None,
+) -> List[str]:
+    """Cut one scene out of input_path.
+
+    Re-encodes by default, so the cut is frame-exact. With stream_copy the packets
+    are copied: fast, but the scene starts at the keyframe at or before start, so
+    start should already be a keyframe. Copied video stops after frame_count
+    frames when given, since -t alone lets B-frames past the end through.
+    """
+    cmd = ["ffmpeg", "-y", "-v", "error", "-nostdin", "-ss", f"{start:.6f}", "-i", input_path, "-t", f"{duration:.6f}"]
+    cmd += ["-map", "0:v:0", "-map", "0:a?"]
+    if stream_copy:
+        cmd += ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+        if frame_count is not None:
+            cmd += ["-frames:v", str(frame_count)]
+    else:
+        cmd += ["-c:v", "libx264", "-preset", "veryfast", "-crf", "22", "-c:a", "aac"]
+    cmd += ["-sn", output_path]
+    return cmd
+
+
+def build_normalize_command(
+    input_path: str,
+    output_path: str,
+    copy_video: bool = False,
+    copy_audio: bool = False,
+) -> List[str]:
+    """Normalize an upload to faststart H.264/AAC MP4.
+
+    Streams that are already compliant are copied instead of re-encoded; with
+    both copied this is a remux that only moves the moov atom to the front.
+    """
+    return ["ffmpeg", "-y", "-v", "error", "-i", input_path] + normalize_output_args(
+        output_path, copy_video=copy_video, copy_audio=copy_audio,
+    )
+
+
+def normalize_output_args(
+    output_path: str,
+    copy_video: bool = False,
+    copy_audio: bool = False,
+    video_source: str = "0:v:0",
+) -> List[str]:
+    """Output options of build_normalize_command; video_source may be a filter graph label."""
+    cmd = ["-map", video_source, "-map", "0:a?"]
+    cmd += ["-c:v", "copy"] if copy_video else ["-c:v", "libx264", "-crf", "23", "-preset", "fast"]
+    cmd += ["-c:a", "copy"] if copy_audio else ["-c:a", "aac", "-b:a", "128k"]
+    cmd += ["-movflags", "+faststart", output_path]
+    return cmd
+
+
+def build_detect_silence_command(
+    input_paths: List[str],
+    noise_db: float,
+    min_duration: float,
+    trim_decisions: Optional[Dict[str, "TrimDecision"]] = None,  # keyed by media_id
+    media_ids: Optional[List[str]] = None,
+) -> List[str]:
+    """Run silencedetect over the trimmed + concatenated audio of the inputs.
+
+    Nothing is encoded or written: the video streams are never decoded and the
+    result is only the silencedetect log on stderr.
+    """
+    cmd = ["ffmpeg", "-hide_banner"]
+    for path in input_paths:
+        cmd += ["-i", path]
+
+    filter_parts = _normalize_concat_filter(len(input_paths), trim_decisions, media_ids, video=False)
+    filter_parts.append(f"[a]silencedetect=noise={noise_db}dB:d={min_duration}[silence]")
+
+    cmd += ["-filter_complex", ";".join(filter_parts)]
+    cmd += ["-map", "[silence]", "-f", "null", "-"]
+    return cmd
+
+
+def build_remove_silence_command(
+    input_path: str,
+    output_path: str,
+    keep_segments: Sequence[Tuple[float, float]],
+) -> List[str]:
+    """Cut a video down to keep_segments with trim/atrim + concat in one ffmpeg pass."""
+    filter_parts = _select_segments_filter(keep_segments, "0:v", "0:a")
+    return [
+        "ffmpeg", "-y",
+        "-i", input_path,
+        "-filter_complex", ";".join(filter_parts),
+        "-map", "[vcut]", "-map", "[acut]",
+        "-c:v", "libx264", "-c:a", "aac", "-r", str(TARGET_FPS),
+        output_path,
+    ]
+
+
+def build_add_music_command(
+    video_path: str,
+    music_path: str,
+    output_path: str,
+    volume: float,
+    duration: float,
+    has_audio: bool = True,
+) -> List[str]:
+    """Loop/trim music to duration and mix it under the video's audio.
+
+    Only the audio is encoded — the video stream is copied as is.
+    """
+    music_chain = f"[1:a]atrim=start=0:end={duration:.3f},asetpts=PTS-STARTPTS"
+    if has_audio:
+        filter_graph = f"{music_chain}[music_fit];" + _music_mix_filter("music_fit", "0:a", volume)
+    else:
+        filter_graph = f"{music_chain},volume={volume}[amix]"
+
+    return [
+        "ffmpeg", "-y",
+        "-i", video_path,
+        "-stream_loop", "-1", "-i", music_path,
+        "-filter_complex", filter_graph,
+        "-map", "0:v", "-map", "[amix]",
+        "-c:v", "copy", "-c:a", "aac",
+        output_path,
+    ]
+
+
+def build_replace_audio_command(video_path: str, audio_path: str, output_path: str, duration: float) -> List[str]:
+    """Swap the audio track of a video, copying the video stream untouched.
+
+    The new track is padded with silence or trimmed to duration, so the video
+    always keeps its full length.
+    """
+    return [
+        "ffmpeg", "-y",
+        "-i", video_path,
+        "-i", audio_path,
+        "-filter_complex", f"[1:a]apad,atrim=end={duration:.3f}[a]",
+        "-map", "0:v", "-map", "[a]",
+        "-c:v", "copy", "-c:a", "aac",
+        output_path,
+    ]
+
+
+def build_single_pass_command(
+    input_paths: List[str],
+    output_path: str,
+    trim_decisions: Optional[Dict[str, "TrimDecision"]] = None,  # keyed by media_id
+    media_ids: Optional[List[str]] = None,
+    keep_segments: Optional[Sequence[Tuple[float, float]]] = None,
+    music_path: Optional[str] = None,
+    music_volume: float = 1.0,
+    audio_path: Optional[str] = None,
+    video_filter: Optional[str] = None,
+    audio_only: bool = False,
+    audio_codec: str = "libmp3lame",
+    fragmented: bool = False,
+) -> List[str]:
+    """Compile every collected edit into one filter graph and encode once.
+
+    The graph is the normalize/trim/concat graph of build_normalize_concat_command
+    followed by, in order: cutting the timeline down to keep_segments, mixing
+    looped music under the source audio, replacing the audio with audio_path
+    (which already contains everything mixed before it) and applying
+    video_filter (e.g. the subtitles burn).
+
+    With audio_only=True the video branch is left out entirely, so no frame is
+    decoded or encoded and the result is a quick audio_codec render of the
+    timeline. fragmented=True writes fragmented MP4, which output_path="pipe:1"
+    needs.
+    """
+    use_video = not audio_only
+    # With a replacement track the source audio still bounds its length in a video render
+    use_source_audio = audio_path is None or use_video
+
+    cmd = ["ffmpeg", "-y"]
+    filter_parts: List[str] = []
+    video_label: Optional[str] = None
+    audio_label: Optional[str] = None
+    next_input = 0
+
+    if use_video or use_source_audio:
+        for path in input_paths:
+            cmd += ["-i", path]
+        next_input = len(input_paths)
+
+        filter_parts += _normalize_concat_filter(
+            len(input_paths), trim_decisions, media_ids,
+            video=use_video, audio=use_source_audio,
+        )
+        video_label = "v" if use_video else None
+        audio_label = "a" if use_source_audio else None
+
+        if keep_segments:
+            filter_parts += _select_segments_filter(keep_segments, video_label, audio_label)
+            video_label = "vcut" if video_label else None
+            audio_label = "acut" if audio_label else None
+
+    if audio_path is None and music_path:
+        cmd += ["-stream_loop", "-1", "-i", music_path]
+        filter_parts.append(_music_mix_filter(f"{next_input}:a", audio_label, music_volume))
+        audio_label = "amix"
+        next_input += 1
+
+    if audio_path is None:
+        audio_map = f"[{audio_label}]"
+    else:
+        cmd += ["-i", audio_path]
+        if use_video:
+            # Lay the replacement over the muted timeline audio, so it is padded
+            # or cut to exactly the length of the video
+            filter_parts.append(
+                f"[{audio_label}]volume=0[bed];"
+                f"[bed][{next_input}:a]amix=inputs=2:duration=first:dropout_transition=0:normalize=0[avo]"
+            )
+            audio_map = "[avo]"
+        else:
+            audio_map = f"{next_input}:a"
+
+    if use_video and video_filter:
+        filter_parts.append(f"[{video_label}]{video_filter}[vout]")
+        video_label = "vout"
+
+    if filter_parts:
+        cmd += ["-filter_complex", ";".join(filter_parts)]
+    if use_video:
+        cmd += ["-map", f"[{video_label}]"]
+    cmd += ["-map", audio_map]
+
+    if use_video:
+        cmd += ["-c:v", "libx264", "-c:a", "aac", "-r", str(TARGET_FPS)]
+    else:
+        cmd += ["-c:a", audio_codec]
+    if fragmented:
+        # No seeking back to write the moov atom, so the output can go to a pipe
+        cmd += ["-f", "mp4", "-movflags", "frag_keyframe+empty_moov"]
+    cmd += [output_path]
+    return cmd
+
+
+def _normalize_concat_filter(
+    n: int,
+    trim_decisions: Optional[Dict[str, "TrimDecision"]],
+    media_ids: Optional[List[str]],
+    video: bool = True,
+    audio: bool = True,
+) -> List[str]:
+    """Per-clip trim/normalize chains and the concat filter producing [v] and/or [a]."""
+    trim_decisions = trim_decisions or {}
+    media_ids = media_ids or [None] * n  # type: ignore[list-item]
+
     filter_parts: List[str] = []
     for i, media_id in enumerate(media_ids):
         decision = trim_decisions.get(media_id) if media_id else None
 
+        chains: List[str] = []
         if decision is not None:
             ts = decision.trim_start
             te = decision.trim_end
-            filter_parts.append(
-                f"[{i}:v]trim=start={ts}:end={te},setpts=PTS-STARTPTS,{_SCALE_PAD}[v{i}];"
-                f"[{i}:a]atrim=start={ts}:end={te},asetpts=PTS-STARTPTS[a{i}]"
-            )
+            if video:
+                chains.append(f"[{i}:v]trim=start={ts}:end={te},setpts=PTS-STARTPTS,{_SCALE_PAD}[v{i}]")
+            if audio:
+                chains.append(f"[{i}:a]atrim=start={ts}:end={te},asetpts=PTS-STARTPTS[a{i}]")
         else:
-            filter_parts.append(
-                f"[{i}:v]{_SCALE_PAD}[v{i}];"
-                f"[{i}:a]anull[a{i}]"
-            )
+            if video:
+                chains.append(f"[{i}:v]{_SCALE_PAD}[v{i}]")
+            if audio:
+                chains.append(f"[{i}:a]anull[a{i}]")
+        filter_parts.append(";".join(chains))
 
-    concat_inputs = "".join(f"[v{i}][a{i}]" for i in range(n))
-    filter_parts.append(f"{concat_inputs}concat=n={n}:v=1:a=1[v][a]")
+    concat_inputs = "".join(
+        (f"[v{i}]" if video else "") + (f"[a{i}]" if audio else "") for i in range(n)
+    )
+    outputs = ("[v]" if video else "") + ("[a]" if audio else "")
+    filter_parts.append(f"{concat_inputs}concat=n={n}:v={int(video)}:a={int(audio)}{outputs}")
+    return filter_parts
 
-    cmd += ["-filter_complex", ";".join(filter_parts)]
-    cmd += ["-map", "[v]", "-map", "[a]"]
-    cmd += ["-c:v", "libx264", "-c:a", "aac", "-r", str(TARGET_FPS)]
-    cmd += [output_path]
-    return cmd
+
+def _select_segments_filter(
+    segments: Sequence[Tuple[float, float]],
+    video_label: Optional[str],
+    audio_label: Optional[str],
+) -> List[str]:
+    """Keep only the given [start, end] ranges and close the gaps: [vcut] / [acut].
+
+    Every range is cut with trim/atrim and the pieces are joined with the concat
+    filter, so audio and video restart together at each cut.  Boundaries are
+    snapped to the TARGET_FPS frame grid so both streams cut at the same instant
+    and no A/V offset builds up over many cuts.
+    """
+    segments = [(_snap_to_frame(start), _snap_to_frame(end)) for start, end in segments]
+    k = len(segments)
+    filter_parts: List[str] = []
+    if video_label:
+        filter_parts.append(f"[{video_label}]split={k}" + "".join(f"[vsrc{i}]" for i in range(k)))
+        for i, (start, end) in enumerate(segments):
+            filter_parts.append(f"[vsrc{i}]trim=start={start:.3f}:end={end:.3f},setpts=PTS-STARTPTS[vseg{i}]")
+    if audio_label:
+        filter_parts.append(f"[{audio_label}]asplit={k}" + "".join(f"[asrc{i}]" for i in range(k)))
+        for i, (start, end) in enumerate(segments):
+            filter_parts.append(f"[asrc{i}]atrim=start={start:.3f}:end={end:.3f},asetpts=PTS-STARTPTS[aseg{i}]")
+
+    concat_inputs = "".join(
+        (f"[vseg{i}]" if video_label else "") + (f"[aseg{i}]" if audio_label else "") for i in range(k)
+    )
+    outputs = ("[vcut]" if video_label else "") + ("[acut]" if audio_label else "")
+    filter_parts.append(
+        f"{concat_inputs}concat=n={k}:v={int(bool(video_label))}:a={int(bool(audio_label))}{outputs}"
+    )
+    return filter_parts
+
+
+def _snap_to_frame(t: float) -> float:
+    return round(t * TARGET_FPS) / TARGET_FPS
+
+
+def _music_mix_filter(music_label: str, audio_label: str, volume: float) -> str:
+    """Scale the music by volume and add it to the audio without normalizing: [amix]."""
+    return (
+        f"[{music_label}]volume={volume}[music];"
+        f"[{audio_label}][music]amix=inputs=2:duration=first:dropout_transition=0:normalize=0[amix]"
+    )
@@ -0,0 +1,128 @@
+import logging
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from utils.video_similarity import HASH_BITS, Alignment, align
+
+logger = logging.getLogger(__name__)
+
+# Multi-index hashing: each 64-bit hash is split into _CHUNKS exact-match tables. Two hashes
+# within _CHUNKS - 1 bits of each other agree exactly on at least one chunk (pigeonhole).
+_CHUNKS = 4
+_CHUNK_BITS = HASH_BITS // _CHUNKS
+_CHUNK_MASK = np.uint64((1 << _CHUNK_BITS) - 1)
+# New entries are kept unsorted until there are this many, then merged into the sorted tables
+_MERGE_THRESHOLD = 65536
+
+
+def pack_hashes(hex_hashes: list[str]) -> np.ndarray:
+    """Hex imagehash strings → uint64 array, one entry per frame."""
+    return np.array([int(h, 16) for h in hex_hashes], dtype=np.uint64)
+
+
+class Match(NamedTuple):
+    file_id: str
+    similarity: float
+    alignment: Alignment
+
+
+class VideoHashIndex:
+    """In-memory index of per-frame 64-bit hashes for near-duplicate video lookup.
+
+    Videos are compared with utils.video_similarity.align, i.e. at the frame offset
+    where they line up best, so trimmed or re-cut copies are found too. Because the
+    mean distance over the aligned frames can only be below the bound if at least
+    one frame pair is, candidates are the videos that share one exact 16-bit chunk
+    with any query frame; only those are aligned. Loose thresholds that the chunk
+    tables can't guarantee fall back to aligning every video.
+    """
+
+    def __init__(self):
+        self.file_ids: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._hashes: list[np.ndarray] = []
+        self._keys = [np.empty(0, dtype=np.uint64) for _ in range(_CHUNKS)]
+        self._owners = [np.empty(0, dtype=np.int64) for _ in range(_CHUNKS)]
+        self._pending_keys: list[list[np.ndarray]] = [[] for _ in range(_CHUNKS)]
+        self._pending_owners: list[list[np.ndarray]] = [[] for _ in range(_CHUNKS)]
+        self._pending_size = 0
+
+    def __len__(self) -> int:
+        return len(self.file_ids)
+
+    def add(self, file_id: str, hashes: np.ndarray) -> None:
+        if file_id in self._positions:
+            self.remove(file_id)
+        owner = len(self.file_ids)
+        self.file_ids.append(file_id)
+        self._positions[file_id] = owner
+        self._hashes.append(hashes)
+
+        for chunk in range(_CHUNKS):
+            self._pending_keys[chunk].append(_chunk_keys(hashes, chunk))
+            self._pending_owners[chunk].append(np.full(len(hashes), owner, dtype=np.int64))
+        self._pending_size += len(hashes)
+        if self._pending_size >= _MERGE_THRESHOLD:
+            self._merge_pending()
+
+    def remove(self, file_id: str) -> None:
+        # The slot stays so owner numbers remain valid; an empty video never matches
+        owner = self._positions.pop(file_id)
+        self._hashes[owner] = np.empty(0, dtype=np.uint64)
+
+    def find(
+        self, query: np.ndarray, similarity_threshold: float, exclude: str | None = None,
+    ) -> Match | None:
+        """Most similar indexed video with similarity above the threshold, or None.
+
+        exclude skips one file_id, e.g. the query video itself when it is already stored.
+        """
+        if len(query) == 0 or not self.file_ids:
+            return None
+
+        max_mean_distance = (1 - similarity_threshold) * HASH_BITS
+        # Some aligned frame pair must be at most this far apart for the mean to pass
+        radius = math.ceil(max_mean_distance) - 1
+        if radius < 0:
+            return None
+        owners = self._candidates(query) if radius < _CHUNKS else np.arange(len(self.file_ids))
+
+        best = None
+        for owner in owners:
+            file_id = self.file_ids[owner]
+            if file_id == exclude:
+                continue
+            alignment = align(query, self._hashes[owner], similarity_threshold)
+            if alignment is not None and (best is None or alignment.similarity > best.similarity):
+                best = Match(file_id, alignment.similarity, alignment)
+        return best
+
+    def _candidates(self, query: np.ndarray) -> np.ndarray:
+        found = []
+        for chunk in range(_CHUNKS):
+            query_keys = np.unique(_chunk_keys(query, chunk))
+            keys, owners = self._keys[chunk], self._owners[chunk]
+            left = np.searchsorted(keys, query_keys, side="left")
+            right = np.searchsorted(keys, query_keys, side="right")
+            found.extend(owners[l:r] for l, r in zip(left, right) if r > l)
+            for pending_keys, pending_owners in zip(self._pending_keys[chunk], self._pending_owners[chunk]):
+                found.append(pending_owners[np.isin(pending_keys, query_keys)])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def _merge_pending(self) -> None:
+        for chunk in range(_CHUNKS):
+            keys = np.concatenate([self._keys[chunk], *self._pending_keys[chunk]])
+            owners = np.concatenate([self._owners[chunk], *self._pending_owners[chunk]])
+            order = np.argsort(keys, kind="stable")
+            self._keys[chunk], self._owners[chunk] = keys[order], owners[order]
+            self._pending_keys[chunk], self._pending_owners[chunk] = [], []
+        self._pending_size = 0
+
+
+def _chunk_keys(hashes: np.ndarray, chunk: int) -> np.ndarray:
+    # No frame position in the key: a trimmed copy matches at a different one
+    return (hashes >> np.uint64(chunk * _CHUNK_BITS)) & _CHUNK_MASK
@@ -0,0 +1,99 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+from psycopg2.pool import ThreadedConnectionPool
+
+from utils.video_hash_store import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# A running claim older than this is considered abandoned (its worker died) and can be taken over
+DEFAULT_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "3600"))
+
+# One row per unit of work (e.g. "normalize:<media id>"). owner is the Celery task id holding it,
+# so a retried or redelivered task gets its own claim back.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    locked_until TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+_CLAIM = """
+INSERT INTO idempotency_keys (key, state, owner, locked_until)
+VALUES (%(key)s, 'running', %(owner)s, now() + %(lease)s * interval '1 second')
+ON CONFLICT (key) DO UPDATE
+SET state = 'running', owner = EXCLUDED.owner, locked_until = EXCLUDED.locked_until, updated_at = now()
+WHERE idempotency_keys.state = 'failed'
+   OR (idempotency_keys.state = 'running'
+       AND (idempotency_keys.owner = EXCLUDED.owner OR idempotency_keys.locked_until < now()))
+RETURNING key
+"""
+
+_FINISH = """
+UPDATE idempotency_keys SET state = %(state)s, updated_at = now()
+WHERE key = %(key)s AND owner = %(owner)s AND state = 'running'
+"""
+
+
+class IdempotencyStore:
+    """Claims on units of work in Postgres, so duplicate tasks skip what another one did or is doing."""
+
+    def __init__(self, max_connections: int = 2):
+        self._pool = ThreadedConnectionPool(1, max_connections, **DB_CONFIG)
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def ensure_schema(self) -> None:
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(SCHEMA)
+
+    def claim(self, key: str, owner: str, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> bool:
+        """True if owner may do the work: the key is new, failed, abandoned or already owner's.
+
+        False while another owner is running it, and once it's done.
+        """
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(_CLAIM, {"key": key, "owner": owner, "lease": lease_seconds})
+            return cursor.fetchone() is not None
+
+    def complete(self, key: str, owner: str) -> None:
+        self._finish(key, owner, "done")
+
+    def release(self, key: str, owner: str) -> None:
+        """Give up a claim after a failure, so a retry or a later request can take it."""
+        self._finish(key, owner, "failed")
+
+    def _finish(self, key: str, owner: str, state: str) -> None:
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(_FINISH, {"key": key, "owner": owner, "state": state})
+
+
+_store: IdempotencyStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Process-wide store; the table is created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = IdempotencyStore(int(os.getenv("IDEMPOTENCY_DB_POOL_SIZE", "2")))
+            store.ensure_schema()
+            _store = store
+        return _store
@@ -1,12 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
 from enum import StrEnum
+import json
 import os
 import logging
+from typing import BinaryIO, Callable
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ChunkedEncodingError
+from urllib3.util.retry import Retry
+
+from utils.storage.multipart_upload import multipart_enabled, multipart_put, multipart_put_stream
 
 logger = logging.getLogger(__name__)
 
 _BASE_URL = os.getenv("MEDIA_INGEST_URL", "http://media-ingest:5070")
+# Upper bound on parallel link lookups / downloads per job
+_FETCH_CONCURRENCY = int(os.getenv("MEDIA_FETCH_CONCURRENCY", "8"))
+# Keep-alive connections kept per host (media-ingest, the storage endpoint, ...)
+_POOL_SIZE = int(os.getenv("MEDIA_INGEST_POOL_SIZE", "16"))
+
+
+def _create_session() -> requests.Session:
+    # Only bodiless idempotent requests are retried: a PUT streaming a file can't be replayed
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+    )
+    adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared by every call in the process so link lookups, downloads and uploads reuse connections
+_session = _create_session()
 
 class MediaVariant(StrEnum):
     Tiny="Tiny"
@@ -16,26 +47,57 @@ class MediaVariant(StrEnum):
 def get_presigned_url(media_id: str) -> str:
     """Return a presigned download URL for the given media ID."""
     url = f"{_BASE_URL}/api/internal/media/{media_id}/link"
-    response = requests.get(url, params={"linkType": "Presigned", "includeMetadata": "false"}, timeout=30)
+    response = _session.get(url, params={"linkType": "Presigned", "includeMetadata": "false"}, timeout=30)
     response.raise_for_status()
     return response.json()["link"]
 
 
+def get_presigned_urls(media_ids: list[str]) -> list[str]:
+    """Resolve presigned download URLs for several media IDs, keeping the order.
+
+    media-ingest has no batch link endpoint, so the lookups run concurrently over
+    the shared keep-alive session instead.
+    """
+    if len(media_ids) <= 1:
+        return [get_presigned_url(media_id) for media_id in media_ids]
+    with ThreadPoolExecutor(max_workers=min(_FETCH_CONCURRENCY, len(media_ids))) as pool:
+        return list(pool.map(get_presigned_url, media_ids))
+
+
 def download_media(media_id: str, dest_path: str) -> None:
     """Download media via presigned URL and save to dest_path."""
-    presigned_url = get_presigned_url(media_id)
-    with requests.get(presigned_url, stream=True, timeout=300) as r:
-        r.raise_for_status()
-        with open(dest_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+    download_url(get_presigned_url(media_id), dest_path)
     logger.debug("Downloaded media %s to %s", media_id, dest_path)
 
 
+def download_url(url: str, dest_path: str, attempts: int = 3) -> None:
+    """Stream url to dest_path. A dropped connection resumes with a Range request instead of starting over."""
+    received = 0
+    with open(dest_path, "wb") as f:
+        for attempt in range(1, attempts + 1):
+            headers = {"Range": f"bytes={received}-"} if received else {}
+            try:
+                with _session.get(url, headers=headers, stream=True, timeout=300) as r:
+                    r.raise_for_status()
+                    if received and r.status_code != 206:
+                        # Server ignored the range, take the whole body again
+                        f.seek(0)
+                        f.truncate()
+                        received = 0
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+                        received += len(chunk)
+                return
+            except (requests.ConnectionError, requests.Timeout, ChunkedEncodingError) as e:
+                if attempt == attempts:
+                    raise
+                logger.warning("Download of %s interrupted at %d bytes, resuming: %s", dest_path, received, e)
+
+
 def get_upload_presigned_url(media_id: str) -> str:
     """Return a presigned PUT URL to overwrite an existing media file."""
     url = f"{_BASE_URL}/api/internal/media/{media_id}/presigned-upload"
-    response = requests.get(url, timeout=30)
+    response = _session.get(url, timeout=30)
     response.raise_for_status()
     return response.json()["uploadUrl"]
 
@@ -46,9 +108,20 @@ def overwrite_media(media_id: str, file_path: str, content_type: str = "video/mp
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"No file found: {file_path}")
 
+    put_file(url, file_path, content_type)
+
+    logger.debug("File %s was overwritten", media_id)
+
+
+def put_file(url: str, file_path: str, content_type: str) -> None:
+    """PUT file_path to a presigned storage URL; large files go up as parallel multipart parts."""
     file_size = os.path.getsize(file_path)
+    if multipart_enabled(file_size):
+        multipart_put(url, file_path, content_type)
+        return
+
     with open(file_path, "rb") as f:
-        put_response = requests.put(
+        put_response = _session.put(
             url,
             data=f,
             headers={"Content-Type": content_type, "Content-Length": str(file_size)},
@@ -56,8 +129,6 @@ def overwrite_media(media_id: str, file_path: str, content_type: str = "video/mp
         )
     put_response.raise_for_status()
 
-    logger.debug("File %s was overwritten", media_id)
-
 
 def upload_media(
         file_path: str, 
@@ -75,33 +146,65 @@ def upload_media(
     if variant:
         body["variant"] = variant
 
-    # 1. Register in media-ingest and get presigned PUT URL
-    response = requests.post(
+    # 1. Register in media-ingest and get presigned PUT URL.
+    #    A multipart upload interrupted earlier reuses its registration, so only the missing parts are sent.
+    registration_path = f"{file_path}.registration.json"
+    resumable = multipart_enabled(file_size)
+    if resumable and os.path.exists(registration_path):
+        with open(registration_path) as f:
+            data = json.load(f)
+    else:
+        data = _register_upload(body)
+        if resumable:
+            with open(registration_path, "w") as f:
+                json.dump(data, f)
+    media_id: str = data["mediaId"]
+    upload_url: str = data["uploadUrl"]
+
+    # 2. PUT file bytes directly to S3
+    put_file(upload_url, file_path, content_type)
+
+    # 3. Confirm upload so media-ingest marks the record as Uploaded
+    _complete_upload(media_id)
+    if resumable:
+        os.remove(registration_path)
+
+    logger.debug("Uploaded %s → media ID %s", file_path, media_id)
+    return media_id
+
+
+def upload_media_stream(
+        stream: BinaryIO,
+        file_name: str,
+        content_type: str = "video/mp4",
+        before_complete: Callable[[], None] | None = None) -> str:
+    """Like upload_media, but uploads a stream while it is still being written (multipart only).
+
+    The size is not known when the record is registered, so it is registered with fileSize 0.
+    """
+    data = _register_upload({"fileName": file_name, "contentType": content_type, "fileSize": 0})
+    media_id: str = data["mediaId"]
+
+    size = multipart_put_stream(data["uploadUrl"], stream, content_type, before_complete)
+    _complete_upload(media_id)
+
+    logger.debug("Streamed %d bytes → media ID %s", size, media_id)
+    return media_id
+
+
+def _register_upload(body: dict) -> dict:
+    response = _session.post(
         f"{_BASE_URL}/api/internal/media/presigned-upload",
         json=body,
         timeout=30,
     )
     response.raise_for_status()
-    data = response.json()
-    media_id: str = data["mediaId"]
-    upload_url: str = data["uploadUrl"]
+    return response.json()
 
-    # 2. PUT file bytes directly to S3
-    with open(file_path, "rb") as f:
-        put_response = requests.put(
-            upload_url,
-            data=f,
-            headers={"Content-Type": content_type, "Content-Length": str(file_size)},
-            timeout=300,
-        )
-    put_response.raise_for_status()
 
-    # 3. Confirm upload so media-ingest marks the record as Uploaded
-    complete_response = requests.post(
+def _complete_upload(media_id: str) -> None:
+    complete_response = _session.post(
         f"{_BASE_URL}/api/internal/media/{media_id}/upload-completed",
         timeout=30,
     )
     complete_response.raise_for_status()
-
-    logger.debug("Uploaded %s → media ID %s", file_path, media_id)
-    return media_id
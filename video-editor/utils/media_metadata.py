@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Probe results on disk; empty disables the cache
+CACHE_DIR = os.getenv("MEDIA_METADATA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "media-metadata"))
+PROBE_CONCURRENCY = int(os.getenv("MEDIA_PROBE_CONCURRENCY", "8"))
+# Bump when the cached fields change
+_CACHE_VERSION = 2
+
+
+class StreamInfo(NamedTuple):
+    index: int
+    codec_type: str
+    codec_name: str | None
+    width: int | None
+    height: int | None
+    fps: float | None
+    profile: str | None = None
+    pix_fmt: str | None = None
+    bit_rate: int | None = None
+
+
+class MediaMetadata(NamedTuple):
+    duration: float
+    streams: list[StreamInfo]
+    # Presentation timestamps (seconds) of the first video stream's keyframes, if requested
+    keyframes: list[float] | None = None
+    # Comma-separated demuxer names, e.g. "mov,mp4,m4a,3gp,3g2,mj2"
+    format_name: str | None = None
+    bit_rate: int | None = None
+
+    @property
+    def video(self) -> StreamInfo | None:
+        return next((s for s in self.streams if s.codec_type == "video"), None)
+
+    @property
+    def has_audio(self) -> bool:
+        return any(s.codec_type == "audio" for s in self.streams)
+
+    @property
+    def size(self) -> tuple[int, int] | None:
+        video = self.video
+        return (video.width, video.height) if video is not None else None
+
+
+def probe(media_path: str, keyframes: bool = False, media_id: str | None = None) -> MediaMetadata:
+    """Duration, streams and optionally the keyframe index of media_path from one ffprobe call.
+
+    Results are cached on disk under media_id when given (media-ingest objects never
+    change), otherwise under the local file's path, mtime and size. Remote URLs
+    without a media_id are not cached.
+    """
+    cache_path = _cache_path(media_path, media_id)
+    cached = _load_cached(cache_path) if cache_path else None
+    if cached is not None and (cached.keyframes is not None or not keyframes):
+        return cached
+
+    metadata = _run_probe(media_path, keyframes)
+    if cache_path:
+        _store_cached(cache_path, metadata)
+    return metadata
+
+
+def probe_many(
+    media_paths: list[str], keyframes: bool = False, media_ids: list[str | None] | None = None,
+) -> list[MediaMetadata]:
+    """probe() for several files, running up to PROBE_CONCURRENCY ffprobe processes at once."""
+    media_ids = media_ids or [None] * len(media_paths)
+    if not media_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(PROBE_CONCURRENCY, len(media_paths))) as pool:
+        return list(pool.map(lambda args: probe(args[0], keyframes, args[1]), zip(media_paths, media_ids)))
+
+
+def _run_probe(media_path: str, keyframes: bool) -> MediaMetadata:
+    entries = (
+        "format=duration,format_name,bit_rate"
+        ":stream=index,codec_type,codec_name,profile,pix_fmt,width,height,avg_frame_rate,bit_rate"
+    )
+    if keyframes:
+        entries += ":packet=stream_index,pts_time,flags"
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", entries, "-of", "json", media_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    output = json.loads(result.stdout)
+
+    streams = [
+        StreamInfo(
+            index=int(stream.get("index", i)),
+            codec_type=stream.get("codec_type", ""),
+            codec_name=stream.get("codec_name"),
+            width=stream.get("width"),
+            height=stream.get("height"),
+            fps=_parse_rate(stream.get("avg_frame_rate")),
+            profile=stream.get("profile"),
+            pix_fmt=stream.get("pix_fmt"),
+            bit_rate=_parse_int(stream.get("bit_rate")),
+        )
+        for i, stream in enumerate(output.get("streams", []))
+    ]
+    keyframe_times = None
+    if keyframes:
+        video = next((s for s in streams if s.codec_type == "video"), None)
+        keyframe_times = [
+            float(packet["pts_time"])
+            for packet in output.get("packets", [])
+            if video is not None
+            and int(packet["stream_index"]) == video.index
+            and "K" in packet.get("flags", "")
+            and packet.get("pts_time", "N/A") != "N/A"
+        ]
+    return MediaMetadata(
+        duration=float(output["format"]["duration"]),
+        streams=streams,
+        keyframes=keyframe_times,
+        format_name=output["format"].get("format_name"),
+        bit_rate=_parse_int(output["format"].get("bit_rate")),
+    )
+
+
+def _parse_rate(rate: str | None) -> float | None:
+    # ffprobe reports frame rates as "30000/1001"; "0/0" when unknown
+    if not rate:
+        return None
+    numerator, _, denominator = rate.partition("/")
+    if not denominator:
+        return float(numerator)
+    if float(denominator) == 0:
+        return None
+    return float(numerator) / float(denominator)
+
+
+def _parse_int(value: str | None) -> int | None:
+    # ffprobe prints "N/A" for values it couldn't determine
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_path(media_path: str, media_id: str | None) -> str | None:
+    if not CACHE_DIR:
+        return None
+    if media_id is not None:
+        key = f"media:{media_id}"
+    else:
+        try:
+            stat = os.stat(media_path)
+        except OSError:
+            return None
+        key = f"file:{os.path.abspath(media_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+    digest = hashlib.sha256(f"{_CACHE_VERSION}:{key}".encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def _load_cached(cache_path: str) -> MediaMetadata | None:
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return MediaMetadata(**{**cached, "streams": [StreamInfo(*stream) for stream in cached["streams"]]})
+
+
+def _store_cached(cache_path: str, metadata: MediaMetadata) -> None:
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{uuid4()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(metadata._asdict(), f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Failed to cache media metadata: {e}")
@@ -1,10 +1,126 @@
-from scenedetect import detect, AdaptiveDetector
-from scenedetect.scene_manager import SceneList
-
-def get_changes_timecodes(video_path: str) -> SceneList:
-    scene_list = detect(video_path, AdaptiveDetector(
-        adaptive_threshold=3.1, 
-        min_scene_len=3, 
-        window_width=1
-    ))
-    return scene_list
\ No newline at end of file
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from uuid import uuid4
+
+import cv2
+import numpy as np
+from scenedetect import detect, AdaptiveDetector, FrameTimecode
+from scenedetect.scene_manager import SceneList, get_scenes_from_cuts
+
+logger = logging.getLogger(__name__)
+
+# Fast mode: decode through ffmpeg at 1/DOWNSCALE of the resolution and only every
+# (FRAME_SKIP + 1)-th frame. Both at their defaults (1 and 0) keep the full-decode detector.
+DOWNSCALE = int(os.getenv("SCENE_DETECT_DOWNSCALE", "1"))
+FRAME_SKIP = int(os.getenv("SCENE_DETECT_FRAME_SKIP", "0"))
+# Detected scene lists, keyed by file content and detector settings; empty disables the cache
+CACHE_DIR = os.getenv("SCENE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "scene-cuts"))
+
+_DETECTOR_SETTINGS = {"adaptive_threshold": 3.1, "min_scene_len": 3, "window_width": 1}
+
+
+def get_changes_timecodes(video_path: str, downscale: int = DOWNSCALE, frame_skip: int = FRAME_SKIP) -> SceneList:
+    cache_path = _cache_path(video_path, downscale, frame_skip) if CACHE_DIR else None
+    if cache_path is not None:
+        scene_list = _load_cached(cache_path)
+        if scene_list is not None:
+            logger.info(f"Scene list for {video_path} found in cache")
+            return scene_list
+
+    if downscale > 1 or frame_skip > 0:
+        scene_list = _detect_downscaled(video_path, downscale, frame_skip)
+    else:
+        scene_list = detect(video_path, AdaptiveDetector(**_DETECTOR_SETTINGS))
+
+    if cache_path is not None:
+        _store_cached(cache_path, scene_list)
+    return scene_list
+
+
+def _detect_downscaled(video_path: str, downscale: int, frame_skip: int) -> SceneList:
+    cap = cv2.VideoCapture(video_path)
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+    if not width or not height or fps <= 0:
+        raise ValueError(f"Can't read video stream properties of {video_path}")
+
+    width, height = max(2, width // downscale // 2 * 2), max(2, height // downscale // 2 * 2)
+    step = frame_skip + 1
+    command = [
+        "ffmpeg", "-v", "error", "-i", video_path, "-map", "0:v:0",
+        "-vf", f"select='not(mod(n\\,{step}))',scale={width}:{height}",
+        "-fps_mode", "passthrough", "-pix_fmt", "bgr24", "-f", "rawvideo", "pipe:1",
+    ]
+    detector = AdaptiveDetector(**_DETECTOR_SETTINGS)
+    frame_size = width * height * 3
+    cuts = []
+    frame_num = -step
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+        while True:
+            data = process.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            # Selected frame i is frame i * step of the source, so cuts keep source frame numbers
+            frame_num += step
+            frame = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+            cuts += detector.process_frame(frame_num, frame)
+        stderr = process.stderr.read().decode()
+    if process.returncode != 0:
+        raise Exception(f"ffmpeg failed to decode {video_path}: {stderr}")
+    if frame_num < 0:
+        return []
+
+    cuts += detector.post_process(frame_num)
+    if not cuts:
+        return []
+    return get_scenes_from_cuts(
+        cut_list=[FrameTimecode(cut, fps) for cut in sorted(cuts)],
+        start_pos=FrameTimecode(0, fps),
+        # Skipped frames after the last selected one still belong to the last scene
+        end_pos=FrameTimecode(max(frame_num + 1, frame_count), fps),
+    )
+
+
+def _cache_path(video_path: str, downscale: int, frame_skip: int) -> str:
+    digest = hashlib.sha256()
+    with open(video_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 ** 2), b""):
+            digest.update(chunk)
+    settings = json.dumps({**_DETECTOR_SETTINGS, "downscale": downscale, "frame_skip": frame_skip}, sort_keys=True)
+    digest.update(settings.encode())
+    return os.path.join(CACHE_DIR, f"{digest.hexdigest()}.json")
+
+
+def _load_cached(cache_path: str) -> SceneList | None:
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except FileNotFoundError:
+        return None
+    fps = cached["fps"]
+    return [(FrameTimecode(start, fps), FrameTimecode(end, fps)) for start, end in cached["scenes"]]
+
+
+def _store_cached(cache_path: str, scene_list: SceneList) -> None:
+    if not scene_list:
+        cached = {"fps": 1.0, "scenes": []}
+    else:
+        cached = {
+            "fps": scene_list[0][0].get_framerate(),
+            "scenes": [[start.get_frames(), end.get_frames()] for start, end in scene_list],
+        }
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Detect and split may finish the same file at once; readers only ever see a whole file
+    tmp_path = f"{cache_path}.{uuid4()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cached, f)
+    os.replace(tmp_path, cache_path)
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable
+from urllib.parse import unquote, urlparse
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+
+# Files at least this large go through multipart upload when storage credentials are configured
+MULTIPART_THRESHOLD = int(float(os.getenv("MULTIPART_THRESHOLD_MB", "64")) * 1024 ** 2)
+PART_SIZE = int(float(os.getenv("MULTIPART_PART_SIZE_MB", "16")) * 1024 ** 2)
+PART_CONCURRENCY = int(os.getenv("MULTIPART_CONCURRENCY", "4"))
+PART_ATTEMPTS = 3
+
+
+def multipart_enabled(file_size: int) -> bool:
+    return file_size >= MULTIPART_THRESHOLD and storage_credentials_configured()
+
+
+def storage_credentials_configured() -> bool:
+    return bool(os.getenv("MINIO_ACCESS_KEY"))
+
+
+def multipart_put(upload_url: str, file_path: str, content_type: str) -> None:
+    """Upload file_path to the object behind a presigned PUT URL as parallel multipart parts.
+
+    Only the endpoint, bucket and key are taken from the (path-style) presigned URL;
+    the parts are signed with the MINIO_* credentials. Finished parts are recorded in
+    <file_path>.multipart.json, so calling this again after a failure only sends the
+    missing parts.
+    """
+    endpoint, bucket, key = _parse_presigned_url(upload_url)
+    client = _client(endpoint)
+    state_path = f"{file_path}.multipart.json"
+    state = _load_state(state_path, bucket, key)
+    try:
+        _upload(client, state_path, state, bucket, key, file_path, content_type)
+    except ClientError as e:
+        if state is None or e.response["Error"]["Code"] != "NoSuchUpload":
+            raise
+        # The saved upload was aborted or expired on the storage side, start a new one
+        logger.warning("Saved multipart upload for %s is gone, starting over", file_path)
+        os.remove(state_path)
+        _upload(client, state_path, None, bucket, key, file_path, content_type)
+
+
+def _upload(client, state_path: str, state: dict | None, bucket: str, key: str, file_path: str, content_type: str) -> None:
+    if state is None:
+        upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)["UploadId"]
+        state = {"bucket": bucket, "key": key, "upload_id": upload_id, "parts": {}}
+        _save_state(state_path, state)
+
+    file_size = os.path.getsize(file_path)
+    part_count = max(1, -(-file_size // PART_SIZE))
+    pending = [n for n in range(1, part_count + 1) if str(n) not in state["parts"]]
+    logger.info("Multipart upload of %s: %d of %d parts to send", file_path, len(pending), part_count)
+
+    lock = threading.Lock()
+
+    def upload_part(part_number: int) -> None:
+        etag = _upload_part(client, state, file_path, part_number)
+        with lock:
+            state["parts"][str(part_number)] = etag
+            _save_state(state_path, state)
+
+    with ThreadPoolExecutor(max_workers=min(PART_CONCURRENCY, len(pending) or 1)) as pool:
+        # list() re-raises the first part that failed all its attempts; the state file stays for a retry
+        list(pool.map(upload_part, pending))
+
+    parts = [{"PartNumber": int(n), "ETag": etag} for n, etag in sorted(state["parts"].items(), key=lambda p: int(p[0]))]
+    client.complete_multipart_upload(
+        Bucket=bucket, Key=key, UploadId=state["upload_id"], MultipartUpload={"Parts": parts},
+    )
+    os.remove(state_path)
+
+
+def multipart_put_stream(
+    upload_url: str,
+    stream: BinaryIO,
+    content_type: str,
+    before_complete: Callable[[], None] | None = None,
+) -> int:
+    """Upload a stream of unknown length (e.g. ffmpeg stdout) part by part while it is produced.
+
+    At most PART_CONCURRENCY parts are buffered or in flight at once. before_complete
+    runs after the stream ends and can raise to abort the upload instead of
+    completing it, e.g. when the producer exited with an error. Returns the number
+    of bytes uploaded.
+    """
+    endpoint, bucket, key = _parse_presigned_url(upload_url)
+    client = _client(endpoint)
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)["UploadId"]
+    slots = threading.BoundedSemaphore(PART_CONCURRENCY)
+    total = 0
+
+    def send(part_number: int, body: bytes) -> str:
+        try:
+            return _send_part(client, bucket, key, upload_id, part_number, body)
+        finally:
+            slots.release()
+
+    try:
+        futures = []
+        with ThreadPoolExecutor(max_workers=PART_CONCURRENCY) as pool:
+            while not any(f.done() and f.exception() for f in futures):
+                slots.acquire()
+                body = _read_part(stream)
+                if not body:
+                    slots.release()
+                    break
+                total += len(body)
+                futures.append(pool.submit(send, len(futures) + 1, body))
+            etags = [f.result() for f in futures]
+
+        if before_complete is not None:
+            before_complete()
+        if not etags:
+            raise ValueError(f"Nothing to upload to {key}: the stream was empty")
+        client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": etag} for n, etag in enumerate(etags, start=1)]},
+        )
+    except BaseException:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    return total
+
+
+def _read_part(stream: BinaryIO) -> bytes:
+    # Pipes return short reads; S3 needs every part but the last to be full-sized
+    chunks = []
+    remaining = PART_SIZE
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _upload_part(client, state: dict, file_path: str, part_number: int) -> str:
+    offset = (part_number - 1) * PART_SIZE
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        body = f.read(PART_SIZE)
+    return _send_part(client, state["bucket"], state["key"], state["upload_id"], part_number, body)
+
+
+def _send_part(client, bucket: str, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+    for attempt in range(1, PART_ATTEMPTS + 1):
+        try:
+            response = client.upload_part(
+                Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body,
+            )
+            return response["ETag"]
+        except (BotoCoreError, ClientError) as e:
+            gone = isinstance(e, ClientError) and e.response["Error"]["Code"] == "NoSuchUpload"
+            if gone or attempt == PART_ATTEMPTS:
+                raise
+            logger.warning("Part %d of %s failed (attempt %d), retrying: %s", part_number, key, attempt, e)
+            time.sleep(2 ** attempt)
+
+
+def _parse_presigned_url(url: str) -> tuple[str, str, str]:
+    parsed = urlparse(url)
+    bucket, _, key = parsed.path.lstrip("/").partition("/")
+    return f"{parsed.scheme}://{parsed.netloc}", bucket, unquote(key)
+
+
+def _client(endpoint: str):
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint,
+        aws_access_key_id=os.getenv("MINIO_ACCESS_KEY"),
+        aws_secret_access_key=os.getenv("MINIO_SECRET_KEY"),
+        region_name=os.getenv("MINIO_REGION", "us-east-1"),
+        config=Config(
+            s3={"addressing_style": "path"},
+            max_pool_connections=PART_CONCURRENCY,
+            # MinIO and other S3-compatible stores don't all accept the newer default trailing checksums
+            request_checksum_calculation="when_required",
+            response_checksum_validation="when_required",
+        ),
+    )
+
+
+def _load_state(state_path: str, bucket: str, key: str) -> dict | None:
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if state["bucket"] != bucket or state["key"] != key:
+        return None
+    return state
+
+
+def _save_state(state_path: str, state: dict) -> None:
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
@@ -1,14 +1,19 @@
+import bisect
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import os
-from pathlib import Path
 import subprocess
 import uuid
 
 from moviepy import VideoFileClip
-from scenedetect import split_video_ffmpeg
 
+from utils.ffmpeg_commands import build_split_scene_command
+from utils.media_metadata import MediaMetadata, probe
 from utils.scene_changes_detector import get_changes_timecodes
 
+# ffmpeg processes cutting scenes of one video at the same time
+SPLIT_CONCURRENCY = int(os.getenv("SPLIT_CONCURRENCY", "4"))
+
 
 def extract_audio(input_file: str) -> str:
     if os.path.exists(input_file) and input_file.endswith(".mp4"):
@@ -40,23 +45,14 @@ def extract_audio(input_file: str) -> str:
         logging.error("The file {input_file} does not exist or is not a valid MP4 file.", input_file)
         raise Exception("File not found ({input_file})", input_file)
 
+def probe_media(media_path: str) -> MediaMetadata:
+    """Duration and streams of media_path from a single (cached) ffprobe call."""
+    return probe(media_path)
+
 def get_duration(media_path: str) -> float:
     if os.path.exists(media_path):
         try:
-            # Load video file
-            result = subprocess.run(
-                [
-                    "ffprobe", 
-                    "-v", "error", 
-                    "-show_entries",
-                    "format=duration", "-of",
-                    "default=noprint_wrappers=1:nokey=1", 
-                    media_path
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT
-            )
-            return float(result.stdout)
+            return probe(media_path).duration
 
         except Exception as e:
             logging.error("Error getting duration for {input_file}: {e}", input_file=media_path, e=e)
@@ -65,33 +61,62 @@ def get_duration(media_path: str) -> float:
         logging.error("The file {input_file} does not exist or is not a valid MP4 file.", input_file=media_path)
         raise Exception(f"File not found ({media_path})")
 
-def split_video(file_path: str, output_dir: str) -> list[str]:
+def has_audio_stream(media_path: str) -> bool:
+    """True if media_path has at least one audio stream. Use probe_media when the duration is needed too."""
+    return probe_media(media_path).has_audio
+
+def get_keyframe_times(media_path: str) -> list[float]:
+    """Return the presentation timestamps (seconds) of all video keyframes.
+
+    Reads packet flags only, so nothing is decoded.
+    """
+    return probe(media_path, keyframes=True).keyframes
+
+def split_video(file_path: str, output_dir: str, stream_copy: bool = False) -> list[str]:
+    """Split file_path at its detected scene changes into files in output_dir.
+
+    stream_copy cuts without re-encoding at the keyframes nearest to the scene
+    changes; scenes that snap onto the same keyframe are merged. Returns the
+    scene file paths in order.
+    """
     scene_list = get_changes_timecodes(file_path)
+    if not scene_list:
+        return []
+    fps = scene_list[0][0].get_framerate()
+    bounds = [scene_list[0][0].get_seconds()] + [end.get_seconds() for _, end in scene_list]
+    if stream_copy:
+        bounds = _snap_to_keyframes(bounds, get_keyframe_times(file_path))
+
     video_name = str(uuid.uuid4())
     _, file_extension = os.path.splitext(file_path)
-    output_file_template = f"$VIDEO_NAME-Scene-$SCENE_NUMBER{file_extension}"
-    ffmpeg_output = split_video_ffmpeg(
-        file_path, 
-        scene_list, 
-        Path(output_dir),
-        video_name=video_name,
-        output_file_template=output_file_template,
-        show_output=True
-    )
-    if ffmpeg_output:
-        raise Exception(f"Video splitting with ffmpeg returned error code: {ffmpeg_output}")
-    res = _form_scenes_result(len(scene_list), video_name, output_dir, file_extension)
-    return res
-
-def _form_scenes_result(scenes_count: int, video_name: str, output_dir: str, file_extension: str) -> list[str]:
-    res = []
-    for i in range(1, scenes_count + 1):
-        scene = "Scene-"
-        if i < 10:
-            scene += f"00{i}"
-        elif i < 100:
-            scene += f"0{i}"
-        else:
-            scene += f"{i}"
-        res.append(os.path.join(output_dir, f"{video_name}-{scene}{file_extension}"))
-    return res
+    os.makedirs(output_dir, exist_ok=True)
+    digits = max(3, len(str(len(bounds) - 1)))
+    commands = []
+    for i, (start, end) in enumerate(zip(bounds, bounds[1:]), start=1):
+        output_path = os.path.join(output_dir, f"{video_name}-Scene-{i:0{digits}d}{file_extension}")
+        frame_count = round((end - start) * fps)
+        commands.append((output_path, build_split_scene_command(
+            file_path, start, end - start, output_path, stream_copy, frame_count,
+        )))
+
+    def cut(command: list[str]) -> None:
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"Video splitting with ffmpeg returned error code {result.returncode}: {result.stderr}")
+
+    with ThreadPoolExecutor(max_workers=SPLIT_CONCURRENCY) as pool:
+        list(pool.map(cut, [command for _, command in commands]))
+    return [output_path for output_path, _ in commands]
+
+def _snap_to_keyframes(bounds: list[float], keyframes: list[float]) -> list[float]:
+    # The first and last bounds are the video's start and end and stay where they are
+    if not keyframes:
+        return [bounds[0], bounds[-1]]
+    snapped = [bounds[0]]
+    for t in bounds[1:-1]:
+        i = bisect.bisect_left(keyframes, t)
+        nearest = min(keyframes[max(i - 1, 0):i + 1], key=lambda k: abs(k - t))
+        if snapped[-1] < nearest < bounds[-1]:
+            snapped.append(nearest)
+    snapped.append(bounds[-1])
+    return snapped
@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DB_CONFIG = {
+    "dbname": os.getenv("DB_NAME"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "host": os.getenv("DB_HOST"),
+    "port": os.getenv("DB_PORT")
+}
+
+# One row per video. hashes holds the 64-bit frame hashes as BIGINT (same bits, signed view).
+# revision is bumped on every write so readers can fetch only what changed since their last sync.
+SCHEMA = """
+CREATE SEQUENCE IF NOT EXISTS video_hash_sets_revision_seq;
+CREATE TABLE IF NOT EXISTS video_hash_sets (
+    file_id TEXT PRIMARY KEY,
+    frame_numbers INTEGER[] NOT NULL,
+    hashes BIGINT[] NOT NULL,
+    revision BIGINT NOT NULL DEFAULT nextval('video_hash_sets_revision_seq')
+);
+CREATE INDEX IF NOT EXISTS video_hash_sets_revision_idx ON video_hash_sets (revision);
+"""
+
+# One-off copy of the legacy one-row-per-frame table, used while video_hash_sets is still empty
+_BACKFILL = """
+INSERT INTO video_hash_sets (file_id, frame_numbers, hashes)
+SELECT file_id,
+       array_agg(frame_number ORDER BY frame_number),
+       array_agg(('x' || hash)::bit(64)::bigint ORDER BY frame_number)
+FROM video_frame_hashes
+GROUP BY file_id
+ON CONFLICT (file_id) DO NOTHING
+"""
+
+_UPSERT = """
+INSERT INTO video_hash_sets (file_id, frame_numbers, hashes) VALUES %s
+ON CONFLICT (file_id) DO UPDATE
+SET frame_numbers = EXCLUDED.frame_numbers,
+    hashes = EXCLUDED.hashes,
+    revision = nextval('video_hash_sets_revision_seq')
+"""
+
+
+class VideoHashStore:
+    """Frame hashes in Postgres, one packed row per video, over a shared connection pool."""
+
+    def __init__(self, max_connections: int = 4):
+        self._pool = ThreadedConnectionPool(1, max_connections, **DB_CONFIG)
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def ensure_schema(self) -> None:
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(SCHEMA)
+            cursor.execute("SELECT to_regclass('video_frame_hashes') IS NOT NULL")
+            has_legacy_table = cursor.fetchone()[0]
+            cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM video_hash_sets)")
+            if has_legacy_table and cursor.fetchone()[0]:
+                cursor.execute(_BACKFILL)
+                logger.info(f"Backfilled {cursor.rowcount} videos from video_frame_hashes")
+
+    def save_many(self, videos: list[tuple[str, list[int], np.ndarray]]) -> None:
+        """Upsert (file_id, frame_numbers, uint64 hashes) for many videos in one statement."""
+        rows = [
+            (file_id, list(frame_numbers), hashes.astype(np.uint64).view(np.int64).tolist())
+            for file_id, frame_numbers, hashes in videos
+        ]
+        with self.connection() as conn, conn.cursor() as cursor:
+            execute_values(cursor, _UPSERT, rows, page_size=500)
+
+    def load_since(self, revision: int) -> tuple[list[tuple[str, np.ndarray]], int]:
+        """Videos written after revision as (file_id, uint64 hashes), plus the newest revision seen."""
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT file_id, hashes, revision FROM video_hash_sets WHERE revision > %s ORDER BY revision",
+                (revision,),
+            )
+            rows = cursor.fetchall()
+        videos = [(file_id, np.array(hashes, dtype=np.int64).view(np.uint64)) for file_id, hashes, _ in rows]
+        return videos, rows[-1][2] if rows else revision
+
+
+_store: VideoHashStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_hash_store() -> VideoHashStore:
+    """Process-wide store; the schema is created (and the legacy table backfilled) on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = VideoHashStore(int(os.getenv("HASH_DB_POOL_SIZE", "4")))
+            store.ensure_schema()
+            _store = store
+        return _store
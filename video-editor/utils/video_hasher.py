@@ -1,27 +1,34 @@
 import logging
 import os
+import threading
+import time
 import cv2
 from PIL import Image
 import imagehash
 import numpy as np
 import psycopg2
 
-from models.similar_video import SimilarVideo
+from models.similar_video import MatchedSegment, SimilarVideo
+from utils.hash_index import VideoHashIndex, pack_hashes
+from utils.video_editing_utils import get_keyframe_times
+from utils.video_hash_store import DB_CONFIG, get_hash_store
 
-DB_CONFIG = {
-    "dbname": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "host": os.getenv("DB_HOST"),
-    "port": os.getenv("DB_PORT")
-}
+# Every FRAME_INTERVAL-th frame is hashed, so stored sample i is frame i * FRAME_INTERVAL
+FRAME_INTERVAL = 30
+# Other workers' writes are picked up at most this often (one indexed query per sync)
+HASH_INDEX_SYNC_SECONDS = float(os.getenv("HASH_INDEX_SYNC_SECONDS", "5"))
+
+_hash_index: VideoHashIndex | None = None
+_hash_index_revision = 0
+_hash_index_synced_at = 0.0
+_hash_index_lock = threading.Lock()
 
 def init_db():
     conn = psycopg2.connect(**DB_CONFIG)
     return conn
 
 
-def extract_frames(video_path, frame_interval=30):
+def extract_frames(video_path, frame_interval=FRAME_INTERVAL):
     cap = cv2.VideoCapture(video_path)
     frames = []
     frame_numbers = []
@@ -38,6 +45,66 @@ def extract_frames(video_path, frame_interval=30):
     cap.release()
     return frames, frame_numbers
 
+def sample_frame_hashes(video_path, frame_interval=FRAME_INTERVAL) -> tuple[list[str], list[int]]:
+    """average_hash of every frame_interval-th frame, without decoding the frames in between
+    when the keyframes allow it.
+
+    Returns the same frames and hashes as hashing extract_frames' output. Each sample
+    is read from a grayscale buffer, so there is no RGB/PIL conversion of full frames.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        targets = range(0, frame_count, frame_interval)
+        if _seeking_pays_off(video_path, fps, frame_interval):
+            frames = _read_by_seeking(cap, targets)
+        else:
+            frames = _read_sequentially(cap, frame_interval)
+    finally:
+        cap.release()
+
+    hashes, frame_numbers = [], []
+    for frame_num, frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        hashes.append(str(imagehash.average_hash(Image.fromarray(gray))))
+        frame_numbers.append(frame_num)
+    return hashes, frame_numbers
+
+def _seeking_pays_off(video_path, fps, frame_interval) -> bool:
+    # A seek decodes from the previous keyframe, so it only beats decoding everything
+    # when keyframes are closer together than the samples
+    if fps <= 0:
+        return False
+    keyframes = get_keyframe_times(video_path)
+    if len(keyframes) < 2:
+        return False
+    gop_frames = (keyframes[-1] - keyframes[0]) / (len(keyframes) - 1) * fps
+    return gop_frames < frame_interval
+
+def _read_by_seeking(cap, targets):
+    frames = []
+    for frame_num in targets:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append((frame_num, frame))
+    return frames
+
+def _read_sequentially(cap, frame_interval):
+    # grab() skips the colour conversion and copy that read() does for every frame
+    frames = []
+    count = 0
+    while cap.grab():
+        if count % frame_interval == 0:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            frames.append((count, frame))
+        count += 1
+    return frames
+
 def compare_videos(hashes1, hashes2):
     min_frames = min(len(hashes1), len(hashes2))
     if min_frames == 0:
@@ -52,57 +119,76 @@ def compare_videos(hashes1, hashes2):
     similarity = 1 - avg_distance / 64
     return similarity
 
-def store_hashes(video_path, frames, frame_numbers, conn):
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM video_frame_hashes WHERE file_id = %s", (video_path,))
-    for frame, frame_num in zip(frames, frame_numbers):
-        hash_value = str(imagehash.average_hash(frame))
-        cursor.execute(
-            "INSERT INTO video_hashes (video_path, frame_number, hash) VALUES (%s, %s, %s)",
-            (video_path, frame_num, hash_value)
-        )
-    conn.commit()
+def store_hashes(file_id, hashes, frame_numbers):
+    """Persist one video's hex frame hashes as a single row, replacing any earlier ones."""
+    packed = pack_hashes(hashes)
+    get_hash_store().save_many([(file_id, frame_numbers, packed)])
+    # Keep this worker's index current without waiting for the next sync
+    with _hash_index_lock:
+        if _hash_index is not None:
+            _hash_index.add(file_id, packed)
 
 def get_hashes(file_id, conn):
     cursor = conn.cursor()
-    cursor.execute(
-        "SELECT frame_number, hash FROM video_frame_hashes WHERE file_id = %s ORDER BY frame_number",
-        (file_id,)
-    )
-    return cursor.fetchall()
+    cursor.execute("SELECT frame_numbers, hashes FROM video_hash_sets WHERE file_id = %s", (file_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return []
+    frame_numbers, hashes = row
+    return [(frame_num, f"{value & 0xFFFFFFFFFFFFFFFF:016x}") for frame_num, value in zip(frame_numbers, hashes)]
 
 def get_all_video_files(conn):
     cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT file_id FROM video_frame_hashes")
+    cursor.execute("SELECT file_id FROM video_hash_sets")
     return [row[0] for row in cursor.fetchall()]
 
-def find_similar_video(video_path, similarity_threshold=0.96) -> SimilarVideo:
-    conn = init_db()
-    frames, frame_numbers = extract_frames(video_path)
-    if not frames:
+def get_hash_index() -> VideoHashIndex:
+    """Process-wide index, loaded on first use. Afterwards only rows written since the last
+    sync are fetched, at most every HASH_INDEX_SYNC_SECONDS."""
+    global _hash_index, _hash_index_revision, _hash_index_synced_at
+    with _hash_index_lock:
+        if _hash_index is None or time.monotonic() - _hash_index_synced_at > HASH_INDEX_SYNC_SECONDS:
+            if _hash_index is None:
+                _hash_index, _hash_index_revision = VideoHashIndex(), 0
+            videos, _hash_index_revision = get_hash_store().load_since(_hash_index_revision)
+            for file_id, hashes in videos:
+                _hash_index.add(file_id, hashes)
+            if videos:
+                logging.info(f"Hash index synced {len(videos)} videos, {len(_hash_index)} indexed")
+            _hash_index_synced_at = time.monotonic()
+        return _hash_index
+
+def find_similar_video(video_path, similarity_threshold=0.96, exclude_file_id=None) -> SimilarVideo:
+    hashes, frame_numbers = sample_frame_hashes(video_path)
+    return find_similar_hashes(video_path, hashes, frame_numbers, similarity_threshold, exclude_file_id)
+
+def find_similar_hashes(video_path, hashes, frame_numbers, similarity_threshold=0.96, exclude_file_id=None) -> SimilarVideo:
+    """find_similar_video for hashes that were already sampled, e.g. in another process."""
+    if not hashes:
         logging.warning("Video at path {video_path} has no frames", video_path)
         raise Exception("Video has no frames")
-    
-    file_ids = get_all_video_files(conn)
-
-    hashes = [str(imagehash.average_hash(frame)) for frame in frames]
-
-    new_hashes = [(frame_num, str(imagehash.average_hash(frame))) for frame, frame_num in zip(frames, frame_numbers)]
-    
-    for existing_file_id in file_ids:
-        existing_hashes = get_hashes(existing_file_id, conn)
-        similarity = compare_videos(new_hashes, existing_hashes)
-        if similarity > similarity_threshold:
-            logging.warning(f"Видео {video_path} слишком похоже на {existing_file_id} (схожесть: {similarity:.2%})")
-            return SimilarVideo(
-                file_id=existing_file_id,
-                frame_numbers=frame_numbers,
-                hashes=hashes
-            )   
-    
+
+    match = get_hash_index().find(pack_hashes(hashes), similarity_threshold, exclude=exclude_file_id)
+    if match is not None:
+        logging.warning(f"Видео {video_path} слишком похоже на {match.file_id} (схожесть: {match.similarity:.2%})")
+        return SimilarVideo(
+            file_id=match.file_id,
+            frame_numbers=frame_numbers,
+            hashes=hashes,
+            similarity=match.similarity,
+            matched_segments=[
+                MatchedSegment(
+                    start_frame=frame_numbers[start],
+                    end_frame=frame_numbers[end - 1],
+                    match_start_frame=match_start * FRAME_INTERVAL,
+                    match_end_frame=(match_end - 1) * FRAME_INTERVAL,
+                )
+                for start, end, match_start, match_end in match.alignment.segments
+            ],
+        )
+
     return SimilarVideo(
         file_id=None,
         frame_numbers=frame_numbers,
         hashes=hashes
-    ) 
-
+    )
@@ -0,0 +1,112 @@
+import logging
+import os
+import subprocess
+from typing import NamedTuple
+
+import requests
+
+from utils.ffmpeg_commands import build_normalize_command
+from utils.media_metadata import MediaMetadata, probe
+
+logger = logging.getLogger(__name__)
+
+# Video above this bitrate (bits/s) is re-encoded even when it is otherwise compliant
+MAX_VIDEO_BITRATE = int(os.getenv("NORMALIZE_MAX_VIDEO_BITRATE", "12000000"))
+
+_H264_PROFILES = {"Constrained Baseline", "Baseline", "Main", "High"}
+_PIX_FMT = "yuv420p"
+# Top-level MP4 boxes inspected before giving up on finding moov/mdat
+_MAX_BOXES = 16
+
+
+class NormalizationPlan(NamedTuple):
+    copy_video: bool
+    # Also True when there is no audio to normalize
+    copy_audio: bool
+    # MP4 with the moov atom ahead of mdat
+    faststart: bool
+
+    @property
+    def skip(self) -> bool:
+        """The source already is a faststart H.264/AAC MP4: nothing to do."""
+        return self.copy_video and self.copy_audio and self.faststart
+
+
+def normalization_key(media_id: str) -> str:
+    """Idempotency key shared by every path that normalizes a media."""
+    return f"normalize:{media_id}"
+
+
+def plan_normalization(input_url: str) -> NormalizationPlan:
+    """Probe input_url and decide which streams need re-encoding.
+
+    Not cached by media ID: normalization overwrites the media it probes.
+    """
+    metadata = probe(input_url)
+    is_mp4 = "mp4" in (metadata.format_name or "").split(",")
+    return NormalizationPlan(
+        copy_video=is_mp4 and _video_compliant(metadata),
+        copy_audio=is_mp4 and all(s.codec_name == "aac" for s in metadata.streams if s.codec_type == "audio"),
+        faststart=is_mp4 and _moov_before_mdat(input_url),
+    )
+
+
+def normalize(input_url: str, output_path: str, plan: NormalizationPlan | None = None) -> bool:
+    """Write the normalized video to output_path; False (and nothing written) when it's already compliant."""
+    plan = plan or plan_normalization(input_url)
+    if plan.skip:
+        logger.info("Video is already normalized, skipping")
+        return False
+
+    logger.info(f"Normalizing video (copy video: {plan.copy_video}, copy audio: {plan.copy_audio})")
+    cmd = build_normalize_command(input_url, output_path, copy_video=plan.copy_video, copy_audio=plan.copy_audio)
+    subprocess.run(cmd, check=True, capture_output=True)
+    return True
+
+
+def _video_compliant(metadata: MediaMetadata) -> bool:
+    video = metadata.video
+    if video is None:
+        return False
+    bit_rate = video.bit_rate or metadata.bit_rate
+    return (
+        video.codec_name == "h264"
+        and video.profile in _H264_PROFILES
+        and video.pix_fmt == _PIX_FMT
+        and (bit_rate is None or bit_rate <= MAX_VIDEO_BITRATE)
+    )
+
+
+def _moov_before_mdat(source: str) -> bool:
+    """Walk the top-level MP4 boxes, reading only their headers."""
+    offset = 0
+    for _ in range(_MAX_BOXES):
+        header = _read_range(source, offset, 16)
+        if len(header) < 8:
+            return False
+        size, box_type = int.from_bytes(header[:4], "big"), header[4:8]
+        if box_type == b"moov":
+            return True
+        if box_type == b"mdat":
+            return False
+        if size == 1:
+            size = int.from_bytes(header[8:16], "big")
+        if size < 8:
+            # 0 means the box runs to the end of the file
+            return False
+        offset += size
+    return False
+
+
+def _read_range(source: str, offset: int, length: int) -> bytes:
+    if source.startswith(("http://", "https://")):
+        headers = {"Range": f"bytes={offset}-{offset + length - 1}"}
+        with requests.get(source, headers=headers, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            if response.status_code != 206 and offset:
+                # Range ignored: the body starts at 0, skip ahead without keeping it
+                response.raw.read(offset)
+            return response.raw.read(length)
+    with open(source, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
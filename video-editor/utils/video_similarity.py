@@ -0,0 +1,96 @@
+from typing import NamedTuple
+
+import numpy as np
+
+HASH_BITS = 64
+# An alignment must overlap at least this share of the shorter video, so a couple of
+# frames at the very edge of two long videos can't make them look identical
+MIN_OVERLAP_RATIO = 0.5
+# Aligned frames at most this far apart are reported as part of a matched segment
+SEGMENT_MAX_DISTANCE = 10
+# Diagonals are summed this many frames at a time; ones already over budget are dropped between blocks
+_BLOCK = 8
+
+
+def hamming_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.bitwise_count(np.bitwise_xor(a, b))
+
+
+class Alignment(NamedTuple):
+    """Best offset between two videos' frame hashes.
+
+    Sample i of the query lines up with sample i + offset of the other video.
+    segments are (query_start, query_end, other_start, other_end) sample ranges,
+    end-exclusive, where the aligned frames match.
+    """
+    similarity: float
+    offset: int
+    segments: list[tuple[int, int, int, int]]
+
+
+def align(query: np.ndarray, other: np.ndarray, similarity_threshold: float) -> Alignment | None:
+    """Find the offset at which query and other are most alike, or None if none clears the threshold.
+
+    Each offset is a diagonal of the query × other Hamming distance matrix, scored
+    like compare_videos over the frames the two videos share at that offset. The
+    diagonals are summed block by block for all offsets at once, and an offset is
+    dropped as soon as its running distance can no longer stay under the threshold,
+    so unrelated videos usually cost one block.
+    """
+    n, m = len(query), len(other)
+    if n == 0 or m == 0:
+        return None
+
+    offsets = np.arange(-(n - 1), m)
+    starts = np.maximum(0, -offsets)  # first query sample on each diagonal
+    lengths = np.minimum(n, m - offsets) - starts
+    min_overlap = max(1, int(np.ceil(MIN_OVERLAP_RATIO * min(n, m))))
+    keep = lengths >= min_overlap
+    offsets, starts, lengths = offsets[keep], starts[keep], lengths[keep]
+
+    # similarity > threshold  ⇔  total distance < budget
+    budgets = (1 - similarity_threshold) * HASH_BITS * lengths
+    totals = np.zeros(len(offsets), dtype=np.int64)
+    dropped = np.zeros(len(offsets), dtype=bool)
+    alive = np.arange(len(offsets))
+    step = np.arange(_BLOCK)
+
+    for block_start in range(0, int(lengths.max()), _BLOCK):
+        alive = alive[lengths[alive] > block_start]
+        if len(alive) == 0:
+            break
+        positions = block_start + step
+        valid = positions < lengths[alive, None]
+        i = np.where(valid, starts[alive, None] + positions, 0)
+        j = np.where(valid, i + offsets[alive, None], 0)
+        distances = hamming_distances(query[i], other[j]).astype(np.int64)
+        totals[alive] += np.where(valid, distances, 0).sum(axis=1)
+        over = totals[alive] >= budgets[alive]
+        dropped[alive[over]] = True
+        alive = alive[~over]
+
+    passed = np.flatnonzero(~dropped)
+    if len(passed) == 0:
+        return None
+
+    similarities = 1 - totals[passed] / (lengths[passed] * HASH_BITS)
+    # Best similarity first, the longer overlap on a tie
+    best = passed[np.lexsort((-lengths[passed], -similarities))[0]]
+    offset, start, length = int(offsets[best]), int(starts[best]), int(lengths[best])
+    return Alignment(
+        similarity=float(1 - totals[best] / (length * HASH_BITS)),
+        offset=offset,
+        segments=_matched_segments(query, other, offset, start, length),
+    )
+
+
+def _matched_segments(query, other, offset, start, length) -> list[tuple[int, int, int, int]]:
+    i = np.arange(start, start + length)
+    matched = hamming_distances(query[i], other[i + offset]) <= SEGMENT_MAX_DISTANCE
+    # Run boundaries of consecutive matched frames
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], matched.astype(np.int8), [0]))))
+    segments = []
+    for run_start, run_end in zip(edges[::2], edges[1::2]):
+        query_start, query_end = start + int(run_start), start + int(run_end)
+        segments.append((query_start, query_end, query_start + offset, query_end + offset))
+    return segments